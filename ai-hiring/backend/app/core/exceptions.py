@@ -1,8 +1,8 @@
 from fastapi import HTTPException, status
 
 class AppException(HTTPException):
-    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST):
-        super().__init__(status_code=status_code, detail=message)
+    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST, headers=None):
+        super().__init__(status_code=status_code, detail=message, headers=headers)
 
 
 class FileProcessingError(AppException):
@@ -17,4 +17,24 @@ class TextExtractionError(AppException):
 
 class ScoringError(AppException):
     def __init__(self, message="Error computing resume score"):
-        super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class RateLimitedError(AppException):
+    def __init__(self, message="Too many ranking requests in progress", retry_after: int = 10):
+        super().__init__(
+            message,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class IdempotencyKeyReused(AppException):
+    def __init__(self, message="Idempotency-Key was already used for a different request"):
+        super().__init__(message, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class RankingCancelled(AppException):
+    # 499: nginx's "client closed request"; nobody is left to read it
+    def __init__(self, message="Client disconnected; ranking cancelled"):
+        super().__init__(message, 499)
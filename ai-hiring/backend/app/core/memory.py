@@ -0,0 +1,245 @@
+"""
+backend/app/core/memory.py
+
+Memory accounting for the ingestion pipeline (tracemalloc based).
+- Off by default: tracemalloc slows every allocation. Start it with
+  MEMORY_TRACE=1 (MEMORY_TRACE_FRAMES deep tracebacks, default 1) or at
+  runtime via POST /api/system/memory/tracing
+- While tracing, every stage_timer() stage (extract_text, ocr_rasterize,
+  ocr_page, embed_batch, score, ...) records its peak traced memory above
+  what was allocated when it started, and what it left allocated; see
+  talentlens_stage_memory_peak_bytes and GET /api/system/memory
+- The numbers are process-wide: stages running concurrently in other
+  threads are included. Drive one request at a time for clean per-stage
+  attributions
+- Heap snapshots (tracemalloc.Snapshot) are dumped to MEMORY_SNAPSHOT_DIR
+  (newest MEMORY_SNAPSHOT_KEEP kept) and can be listed, diffed and
+  downloaded; load one with tracemalloc.Snapshot.load()
+"""
+
+import os
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List, Optional
+
+MEMORY_TRACE = os.getenv("MEMORY_TRACE", "0") == "1"
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 1))
+MEMORY_SNAPSHOT_DIR = os.getenv(
+    "MEMORY_SNAPSHOT_DIR",
+    os.path.join(tempfile.gettempdir(), "talentlens_heap_snapshots")
+)
+MEMORY_SNAPSHOT_KEEP = int(os.getenv("MEMORY_SNAPSHOT_KEEP", 10))
+
+SNAPSHOT_SUFFIX = ".tmsnap"
+_SNAPSHOT_ID = re.compile(r"^\d{8}T\d{6}_\d+_\d+$")
+
+# allocations made by tracemalloc itself and by the import machinery
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class _Frame:
+    __slots__ = ("start", "peak")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.peak = start
+
+
+class StageMemoryTracker:
+    """
+    Peak traced memory per in-flight stage. tracemalloc has one global
+    peak, so on every stage enter / exit the peak so far is folded into all
+    open frames before it is reset: each frame ends up with the true peak
+    between its own start and end, even when stages nest or overlap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: set = set()
+        self._stats = {}
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _fold(self) -> int:
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            if peak > frame.peak:
+                frame.peak = peak
+        tracemalloc.reset_peak()
+        return current
+
+    def enter(self) -> Optional[_Frame]:
+        if not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            frame = _Frame(self._fold())
+            self._open.add(frame)
+        return frame
+
+    def exit(self, stage: str, frame: _Frame) -> Optional[tuple]:
+        """(peak bytes above start, bytes still allocated) for the stage."""
+        with self._lock:
+            self._open.discard(frame)
+            if not tracemalloc.is_tracing():
+                return None
+            current = self._fold()
+            frame.peak = max(frame.peak, current)
+            peak, retained = frame.peak - frame.start, current - frame.start
+
+            stats = self._stats.setdefault(
+                stage, {"calls": 0, "max_peak_bytes": 0, "total_peak_bytes": 0, "total_retained_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak)
+            stats["total_peak_bytes"] += peak
+            stats["total_retained_bytes"] += retained
+        return peak, retained
+
+    def stage_stats(self) -> dict:
+        with self._lock:
+            return {
+                stage: {
+                    "calls": s["calls"],
+                    "max_peak_bytes": s["max_peak_bytes"],
+                    "mean_peak_bytes": s["total_peak_bytes"] // s["calls"],
+                    "mean_retained_bytes": s["total_retained_bytes"] // s["calls"],
+                }
+                for stage, s in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+stage_memory = StageMemoryTracker()
+
+
+def start_tracing(frames: int = MEMORY_TRACE_FRAMES) -> None:
+    if tracemalloc.is_tracing():
+        return
+    tracemalloc.start(frames)
+    print(f"tracemalloc started ({frames} frame(s) per traceback)")
+
+
+def stop_tracing() -> None:
+    # snapshots already written stay usable
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        stage_memory.reset()
+        print("tracemalloc stopped")
+
+
+def max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def memory_report() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (None, None)
+    return {
+        "pid": os.getpid(),
+        "max_rss_bytes": max_rss_bytes(),
+        "tracing": tracing,
+        "traceback_frames": tracemalloc.get_traceback_limit() if tracing else None,
+        "traced_current_bytes": current,
+        "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else None,
+        "stages": stage_memory.stage_stats(),
+    }
+
+
+# ---------------- Heap snapshots ----------------
+
+def snapshot_path(snapshot_id: str) -> Optional[str]:
+    """Path of an existing snapshot, or None (ids are validated: no traversal)."""
+    if not _SNAPSHOT_ID.match(snapshot_id):
+        return None
+    path = os.path.join(MEMORY_SNAPSHOT_DIR, snapshot_id + SNAPSHOT_SUFFIX)
+    return path if os.path.exists(path) else None
+
+
+def list_snapshots() -> List[dict]:
+    if not os.path.isdir(MEMORY_SNAPSHOT_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(MEMORY_SNAPSHOT_DIR)):
+        if not name.endswith(SNAPSHOT_SUFFIX):
+            continue
+        path = os.path.join(MEMORY_SNAPSHOT_DIR, name)
+        out.append({"id": name[:-len(SNAPSHOT_SUFFIX)], "bytes": os.path.getsize(path)})
+    return out
+
+
+def _top(stats, limit: int) -> List[dict]:
+    return [
+        {
+            "location": str(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+            **({"size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+               if hasattr(stat, "size_diff") else {})
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def take_snapshot(limit: int = 20) -> dict:
+    """Dump a heap snapshot of this process; returns its id and top allocation sites."""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    os.makedirs(MEMORY_SNAPSHOT_DIR, exist_ok=True)
+    snapshot_id = (
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{os.getpid()}_{time.monotonic_ns() % 10**6}"
+    )
+    snapshot.dump(os.path.join(MEMORY_SNAPSHOT_DIR, snapshot_id + SNAPSHOT_SUFFIX))
+
+    # keep the newest MEMORY_SNAPSHOT_KEEP
+    existing = list_snapshots()
+    for old in existing[:max(0, len(existing) - MEMORY_SNAPSHOT_KEEP)]:
+        os.remove(os.path.join(MEMORY_SNAPSHOT_DIR, old["id"] + SNAPSHOT_SUFFIX))
+
+    stats = snapshot.statistics("lineno")
+    return {
+        "id": snapshot_id,
+        "pid": os.getpid(),
+        "traced_bytes": sum(stat.size for stat in stats),
+        "top": _top(stats, limit),
+    }
+
+
+def diff_snapshots(base_id: str, snapshot_id: str, limit: int = 20, group_by: str = "lineno") -> Optional[dict]:
+    """Allocation sites that grew most from base to snapshot; None if either is missing."""
+    base_path, path = snapshot_path(base_id), snapshot_path(snapshot_id)
+    if base_path is None or path is None:
+        return None
+
+    base = tracemalloc.Snapshot.load(base_path)
+    snapshot = tracemalloc.Snapshot.load(path)
+    stats = snapshot.compare_to(base, group_by)
+    return {
+        "base": base_id,
+        "snapshot": snapshot_id,
+        "size_diff_bytes": sum(stat.size_diff for stat in stats),
+        "top": _top(stats, limit),
+    }
+
+
+if MEMORY_TRACE:
+    start_tracing()
@@ -0,0 +1,241 @@
+"""
+backend/app/core/metrics.py
+
+Prometheus instrumentation, served at GET /metrics.
+- talentlens_stage_seconds{stage}: pipeline stages (save_upload,
+  extract_text, ocr_rasterize, ocr_page, extract_name, embed_batch,
+  keyword_match, semantic_match, score, db_flush), recorded with
+  stage_timer() / @timed()
+- talentlens_http_request_seconds{method, route, status}: per route
+  template (middleware in main.py)
+- talentlens_ocr_pages_total, talentlens_embedded_texts_total,
+  talentlens_embed_batch_size
+- talentlens_stage_memory_peak_bytes{stage}, while tracemalloc is on
+  (app/core/memory.py)
+- Read at scrape time: embedding cache hits / misses / hit ratio / bytes
+  per level,
+  queue depths (embedding batcher, OCR slots by priority class), in-flight
+  bulk requests, pending unknown-skill counts, ranking jobs by status
+- With PROMETHEUS_MULTIPROC_DIR set, counters and histograms are
+  aggregated across workers; scrape-time values are this worker's (pid label)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.memory import stage_memory
+from app.core.profiling import current_profile
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+STAGE_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+STAGE_SECONDS = Histogram(
+    "talentlens_stage_seconds",
+    "Time spent in a ranking pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "talentlens_http_request_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+OCR_PAGES = Counter(
+    "talentlens_ocr_pages",
+    "PDF pages run through OCR"
+)
+EMBEDDED_TEXTS = Counter(
+    "talentlens_embedded_texts",
+    "Texts encoded by the embedding model (cache misses)"
+)
+NEAR_DUPLICATES = Counter(
+    "talentlens_near_duplicates",
+    "Resumes matched to a stored near-duplicate (parse / embed skipped)"
+)
+EMBED_BATCH_SIZE = Histogram(
+    "talentlens_embed_batch_size",
+    "Texts per embedding forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+EMBED_DOCUMENT_CHUNKS = Histogram(
+    "talentlens_embed_document_chunks",
+    "Chunks per document in chunked document embedding",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+STAGE_MEMORY_PEAK_BYTES = Histogram(
+    "talentlens_stage_memory_peak_bytes",
+    "Peak traced memory above the stage's starting point (only while tracemalloc runs)",
+    ["stage"],
+    buckets=tuple(2 ** n for n in range(10, 32, 2))
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    # also feeds the per-request recorder when this request is being profiled,
+    # and per-stage memory accounting while tracemalloc is tracing
+    profile = current_profile()
+    if profile is not None:
+        profile.enter_stage()
+    memory_frame = stage_memory.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        if memory_frame is not None:
+            memory = stage_memory.exit(stage, memory_frame)
+            if memory is not None:
+                STAGE_MEMORY_PEAK_BYTES.labels(stage).observe(memory[0])
+        if profile is not None:
+            profile.exit_stage(stage, start, elapsed)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RuntimeCollector:
+    """Values that already live in the services, read at scrape time."""
+
+    def describe(self):
+        # registering must not call collect(): the services aren't imported yet
+        return []
+
+    def collect(self):
+        # imported lazily: the services import this module
+        from app.services.embeddings import EmbeddingService
+        from app.services.scheduling import bulk_admission, ocr_limiter
+        from app.services.skill_tracker import unknown_skill_tracker
+
+        pid = str(os.getpid())
+        stats = EmbeddingService.cache_stats()
+
+        hits = CounterMetricFamily(
+            "talentlens_embedding_cache_hits",
+            "Embedding cache hits", labels=["level", "pid"]
+        )
+        misses = CounterMetricFamily(
+            "talentlens_embedding_cache_misses",
+            "Embedding cache misses", labels=["level", "pid"]
+        )
+        ratio = GaugeMetricFamily(
+            "talentlens_embedding_cache_hit_ratio",
+            "Embedding cache hits / lookups since start", labels=["level", "pid"]
+        )
+        for level in ("local", "shared"):
+            level_stats = stats[level]
+            if level_stats is None:
+                continue
+            lookups = level_stats["hits"] + level_stats["misses"]
+            hits.add_metric([level, pid], level_stats["hits"])
+            misses.add_metric([level, pid], level_stats["misses"])
+            ratio.add_metric([level, pid], level_stats["hits"] / lookups if lookups else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+
+        cache_bytes = GaugeMetricFamily(
+            "talentlens_embedding_cache_bytes",
+            "Embedding cache size: local LRU in memory, shared store on disk",
+            labels=["level", "pid"]
+        )
+        cache_bytes.add_metric(["local", pid], stats["local"]["bytes"])
+        if stats["shared"] is not None and stats["shared"]["file_bytes"] is not None:
+            cache_bytes.add_metric(["shared", pid], stats["shared"]["file_bytes"])
+        yield cache_bytes
+
+        depth = GaugeMetricFamily(
+            "talentlens_queue_depth",
+            "Items waiting, by queue and priority class",
+            labels=["queue", "priority", "pid"]
+        )
+        batcher = EmbeddingService._batcher
+        if batcher is not None:
+            for cls, n in batcher.queue_depths().items():
+                depth.add_metric(["embedding", cls, pid], n)
+        for cls, n in ocr_limiter.waiting.items():
+            depth.add_metric(["ocr", cls, pid], n)
+        depth.add_metric(["unknown_skills", "", pid], unknown_skill_tracker.pending)
+        yield depth
+
+        inflight = GaugeMetricFamily(
+            "talentlens_bulk_inflight",
+            "Bulk ranking requests currently admitted", labels=["pid"]
+        )
+        inflight.add_metric([pid], bulk_admission.inflight)
+        yield inflight
+
+        jobs = _ranking_job_counts()
+        if jobs is not None:
+            family = GaugeMetricFamily(
+                "talentlens_ranking_jobs",
+                "Background ranking jobs by status", labels=["status"]
+            )
+            for status, n in jobs.items():
+                family.add_metric([status], n)
+            yield family
+
+
+def _ranking_job_counts():
+    from sqlalchemy import func, select
+    from app.db.database import SessionLocal
+    from app.models.ranking_job import RankingJob, JOB_QUEUED, JOB_RUNNING
+
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(RankingJob.status, func.count(RankingJob.id))
+                .where(RankingJob.status.in_([JOB_QUEUED, JOB_RUNNING]))
+                .group_by(RankingJob.status)
+            ).all()
+    except Exception as e:
+        print("Metrics: ranking job count failed:", e)
+        return None
+
+    counts = {JOB_QUEUED: 0, JOB_RUNNING: 0}
+    counts.update({status: n for status, n in rows})
+    return counts
+
+
+_runtime_collector = RuntimeCollector()
+if not MULTIPROC_DIR:
+    REGISTRY.register(_runtime_collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """(body, content type) for the /metrics response."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_runtime_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,265 @@
+"""
+backend/app/core/profiling.py
+
+On-demand profiling of single requests (middleware in main.py).
+- Triggered by an `X-Profile: <PROFILE_TOKEN>` header (operators only: the
+  token is a deployment secret, not a user credential) or by sampling
+  PROFILE_SAMPLE_RATE of requests; both off by default, and then the
+  middleware isn't installed at all
+- Backend: pyinstrument (statistical, async-aware) when installed, else
+  cProfile; PROFILE_BACKEND=cprofile|pyinstrument forces one
+- The event-loop part of the request is profiled from the middleware; work
+  handed to the threadpool is profiled per thread from the outermost
+  stage_timer() it runs under, and everything is merged into one profile
+- Every stage_timer() inside the request is also recorded (stage, offset,
+  duration, thread)
+- Writes <PROFILE_DIR>/<timestamp>_<route>_<id>.{prof|html,json}; the id is
+  returned in the X-Profile-Id response header
+- One profiled request at a time per process; others run unprofiled
+- The cProfile part on the event loop also sees other requests' coroutines
+  that run interleaved with this one
+"""
+
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "talentlens_profiles")
+)
+PROFILE_BACKEND = os.getenv("PROFILE_BACKEND", "auto")
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "active_profile", default=None
+)
+_one_at_a_time = threading.Lock()
+
+
+def profiling_enabled() -> bool:
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+
+def profile_trigger(headers) -> Optional[str]:
+    """'header' / 'sample' if this request should be profiled, else None."""
+    supplied = headers.get(PROFILE_HEADER)
+    if supplied and PROFILE_TOKEN and hmac.compare_digest(supplied, PROFILE_TOKEN):
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    return _active_profile.get()
+
+
+def _backend_name() -> str:
+    if PROFILE_BACKEND != "auto":
+        return PROFILE_BACKEND
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return "cprofile"
+    return "pyinstrument"
+
+
+class _CProfileBackend:
+    suffix = "prof"
+
+    def __init__(self):
+        self._profilers = []
+
+    def start(self, is_async: bool):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler) -> None:
+        profiler.disable()
+        self._profilers.append(profiler)
+
+    def write(self, path: str) -> None:
+        import pstats
+
+        if not self._profilers:
+            return
+        stats = pstats.Stats(self._profilers[0])
+        for profiler in self._profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+
+
+class _PyinstrumentBackend:
+    suffix = "html"
+
+    def __init__(self):
+        self._sessions = []
+
+    def start(self, is_async: bool):
+        from pyinstrument import Profiler
+
+        profiler = Profiler(
+            interval=0.001,
+            async_mode="enabled" if is_async else "disabled"
+        )
+        profiler.start()
+        return profiler
+
+    def stop(self, profiler) -> None:
+        self._sessions.append(profiler.stop())
+
+    def write(self, path: str) -> None:
+        from pyinstrument.renderers import HTMLRenderer
+        from pyinstrument.session import Session
+
+        if not self._sessions:
+            return
+        session = self._sessions[0]
+        for other in self._sessions[1:]:
+            session = Session.combine(session, other)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HTMLRenderer().render(session))
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = datetime.now(timezone.utc)
+        self.backend_name = _backend_name()
+        self.backend = (
+            _PyinstrumentBackend() if self.backend_name == "pyinstrument"
+            else _CProfileBackend()
+        )
+
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = []
+        # thread ident -> [profiler, nesting depth]
+        self._threads = {}
+        self._loop_thread = threading.get_ident()
+        self._loop_profiler = None
+
+    # ---- request (event loop) side ----
+
+    def start(self) -> None:
+        self._loop_profiler = self.backend.start(is_async=True)
+
+    def stop(self) -> None:
+        if self._loop_profiler is not None:
+            self.backend.stop(self._loop_profiler)
+            self._loop_profiler = None
+
+    # ---- stage_timer() hooks ----
+
+    def enter_stage(self) -> None:
+        ident = threading.get_ident()
+        if ident == self._loop_thread:
+            return
+        with self._lock:
+            entry = self._threads.get(ident)
+            if entry is not None:
+                entry[1] += 1
+                return
+            self._threads[ident] = entry = [None, 1]
+        try:
+            entry[0] = self.backend.start(is_async=False)
+        except (RuntimeError, ValueError) as e:
+            # another profiler already owns this thread
+            print("Profiling: thread not profiled:", e)
+
+    def exit_stage(self, stage: str, start: float, elapsed: float) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._stages.append({
+                "stage": stage,
+                "start_ms": round((start - self._t0) * 1000, 2),
+                "duration_ms": round(elapsed * 1000, 2),
+                "thread": threading.current_thread().name
+            })
+            entry = self._threads.get(ident)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._threads[ident]
+        if entry[0] is not None:
+            with self._lock:
+                self.backend.stop(entry[0])
+
+    # ---- output ----
+
+    def write(self, route: str, status: int) -> str:
+        """Write the profile and its stage timings; returns the path stem."""
+        elapsed = time.perf_counter() - self._t0
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stem = os.path.join(
+            PROFILE_DIR,
+            f"{self.started_at:%Y%m%dT%H%M%S}_{self.method.lower()}_{slug}_{self.id}"
+        )
+
+        with self._lock:
+            stages = sorted(self._stages, key=lambda s: s["start_ms"])
+        totals = {}
+        for s in stages:
+            totals[s["stage"]] = round(totals.get(s["stage"], 0) + s["duration_ms"], 2)
+
+        self.backend.write(f"{stem}.{self.backend.suffix}")
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "id": self.id,
+                "method": self.method,
+                "path": self.path,
+                "route": route,
+                "status": status,
+                "trigger": self.trigger,
+                "backend": self.backend_name,
+                "pid": os.getpid(),
+                "started_at": self.started_at.isoformat(),
+                "duration_ms": round(elapsed * 1000, 2),
+                "stage_totals_ms": totals,
+                "stages": stages
+            }, f, indent=2)
+        return stem
+
+
+def begin_profile(method: str, path: str, trigger: str) -> Optional[RequestProfile]:
+    """Start profiling the current request, or None if one is already running."""
+    if not _one_at_a_time.acquire(blocking=False):
+        print(f"Profiling: skipped {method} {path}, another request is being profiled")
+        return None
+    profile = RequestProfile(method, path, trigger)
+    _active_profile.set(profile)
+    profile.start()
+    return profile
+
+
+def end_profile(profile: RequestProfile, route: str, status: int) -> None:
+    try:
+        profile.stop()
+        stem = profile.write(route, status)
+        print(f"Profiling: wrote {stem}.*")
+    except Exception as e:
+        print("Profiling: failed to write profile:", e)
+    finally:
+        _one_at_a_time.release()
@@ -0,0 +1,40 @@
+"""
+backend/app/core/responses.py
+
+Responses that hold something until they are done (an admission slot, the
+profiler).
+- with_cleanup: runs a callback once the response has been sent, or has
+  failed / been abandoned part way. A streamed body's own `finally` isn't
+  enough: it never runs if the body iterator is never started (client gone
+  before the first chunk, send failing on the headers), and starlette skips
+  a BackgroundTask when sending fails
+"""
+
+from typing import Callable
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+class _CleanupResponse(Response):
+    def __init__(self, response: Response, cleanup: Callable[[], None]):
+        # no Response.__init__: status, headers and body are the wrapped
+        # response's (headers are shared, later changes still apply)
+        self.response = response
+        self.cleanup = cleanup
+        self.status_code = response.status_code
+        self.raw_headers = response.raw_headers
+        self.background = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.background is not None and self.response.background is None:
+            self.response.background = self.background
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.cleanup()
+
+
+def with_cleanup(response: Response, cleanup: Callable[[], None]) -> Response:
+    """`response`, calling `cleanup()` once it has been sent or abandoned."""
+    return _CleanupResponse(response, cleanup)
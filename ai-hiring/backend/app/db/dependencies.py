@@ -1,11 +1,16 @@
 # app/db/dependencies.py
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, AsyncSessionLocal
 from sqlalchemy.orm import Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncGenerator, Generator
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
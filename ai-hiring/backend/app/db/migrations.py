@@ -0,0 +1,260 @@
+# app/db/migrations.py
+"""
+Idempotent schema upgrades for databases created by an older build.
+
+`Base.metadata.create_all` only creates missing tables, so columns /
+indexes added to existing tables and data moves live here.
+- upgrade_schema: missing tables, columns and indexes, timestamp columns
+  that should be timezone-aware, the session
+  summaries of sessions written before those columns, the owner of LSH
+  buckets written before resume_lsh_buckets.user_id, and a nullable
+  legacy resumes.raw_text. Idempotent, run by
+  every process at startup (app.main lifespan) so no build runs against a
+  schema older than its models. On PostgreSQL an advisory lock serializes
+  concurrently starting workers. A new index on a large table is built
+  (and the table locked for writes) by the first process to start
+- upgrade: upgrade_schema plus the data moves. Safe to run repeatedly;
+  run it once per deploy, before starting workers:
+
+    python -m app.db.migrations
+"""
+
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime, Engine, Numeric, Table, cast, func, insert, inspect, literal, select, text, update
+)
+from sqlalchemy.engine import Connection
+
+from app.db.base import Base
+from app.db.database import engine as default_engine
+import app.models  # noqa: F401  (register tables)
+from app.models.job import JobDescription
+from app.models.ranking_session import RankingSession
+from app.models.resume_fingerprint import ResumeLshBucket
+from app.models.resume_text import ResumeText
+from app.models.score import ResumeJobScore
+
+TEXT_BATCH_SIZE = 500
+# pg_advisory_xact_lock key shared by every process upgrading the schema
+SCHEMA_LOCK_KEY = 7_340_001
+
+
+def _add_missing_columns(conn: Connection, table: Table) -> list[str]:
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    added = []
+
+    for column in table.columns:
+        if column.name in existing:
+            continue
+
+        ddl = (
+            f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+            f"{column.type.compile(conn.dialect)}"
+        )
+        default = column.default
+        if default is not None and default.is_scalar:
+            rendered = literal(default.arg).compile(
+                dialect=conn.dialect,
+                compile_kwargs={"literal_binds": True}
+            )
+            ddl += f" DEFAULT {rendered}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+
+        conn.execute(text(ddl))
+        added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def _add_missing_timezones(conn: Connection) -> list[str]:
+    """
+    PostgreSQL: timestamp columns the models declare with timezone=True but
+    that were created without one (asyncpg rejects aware datetimes for
+    those). Stored values are UTC.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+
+    changed = []
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"]: c["type"] for c in inspect(conn).get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, DateTime) or not column.type.timezone:
+                continue
+            current = existing.get(column.name)
+            if current is None or getattr(current, "timezone", True):
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                f"TYPE TIMESTAMP WITH TIME ZONE USING {column.name} AT TIME ZONE 'UTC'"
+            ))
+            changed.append(f"{table.name}.{column.name}")
+    return changed
+
+
+def _create_missing_indexes(conn: Connection) -> list[str]:
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def _backfill_session_summaries(conn: Connection) -> int:
+    """Fill summary columns for sessions written before they existed."""
+    scores = ResumeJobScore.__table__
+    per_session = scores.c.session_id == RankingSession.id
+
+    result = conn.execute(
+        update(RankingSession)
+        .where(
+            RankingSession.candidate_count == 0,
+            select(scores.c.id).where(per_session).exists()
+        )
+        .values(
+            candidate_count=select(func.count(scores.c.id))
+            .where(per_session).scalar_subquery(),
+            top_score=select(func.max(scores.c.final_score))
+            .where(per_session).scalar_subquery(),
+            # PostgreSQL has no round(double precision, int)
+            mean_score=select(func.round(cast(func.avg(scores.c.final_score), Numeric), 2))
+            .where(per_session).scalar_subquery(),
+            job_title=select(JobDescription.title)
+            .join(scores, scores.c.job_id == JobDescription.id)
+            .where(per_session)
+            .limit(1)
+            .scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _backfill_bucket_owners(conn: Connection) -> int:
+    """
+    Own LSH buckets written before they had a user: the user of the
+    session that scored the resume. Buckets whose resume is in no session
+    stay NULL and are never matched.
+    """
+    scores = ResumeJobScore.__table__
+    owner = (
+        select(RankingSession.user_id)
+        .join(scores, scores.c.session_id == RankingSession.id)
+        .where(scores.c.resume_id == ResumeLshBucket.resume_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = conn.execute(
+        update(ResumeLshBucket)
+        .where(ResumeLshBucket.user_id.is_(None), owner.is_not(None))
+        .values(user_id=owner)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _relax_raw_text(conn: Connection) -> Optional[str]:
+    """
+    New resumes no longer write resumes.raw_text: until _move_raw_text has
+    dropped it, it must accept NULL or every insert fails.
+    """
+    columns = {c["name"]: c for c in inspect(conn).get_columns("resumes")}
+    column = columns.get("raw_text")
+    if column is None or column["nullable"]:
+        return None
+
+    if conn.dialect.name == "sqlite":
+        # no ALTER COLUMN: move the texts now (drops the column)
+        return f"moved {_move_raw_text(conn)} resume texts to resume_texts"
+
+    conn.execute(text("ALTER TABLE resumes ALTER COLUMN raw_text DROP NOT NULL"))
+    return "resumes.raw_text made nullable (the migration CLI moves it)"
+
+
+def _move_raw_text(conn: Connection) -> int:
+    """Compress resumes.raw_text into resume_texts, then drop the column."""
+    columns = {c["name"] for c in inspect(conn).get_columns("resumes")}
+    if "raw_text" not in columns:
+        return 0
+
+    texts = ResumeText.__table__
+    moved = 0
+    last_id = 0
+
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, raw_text FROM resumes "
+                "WHERE id > :last_id ORDER BY id LIMIT :n"
+            ),
+            {"last_id": last_id, "n": TEXT_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+
+        last_id = rows[-1].id
+        done = set(conn.execute(
+            select(texts.c.resume_id)
+            .where(texts.c.resume_id.in_([r.id for r in rows]))
+        ).scalars())
+
+        batch = [
+            {"resume_id": r.id, **ResumeText.pack(r.raw_text or "")}
+            for r in rows
+            if r.id not in done
+        ]
+        if batch:
+            conn.execute(insert(texts), batch)
+            moved += len(batch)
+
+    # Postgres keeps the dead space until VACUUM FULL / pg_repack
+    conn.execute(text("ALTER TABLE resumes DROP COLUMN raw_text"))
+    return moved
+
+
+def _upgrade_schema(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+    Base.metadata.create_all(bind=conn)
+    for table in Base.metadata.sorted_tables:
+        for name in _add_missing_columns(conn, table):
+            print(f"added column {name}")
+
+    for name in _add_missing_timezones(conn):
+        print(f"made {name} timezone-aware")
+
+    for name in _create_missing_indexes(conn):
+        print(f"created index {name}")
+
+    relaxed = _relax_raw_text(conn)
+    if relaxed:
+        print(relaxed)
+
+    backfilled = _backfill_session_summaries(conn)
+    if backfilled:
+        print(f"backfilled {backfilled} session summaries")
+
+    owned = _backfill_bucket_owners(conn)
+    if owned:
+        print(f"backfilled the owner of {owned} LSH buckets")
+
+
+def upgrade_schema(engine: Engine = default_engine) -> None:
+    with engine.begin() as conn:
+        _upgrade_schema(conn)
+
+
+def upgrade(engine: Engine = default_engine) -> None:
+    with engine.begin() as conn:
+        _upgrade_schema(conn)
+        print(f"moved {_move_raw_text(conn)} resume texts to resume_texts")
+
+
+if __name__ == "__main__":
+    upgrade()
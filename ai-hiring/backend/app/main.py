@@ -1,24 +1,55 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
+import time
 
 from app.routes.upload import router as upload_router
 from app.routes.history import router as history_router
+from app.routes.ranking_jobs import router as ranking_jobs_router
+from app.routes.system import router as system_router
 from app.auth.auth_router import router as auth_router
 from app.core.exceptions import AppException
-from app.db.database import engine
-from app.db.base import Base
-import app.models  
+from app.core.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from app.core.profiling import (
+    PROFILE_ID_HEADER,
+    begin_profile,
+    end_profile,
+    profile_trigger,
+    profiling_enabled
+)
+from app.core.responses import with_cleanup
+from app.db.database import engine, async_engine
+from app.db.migrations import upgrade_schema
+from app.services.skill_tracker import unknown_skill_tracker
+from app.services.skill_taxonomy import skill_taxonomy
+from app.services.ranking_worker import ranking_worker_pool
+from app.services.warmup import WARMUP_ON_STARTUP, model_warmup
+from sqlalchemy import text
 
 # -----------------------------
 # Lifespan
 # -----------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    # tables, and columns added since the database was created
+    upgrade_schema(engine)
     print("✅ Database tables ensured")
+    # models load in the background: /healthz answers at once, /readyz once warm
+    warmup_task = asyncio.create_task(model_warmup.run()) if WARMUP_ON_STARTUP else None
+    skill_flush_task = asyncio.create_task(unknown_skill_tracker.run())
+    # approved UnknownSkill rows join the taxonomy now and whenever they change
+    taxonomy_task = asyncio.create_task(skill_taxonomy.run())
+    ranking_worker_pool.start()
     yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    taxonomy_task.cancel()
+    await asyncio.to_thread(ranking_worker_pool.stop)
+    await unknown_skill_tracker.stop(skill_flush_task)
+    await async_engine.dispose()
+    engine.dispose()
     print("🛑 Application shutting down")
 
 # -----------------------------
@@ -41,8 +72,72 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", PROFILE_ID_HEADER],
 )
 
+# -----------------------------
+# Request metrics
+# -----------------------------
+def _route_template(request: Request) -> str:
+    """
+    Matched route path with its router prefix, e.g. /api/history/{session_id}
+    (raw paths would give one label per session id).
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # router prefixes are static: keep the leading segments of the real path
+    segments = request.url.path.split("/")
+    depth = route.path.count("/")
+    return "/".join(segments[:len(segments) - depth]) + route.path
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.labels(
+            request.method,
+            _route_template(request),
+            str(status)
+        ).observe(time.perf_counter() - start)
+
+# -----------------------------
+# On-demand profiling (PROFILE_TOKEN / PROFILE_SAMPLE_RATE)
+# -----------------------------
+async def profile_request(request: Request, call_next):
+    trigger = profile_trigger(request.headers)
+    if trigger is None:
+        return await call_next(request)
+
+    profile = begin_profile(request.method, request.url.path, trigger)
+    if profile is None:
+        return await call_next(request)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        end_profile(profile, _route_template(request), 500)
+        raise
+
+    # streamed bodies (NDJSON ranking) keep working after call_next returns;
+    # the profile ends once the body is sent, or abandoned before it starts
+    response.headers[PROFILE_ID_HEADER] = profile.id
+    return with_cleanup(
+        response,
+        lambda: end_profile(profile, _route_template(request), response.status_code)
+    )
+
+
+# not installed at all unless enabled: zero per-request cost when off
+if profiling_enabled():
+    app.middleware("http")(profile_request)
+
 # -----------------------------
 # Exception handling
 # -----------------------------
@@ -50,7 +145,8 @@ app.add_middleware(
 async def app_exception_handler(request, exc: AppException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail}
+        content={"error": exc.detail},
+        headers=exc.headers
     )
 
 # -----------------------------
@@ -59,10 +155,53 @@ async def app_exception_handler(request, exc: AppException):
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(upload_router, prefix="/api", tags=["Resume"])
 app.include_router(history_router, prefix="/api", tags=["History"])
+app.include_router(ranking_jobs_router, prefix="/api", tags=["Ranking Jobs"])
+app.include_router(system_router, prefix="/api", tags=["System"])
 
 # -----------------------------
 # Health check
 # -----------------------------
 @app.get("/")
 def root():
-    return {"status": "TalentLens backend running"}
\ No newline at end of file
+    return {"status": "TalentLens backend running"}
+
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and serving; checks nothing else."""
+    return {"status": "ok"}
+
+
+READYZ_DB_TIMEOUT = 2.0
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: models warmed and the database reachable, else 503."""
+    try:
+        async def ping():
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.wait_for(ping(), READYZ_DB_TIMEOUT)
+        database = {"status": "ok"}
+    except Exception as e:
+        database = {"status": "unreachable", "error": str(e) or type(e).__name__}
+
+    ready = model_warmup.ready and database["status"] == "ok"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not ready",
+            "models": model_warmup.report(),
+            "database": database
+        }
+    )
+
+# -----------------------------
+# Prometheus scrape endpoint
+# -----------------------------
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
\ No newline at end of file
@@ -1,3 +1,9 @@
 from app.models.resume import Resume
+from app.models.resume_text import ResumeText
+from app.models.resume_fingerprint import ResumeFingerprint
 from app.models.job import JobDescription
-from app.models.score import ResumeJobScore
\ No newline at end of file
+from app.models.score import ResumeJobScore
+from app.models.ranking_session import RankingSession
+from app.models.user import User
+from app.models.unknown_skill import UnknownSkill
+from app.models.ranking_job import RankingJob
@@ -0,0 +1,46 @@
+# app/models/ranking_job.py
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Index
+from datetime import datetime, timezone
+from app.db.base import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class RankingJob(Base):
+    """
+    A rank-and-score run executed in the background.
+    The table doubles as the work queue for app.services.ranking_worker.
+    """
+    __tablename__ = "ranking_jobs"
+    __table_args__ = (
+        Index("ix_ranking_jobs_status_created", "status", "created_at"),
+        Index("ix_ranking_jobs_user_request_key", "user_id", "request_key"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    jd_text = Column(Text, nullable=False)
+    required_experience = Column(Float, nullable=True)
+    uploads = Column(JSON, nullable=False)  # [{"filename": ..., "path": ...}]
+
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)  # claims so far
+    error = Column(Text, nullable=True)
+    session_id = Column(Integer, ForeignKey("ranking_sessions.id"), nullable=True)
+    request_key = Column(String(64), nullable=True)
+    request_hash = Column(String(64), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=_now)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=_now, onupdate=_now)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
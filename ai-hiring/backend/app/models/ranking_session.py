@@ -1,16 +1,37 @@
 # app/models/ranking_session.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.base import Base
 
+SESSION_STATUS_COMPLETED = "completed"
+
+
 class RankingSession(Base):
     __tablename__ = "ranking_sessions"
+    __table_args__ = (
+        # history list: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_ranking_sessions_user_created", "user_id", "created_at", "id"),
+        # repeat-request lookup (see services/idempotency.py)
+        Index("ix_ranking_sessions_user_request_key", "user_id", "request_key"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     job_description = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # denormalized summary, written in the same transaction as the scores
+    job_title = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default=SESSION_STATUS_COMPLETED)
+    candidate_count = Column(Integer, nullable=False, default=0)
+    top_score = Column(Float, nullable=True)
+    mean_score = Column(Float, nullable=True)
+
+    # memoization key of the request that produced this session, and the
+    # hash of its inputs (differs from the key for client Idempotency-Keys)
+    request_key = Column(String(64), nullable=True)
+    request_hash = Column(String(64), nullable=True)
 
     # relationships
     user = relationship("User", back_populates="ranking_sessions")
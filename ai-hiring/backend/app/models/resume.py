@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.base import Base
+from app.models.resume_text import ResumeText
 
 
 class Resume(Base):
@@ -14,7 +16,24 @@ class Resume(Base):
 
     experience_years = Column(Integer, nullable=True)
     skills = Column(Text, nullable=True)  # comma-separated
+    # near-duplicate of this stored resume: its embedding and skills were reused
+    duplicate_of = Column(Integer, ForeignKey("resumes.id"), nullable=True)
 
-    raw_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    # compressed text lives in resume_texts; never joined unless asked for
+    text_blob = relationship(
+        ResumeText,
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    @property
+    def raw_text(self) -> str | None:
+        return self.text_blob.text if self.text_blob is not None else None
+
+    @raw_text.setter
+    def raw_text(self, value: str) -> None:
+        self.text_blob = ResumeText.from_text(value or "")
\ No newline at end of file
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, String, LargeBinary, ForeignKey, Index, JSON
+from app.db.base import Base
+
+
+class ResumeFingerprint(Base):
+    """
+    MinHash signature of a stored resume's text, plus what a near-duplicate
+    reuses instead of running the pipeline again: the embedding (float32
+    bytes), keyword skills and experience. Written for resumes that were
+    not near-duplicates themselves (see services/dedup.py).
+    """
+    __tablename__ = "resume_fingerprints"
+
+    resume_id = Column(
+        Integer,
+        ForeignKey("resumes.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    signature = Column(LargeBinary, nullable=False)  # uint32 per permutation
+
+    embedding_model = Column(String, nullable=False)  # chunking.DOCUMENT_EMBEDDING
+    embedding = Column(LargeBinary, nullable=False)
+    skills = Column(JSON, nullable=False)
+    taxonomy_version = Column(String, nullable=True)
+    experience_years = Column(Float, nullable=True)
+
+
+class ResumeLshBucket(Base):
+    """
+    LSH index over ResumeFingerprint: one row per signature band, keyed by
+    a hash of (band number, band values). Resumes of the same user sharing
+    any bucket are near-duplicate candidates.
+    """
+    __tablename__ = "resume_lsh_buckets"
+    __table_args__ = (
+        # lookups never cross users
+        Index("ix_resume_lsh_buckets_user_bucket", "user_id", "bucket"),
+    )
+
+    resume_id = Column(
+        Integer,
+        ForeignKey("resumes.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    bucket = Column(BigInteger, primary_key=True)
+    # whose ranking run stored the resume; NULL (unknown owner) never matches
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
@@ -0,0 +1,46 @@
+import hashlib
+import zlib
+
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey
+from app.db.base import Base
+
+CODEC_ZLIB = "zlib"
+
+
+class ResumeText(Base):
+    """
+    Extracted resume text, zlib-compressed and kept out of the hot
+    `resumes` table. Loaded only when a caller asks for Resume.raw_text.
+    """
+    __tablename__ = "resume_texts"
+
+    resume_id = Column(
+        Integer,
+        ForeignKey("resumes.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    content_hash = Column(String(64), index=True, nullable=False)
+    codec = Column(String(10), nullable=False, default=CODEC_ZLIB)
+    size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    @staticmethod
+    def pack(text: str) -> dict:
+        """Column values for storing `text` (without resume_id)."""
+        raw = text.encode("utf-8")
+        return {
+            "content_hash": hashlib.sha256(raw).hexdigest(),
+            "codec": CODEC_ZLIB,
+            "size": len(raw),
+            "data": zlib.compress(raw, 6)
+        }
+
+    @classmethod
+    def from_text(cls, text: str) -> "ResumeText":
+        return cls(**cls.pack(text))
+
+    @property
+    def text(self) -> str:
+        if self.codec != CODEC_ZLIB:
+            raise ValueError(f"Unsupported resume text codec: {self.codec}")
+        return zlib.decompress(self.data).decode("utf-8")
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class RecruiterFeedback(BaseModel):
@@ -12,14 +12,30 @@ class RecruiterFeedback(BaseModel):
 class RankedCandidate(BaseModel):
     filename: str
     semantic_score: float = Field(..., ge=0, le=100)
+    skill_match_score: Optional[float] = Field(None, ge=0, le=100)
+    experience_score: Optional[float] = Field(None, ge=0, le=100)
     final_score: float = Field(..., ge=0, le=100)
     matched_skills: List[str]
     missing_skills: List[str]
     feedback: RecruiterFeedback
+    duplicate_of: Optional[int] = None
 
 
 class RankAndScoreResponse(BaseModel):
     session_id: int
     job_description: str
     total_resumes: int
-    ranked_candidates: List[RankedCandidate]
\ No newline at end of file
+    ranked_candidates: List[RankedCandidate]
+
+
+class ScoreWeights(BaseModel):
+    semantic: float = Field(0.5, ge=0)
+    skill: float = Field(0.3, ge=0)
+    experience: float = Field(0.2, ge=0)
+
+    @model_validator(mode="after")
+    def _not_all_zero(self):
+        # nothing to normalize by: every candidate would score 0
+        if self.semantic + self.skill + self.experience <= 0:
+            raise ValueError("At least one weight must be greater than 0")
+        return self
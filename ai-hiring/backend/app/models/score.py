@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.base import Base
@@ -7,6 +7,10 @@ from sqlalchemy import JSON
 
 class ResumeJobScore(Base):
     __tablename__ = "resume_job_scores"
+    __table_args__ = (
+        # per-session aggregates and score-ordered candidate pages
+        Index("ix_resume_job_scores_session_final", "session_id", "final_score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,6 +19,8 @@ class ResumeJobScore(Base):
     session_id = Column(Integer, ForeignKey("ranking_sessions.id"), nullable=True)
 
     semantic_score = Column(Float)
+    skill_match_score = Column(Float, nullable=True)
+    experience_score = Column(Float, nullable=True)
     final_score = Column(Float)
     matched_skills = Column(Text)
     missing_skills = Column(Text)
@@ -1,88 +1,270 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.dependencies import get_db
+import base64
+import binascii
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from app.db.dependencies import get_async_db
 from app.auth.dependencies import get_current_user
 from app.models.ranking_session import RankingSession
+from app.models.score import ResumeJobScore
+from app.models.resume import Resume
+from app.models.schemas import ScoreWeights
+from app.services.scoring import reweight_scores, verdict_for_score
 
 router = APIRouter()
 
+HISTORY_PAGE_SIZE = 50
+DETAIL_PAGE_SIZE = 200
+
+
+def _encode_cursor(created_at: datetime, session_id: int) -> str:
+    """
+    Opaque, URL-safe token (the raw timestamp has ':' and '+', which break
+    when pasted into ?cursor= unencoded).
+    """
+    raw = f"{created_at.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, session_id = raw.rsplit("|", 1)
+        c_created_at, c_id = datetime.fromisoformat(created_at), int(session_id)
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # SQLite hands back naive (UTC) timestamps
+    if c_created_at.tzinfo is None:
+        c_created_at = c_created_at.replace(tzinfo=timezone.utc)
+    return c_created_at, c_id
+
+
+def _split_skills(value: str | None) -> list[str]:
+    return value.split(", ") if value else []
+
+
 @router.get("/history")
-def get_history(
-    db: Session = Depends(get_db),
+async def get_history(
+    response: Response,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=200),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    sessions = (
-        db.query(RankingSession)
-        .filter(RankingSession.user_id == current_user.id)
-        .order_by(RankingSession.created_at.desc())
-        .all()
+    """
+    Reads the denormalized session summary: one indexed range scan per page,
+    keyset-paginated on (created_at, id). The cursor for the next page is
+    returned in the X-Next-Cursor header.
+    """
+    stmt = (
+        select(
+            RankingSession.id,
+            RankingSession.created_at,
+            func.substr(RankingSession.job_description, 1, 200).label("jd_preview"),
+            RankingSession.job_title,
+            RankingSession.status,
+            RankingSession.candidate_count,
+            RankingSession.top_score,
+            RankingSession.mean_score
+        )
+        .where(RankingSession.user_id == current_user.id)
+        .order_by(RankingSession.created_at.desc(), RankingSession.id.desc())
+        .limit(limit + 1)
     )
 
+    if cursor:
+        c_created_at, c_id = _decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                RankingSession.created_at < c_created_at,
+                and_(
+                    RankingSession.created_at == c_created_at,
+                    RankingSession.id < c_id
+                )
+            )
+        )
+
+    rows = (await db.execute(stmt)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            rows[-1].created_at, rows[-1].id
+        )
+
     return [
         {
-            "session_id": s.id,
-            "created_at": s.created_at,
-            "job_description": s.job_description[:200] + "...",
-            "total_candidates": len(s.scores),
-            "top_score": max([sc.final_score for sc in s.scores]) if s.scores else 0
+            "session_id": r.id,
+            "created_at": r.created_at,
+            "job_description": r.jd_preview + "...",
+            "job_title": r.job_title,
+            "status": r.status,
+            "total_candidates": r.candidate_count,
+            "top_score": r.top_score or 0,
+            "mean_score": r.mean_score
         }
-        for s in sessions
+        for r in rows
     ]
 
 @router.get("/history/{session_id}")
-def get_history_detail(
+async def get_history_detail(
     session_id: int,
-    db: Session = Depends(get_db),
+    limit: int = Query(DETAIL_PAGE_SIZE, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     session = (
-        db.query(RankingSession)
-        .filter(
-            RankingSession.id == session_id,
-            RankingSession.user_id == current_user.id
+        await db.execute(
+            select(
+                RankingSession.id,
+                RankingSession.created_at,
+                RankingSession.job_description,
+                RankingSession.job_title,
+                RankingSession.status,
+                RankingSession.candidate_count
+            )
+            .where(
+                RankingSession.id == session_id,
+                RankingSession.user_id == current_user.id
+            )
         )
-        .first()
-    )
+    ).first()
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
+    # resume is joined in the same query with only its filename loaded
+    # (raw_text is never fetched)
+    scores = (
+        await db.scalars(
+            select(ResumeJobScore)
+            .options(
+                joinedload(ResumeJobScore.resume)
+                .load_only(Resume.id, Resume.filename)
+            )
+            .where(ResumeJobScore.session_id == session_id)
+            .order_by(ResumeJobScore.final_score.desc(), ResumeJobScore.id)
+            .limit(limit)
+            .offset(offset)
+        )
+    ).all()
+
     return {
         "session_id": session.id,
         "created_at": session.created_at,
         "job_description": session.job_description,
+        "job_title": session.job_title,
+        "status": session.status,
+        "total_candidates": session.candidate_count,
+        "offset": offset,
+        "limit": limit,
         "ranked_candidates": [
             {
                 "filename": score.resume.filename,
                 "semantic_score": score.semantic_score,
+                "skill_match_score": score.skill_match_score,
+                "experience_score": score.experience_score,
                 "final_score": score.final_score,
-                "matched_skills": score.matched_skills.split(", "),
-                "missing_skills": score.missing_skills.split(", "),
+                "matched_skills": _split_skills(score.matched_skills),
+                "missing_skills": _split_skills(score.missing_skills),
                 "feedback": score.feedback
             }
-            for score in session.scores
+            for score in scores
         ]
     }
 
 @router.delete("/history/{session_id}")
-def delete_history_session(
+async def delete_history_session(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    session = (
-        db.query(RankingSession)
-        .filter(
+    session = await db.scalar(
+        select(RankingSession)
+        .options(selectinload(RankingSession.scores))
+        .where(
             RankingSession.id == session_id,
             RankingSession.user_id == current_user.id
         )
-        .first()
     )
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
+
+    return {"message": "History deleted successfully"}
+
+@router.post("/history/{session_id}/reweight")
+async def reweight_session(
+    session_id: int,
+    weights: ScoreWeights,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Re-rank a stored session with new weights using the persisted
+    score components (no parsing or embedding is re-run).
+    """
+    exists = await db.scalar(
+        select(RankingSession.id)
+        .where(
+            RankingSession.id == session_id,
+            RankingSession.user_id == current_user.id
+        )
+    )
 
-    return {"message": "History deleted successfully"}
\ No newline at end of file
+    if not exists:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    rows = (
+        await db.execute(
+            select(
+                ResumeJobScore.id,
+                Resume.filename,
+                ResumeJobScore.semantic_score,
+                ResumeJobScore.skill_match_score,
+                ResumeJobScore.experience_score,
+                ResumeJobScore.matched_skills,
+                ResumeJobScore.missing_skills
+            )
+            .join(Resume, Resume.id == ResumeJobScore.resume_id)
+            .where(ResumeJobScore.session_id == session_id)
+        )
+    ).all()
+
+    components = np.array(
+        [[r.semantic_score, r.skill_match_score, r.experience_score] for r in rows],
+        dtype=float
+    )
+    final_scores = reweight_scores(components, weights.model_dump())
+    order = np.argsort(-final_scores, kind="stable") if len(rows) else []
+
+    ranked = []
+    for i in order:
+        r = rows[i]
+        final_score = float(final_scores[i])
+        ranked.append({
+            "score_id": r.id,
+            "filename": r.filename,
+            "semantic_score": r.semantic_score,
+            "skill_match_score": r.skill_match_score,
+            "experience_score": r.experience_score,
+            "final_score": final_score,
+            "verdict": verdict_for_score(final_score)[0],
+            "matched_skills": _split_skills(r.matched_skills),
+            "missing_skills": _split_skills(r.missing_skills)
+        })
+
+    return {
+        "session_id": session_id,
+        "weights": weights.model_dump(),
+        "total_candidates": len(ranked),
+        "ranked_candidates": ranked
+    }
@@ -0,0 +1,213 @@
+import os
+import shutil
+import uuid
+from typing import List
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.core.exceptions import FileProcessingError, RateLimitedError
+from app.core.metrics import stage_timer
+from app.db.dependencies import get_async_db
+from app.models.ranking_job import (
+    RankingJob,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED
+)
+from app.models.schemas import RankAndScoreResponse
+from app.services.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    find_recent_job,
+    load_ranked_candidates,
+    request_key
+)
+from app.services.ranking_worker import job_upload_dir, ranking_worker_pool
+from app.services.scheduling import BULK_MAX_PENDING_JOBS, BULK_RETRY_AFTER_SECONDS
+
+router = APIRouter()
+
+
+def _save_job_uploads(dest_dir: str, files: List[UploadFile]) -> List[dict]:
+    """Blocking file I/O: call it through run_in_threadpool."""
+    os.makedirs(dest_dir, exist_ok=True)
+    uploads = []
+    for idx, file in enumerate(files):
+        filename = os.path.basename(file.filename)
+        dest_path = os.path.join(dest_dir, f"{idx}_{filename}")
+        with open(dest_path, "wb") as f:
+            shutil.copyfileobj(file.file, f)
+        uploads.append({"filename": filename, "path": dest_path})
+    return uploads
+
+
+async def _get_owned_job(db: AsyncSession, job_id: str, user_id: int) -> RankingJob:
+    job = await db.scalar(
+        select(RankingJob)
+        .where(RankingJob.id == job_id, RankingJob.user_id == user_id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _job_links(job: RankingJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "status_url": f"/api/rank_and_score/jobs/{job.id}",
+        "result_url": f"/api/rank_and_score/jobs/{job.id}/result"
+    }
+
+
+# -------------------------------------------------
+# Submit a background rank & score job
+# -------------------------------------------------
+
+@router.post("/rank_and_score/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_ranking_job(
+    request: Request,
+    response: Response,
+    jd_text: str = Form(...),
+    required_experience: float = Form(None),
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Store the uploads and queue the pipeline; returns immediately.
+    Poll the status URL, then fetch the result URL once completed.
+    Re-submitting the same request within the TTL returns the existing
+    job (200, `Idempotent-Replayed: true`) instead of queueing another.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No resumes uploaded")
+
+    if not jd_text or not jd_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Job description cannot be empty"
+        )
+
+    # hashes every upload: off the event loop
+    key, request_hash = await run_in_threadpool(
+        request_key, jd_text, files, required_experience,
+        client_key=request.headers.get(IDEMPOTENCY_HEADER)
+    )
+    existing = await find_recent_job(db, current_user.id, key, request_hash)
+    if existing is not None:
+        response.status_code = status.HTTP_200_OK
+        response.headers[REPLAYED_HEADER] = "true"
+        return _job_links(existing)
+
+    pending = await db.scalar(
+        select(func.count(RankingJob.id))
+        .where(
+            RankingJob.user_id == current_user.id,
+            RankingJob.status.in_([JOB_QUEUED, JOB_RUNNING])
+        )
+    )
+    if pending >= BULK_MAX_PENDING_JOBS:
+        raise RateLimitedError(
+            f"{pending} ranking jobs already pending",
+            retry_after=BULK_RETRY_AFTER_SECONDS
+        )
+
+    job_id = uuid.uuid4().hex
+    dest_dir = job_upload_dir(job_id)
+    try:
+        with stage_timer("save_upload"):
+            uploads = await run_in_threadpool(_save_job_uploads, dest_dir, files)
+    except Exception:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        raise FileProcessingError("Failed to save uploaded resumes")
+
+    job = RankingJob(
+        id=job_id,
+        user_id=current_user.id,
+        jd_text=jd_text,
+        required_experience=required_experience,
+        uploads=uploads,
+        total=len(uploads),
+        request_key=key,
+        request_hash=request_hash
+    )
+    db.add(job)
+    await db.commit()
+
+    ranking_worker_pool.notify()
+
+    return _job_links(job)
+
+
+# -------------------------------------------------
+# Job status / progress
+# -------------------------------------------------
+
+@router.get("/rank_and_score/jobs/{job_id}")
+async def get_ranking_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    job = await _get_owned_job(db, job_id, current_user.id)
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "processed": job.processed,
+        "total": job.total,
+        "progress": round(job.processed / job.total * 100, 1) if job.total else 0,
+        "attempts": job.attempts,
+        "error": job.error,
+        "session_id": job.session_id,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+# -------------------------------------------------
+# Job result (same shape as /rank_and_score)
+# -------------------------------------------------
+
+@router.get(
+    "/rank_and_score/jobs/{job_id}/result",
+    response_model=RankAndScoreResponse
+)
+async def get_ranking_job_result(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    job = await _get_owned_job(db, job_id, current_user.id)
+
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    candidates = await load_ranked_candidates(db, job.session_id)
+
+    return {
+        "session_id": job.session_id,
+        "job_description": job.jd_text[:200],
+        "total_resumes": len(candidates),
+        "ranked_candidates": candidates
+    }
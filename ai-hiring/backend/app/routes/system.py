@@ -0,0 +1,117 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.auth.dependencies import get_current_user, require_admin
+from app.core import memory
+from app.services.embeddings import EmbeddingService
+from app.services.skill_taxonomy import skill_taxonomy
+
+router = APIRouter()
+
+
+# -------------------------------------------------
+# Embedding cache counters (of the worker serving the request)
+# -------------------------------------------------
+
+@router.get("/system/embedding_cache")
+async def embedding_cache_stats(current_user = Depends(get_current_user)):
+    """
+    Local LRU and shared-store hit / miss counts for this worker process;
+    with several workers, repeated calls land on different pids.
+    """
+    return EmbeddingService.cache_stats()
+
+
+# -------------------------------------------------
+# Skill taxonomy (skills.json + approved UnknownSkill rows)
+# -------------------------------------------------
+
+@router.get("/system/taxonomy")
+async def taxonomy_status(current_user = Depends(get_current_user)):
+    """Version and size of the taxonomy this worker is matching against."""
+    return skill_taxonomy.report()
+
+
+@router.post("/system/taxonomy/reload", dependencies=[Depends(require_admin)])
+async def reload_taxonomy():
+    """
+    Merge newly approved / unapproved skills into this worker's taxonomy now
+    (other workers pick them up within TAXONOMY_POLL_SECONDS).
+    """
+    try:
+        return await asyncio.to_thread(skill_taxonomy.reload)
+    except Exception as e:
+        print("Taxonomy reload failed:", e)
+        raise HTTPException(status_code=500, detail="Taxonomy reload failed")
+
+
+# -------------------------------------------------
+# Memory accounting (admin: X-Admin-Token header)
+# Per worker process, like the counters above; see app/core/memory.py
+# -------------------------------------------------
+
+@router.get("/system/memory", dependencies=[Depends(require_admin)])
+async def memory_stats():
+    """RSS, tracemalloc totals, per-stage peaks and embedding cache sizes."""
+    report = memory.memory_report()
+    report["embedding_cache"] = EmbeddingService.cache_stats()
+    return report
+
+
+@router.post("/system/memory/tracing", dependencies=[Depends(require_admin)])
+async def set_memory_tracing(
+    enabled: bool = Query(...),
+    frames: int = Query(memory.MEMORY_TRACE_FRAMES, ge=1, le=100)
+):
+    if enabled:
+        memory.start_tracing(frames)
+    else:
+        memory.stop_tracing()
+    return memory.memory_report()
+
+
+@router.get("/system/memory/snapshots", dependencies=[Depends(require_admin)])
+async def list_heap_snapshots():
+    return memory.list_snapshots()
+
+
+@router.post("/system/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_heap_snapshot(limit: int = Query(20, ge=1, le=200)):
+    """Dump a heap snapshot of this worker; returns its id and top allocation sites."""
+    try:
+        # walks every traced block: keep it off the event loop
+        return await asyncio.to_thread(memory.take_snapshot, limit)
+    except RuntimeError:
+        raise HTTPException(
+            status_code=409,
+            detail="tracemalloc is not tracing; enable it first"
+        )
+
+
+@router.get("/system/memory/snapshots/{snapshot_id}/diff", dependencies=[Depends(require_admin)])
+async def diff_heap_snapshots(
+    snapshot_id: str,
+    base: str = Query(...),
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+):
+    """Allocation sites that grew the most between `base` and this snapshot."""
+    diff = await asyncio.to_thread(memory.diff_snapshots, base, snapshot_id, limit, group_by)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return diff
+
+
+@router.get("/system/memory/snapshots/{snapshot_id}", dependencies=[Depends(require_admin)])
+async def download_heap_snapshot(snapshot_id: str):
+    """The raw snapshot, for tracemalloc.Snapshot.load()."""
+    path = memory.snapshot_path(snapshot_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=snapshot_id + memory.SNAPSHOT_SUFFIX
+    )
@@ -1,21 +1,23 @@
 import os
 import shutil
-import json
 import re
-from typing import List
-
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-
-from app.db.dependencies import get_db
+import json
+import heapq
+import asyncio
+import threading
+from typing import List, Literal
+
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dependencies import get_async_db
+from app.db.database import AsyncSessionLocal
 from app.auth.dependencies import get_current_user
 
 from app.models.resume import Resume
-from app.models.job import JobDescription
-from app.models.score import ResumeJobScore
-from app.models.ranking_session import RankingSession
-from app.models.unknown_skill import UnknownSkill
 from app.models.schemas import RankAndScoreResponse
 
 from app.services.parser import extract_text_from_file
@@ -26,25 +28,41 @@ from app.services.nlp import (
     _parse_month_year,
     extract_experience_years
 )
-from app.services.scoring import (
-    compute_similarity,
-    analyze_skill_gap,
-    rank_resumes,
-    hybrid_score,
-    generate_recruiter_feedback
-)
 from app.core.exceptions import (
+    AppException,
     FileProcessingError,
-    TextExtractionError,
-    ScoringError
+    RankingCancelled,
+    RateLimitedError,
+    TextExtractionError
 )
 from app.services.skills import (
-    get_embedding,
     match_skills,
     semantic_skill_match
 )
-from app.services.skill_utils import flatten_skills
-from app.services.embeddings import EmbeddingService
+from app.services.skill_taxonomy import skill_taxonomy
+from app.services.persistence import persist_ranking_run, count_unknown_skills
+from app.services.ranking import (
+    run_ranking_pipeline,
+    finalize_results,
+    prepare_job_description,
+    score_upload,
+    resume_row,
+    extract_job_title
+)
+from app.services.skill_tracker import unknown_skill_tracker
+from app.services.dedup import near_duplicates
+from app.core.metrics import stage_timer, timed
+from app.core.responses import with_cleanup
+from app.services.scheduling import BULK, bulk_admission, inference_priority
+from app.services.cancellation import cancellation_scope, watch_disconnect
+from app.services.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    find_recent_session,
+    inflight_requests,
+    load_ranked_candidates,
+    request_key
+)
 
 router = APIRouter()
 
@@ -56,58 +74,82 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 UPLOAD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "uploads"))
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-SKILLS_PATH = os.path.join(BASE_DIR, "data", "skills.json")
-try:
-    with open(SKILLS_PATH, "r", encoding="utf-8") as f:
-        SKILLS_LIST = json.load(f)
-except Exception:
-    SKILLS_LIST = []
+@timed("save_upload")
+def _copy_upload(file: UploadFile, dest_path: str) -> None:
+    """Blocking file I/O: call it through run_in_threadpool."""
+    with open(dest_path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
 
-FLAT_SKILLS = flatten_skills(SKILLS_LIST)
 
-# -------------------------------------------------
-# Utility: Save unknown skills safely
-# -------------------------------------------------
+def _save_uploads(files: List[UploadFile]) -> list[tuple[str, str]]:
+    """Blocking file I/O: call it through run_in_threadpool."""
+    uploads = []
+    for file in files:
+        dest_path = os.path.join(UPLOAD_DIR, file.filename)
+        try:
+            _copy_upload(file, dest_path)
+        except Exception:
+            raise FileProcessingError(f"Failed to save {file.filename}")
+        uploads.append((file.filename, dest_path))
+    return uploads
 
-def save_unknown_skills(db: Session, skills: list[str]):
-    unique_skills = {
-        s.lower().strip()
-        for s in skills
-        if s and len(s.strip()) > 2
+
+def _admit_bulk(user_id: int) -> None:
+    if not bulk_admission.try_acquire(user_id):
+        raise RateLimitedError(retry_after=bulk_admission.retry_after)
+
+
+async def _run_bulk(func, *args, cancel: threading.Event):
+    """
+    run_in_threadpool under the BULK inference priority; the worker stops at
+    its next checkpoint once `cancel` is set (see cancellation.py).
+    """
+    with inference_priority(BULK), cancellation_scope(cancel):
+        return await run_in_threadpool(func, *args)
+
+
+async def _find_replay(db: AsyncSession, user_id: int, key: str, request_hash: str):
+    """
+    session_id of an identical recent request, waiting for one that is
+    still running in this process; None if it has to be computed.
+    """
+    pending = inflight_requests.get(user_id, key, request_hash)
+    if pending is not None:
+        session_id = await asyncio.shield(pending)
+        if session_id is not None:
+            return session_id
+
+    session = await find_recent_session(db, user_id, key, request_hash)
+    return session.id if session else None
+
+
+async def _replayed_response(db: AsyncSession, session_id: int, jd_text: str) -> dict:
+    candidates = await load_ranked_candidates(db, session_id)
+    return {
+        "session_id": session_id,
+        "job_description": jd_text[:200],
+        "total_resumes": len(candidates),
+        "ranked_candidates": candidates
     }
 
-    for skill in unique_skills:
-        existing = db.query(UnknownSkill).filter_by(name=skill).first()
-        if existing:
-            existing.frequency += 1
-        else:
-            db.add(UnknownSkill(name=skill, frequency=1))
 
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
+def _validate_rank_request(jd_text: str, files: List[UploadFile]) -> None:
+    if not files:
+        raise HTTPException(status_code=400, detail="No resumes uploaded")
+
+    if not jd_text or not jd_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Job description cannot be empty"
+        )
 
 # -------------------------------------------------
 # 1️⃣ Upload & parse single resume
 # -------------------------------------------------
 
-@router.post("/upload_resume")
-async def upload_resume(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    filename = file.filename
-    dest_path = os.path.join(UPLOAD_DIR, filename)
-
-    try:
-        with open(dest_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-    except Exception:
-        raise FileProcessingError("Failed to save uploaded resume")
-
+def _parse_single_resume(path: str) -> dict:
     try:
-        text = extract_text_from_file(dest_path)
+        text = extract_text_from_file(path)
     except Exception:
         raise TextExtractionError()
 
@@ -117,28 +159,55 @@ async def upload_resume(
     )
     phones = re.findall(r"\+?\d[\d\-\s]{7,}\d", text)
 
-    name = extract_name(text, SKILLS_LIST)
-    exp_years = extract_experience_years(text)
+    taxonomy = skill_taxonomy.current
+    keyword_skills = match_skills(text, taxonomy.skills)
+    semantic_skills = semantic_skill_match(text, taxonomy.skills)
+
+    return {
+        "text": text,
+        "emails": emails,
+        "phones": phones,
+        "name": extract_name(text, taxonomy.categories),
+        "experience_years": extract_experience_years(text),
+        "resume_skills": list(set(keyword_skills + semantic_skills))
+    }
+
+
+@router.post("/upload_resume")
+async def upload_resume(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    filename = file.filename
+    dest_path = os.path.join(UPLOAD_DIR, filename)
+
+    try:
+        with stage_timer("save_upload"):
+            await run_in_threadpool(_copy_upload, file, dest_path)
+    except Exception:
+        raise FileProcessingError("Failed to save uploaded resume")
 
-    keyword_skills = match_skills(text, FLAT_SKILLS)
-    semantic_skills = semantic_skill_match(text, FLAT_SKILLS)
-    resume_skills = list(set(keyword_skills + semantic_skills))
+    # interactive priority (the default): ahead of bulk rankings for OCR
+    # slots and embedding batches, and off the event loop while it waits
+    parsed = await run_in_threadpool(_parse_single_resume, dest_path)
+    name = parsed["name"]
+    exp_years = parsed["experience_years"]
+    resume_skills = parsed["resume_skills"]
 
-    save_unknown_skills(db, resume_skills)
+    unknown_skill_tracker.add(resume_skills)
 
     resume_record = Resume(
         filename=filename,
         name=name,
-        email=emails[0] if emails else None,
-        phone=phones[0] if phones else None,
+        email=parsed["emails"][0] if parsed["emails"] else None,
+        phone=parsed["phones"][0] if parsed["phones"] else None,
         experience_years=exp_years,
         skills=", ".join(resume_skills),
-        raw_text=text
+        raw_text=parsed["text"]
     )
 
     db.add(resume_record)
-    db.commit()
-    db.refresh(resume_record)
+    await db.commit()
 
     return {
         "id": resume_record.id,
@@ -157,170 +226,260 @@ async def upload_resume(
     response_model=RankAndScoreResponse
 )
 async def rank_and_score_resumes(
+    request: Request,
+    response: Response,
     jd_text: str = Form(...),
     required_experience: float = Form(None),
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    if not files:
-        raise HTTPException(status_code=400, detail="No resumes uploaded")
-
-    # --- Create Job ---
-    job_title = "Untitled Job Description"
-    for line in jd_text.splitlines():
-        if "job title" in line.lower():
-            job_title = line.split(":", 1)[-1].strip()
-            break
-
-    job = JobDescription(
-        title=job_title,
-        description=jd_text,
-        required_experience=required_experience
-    )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    # --- Create Session ---
-    session = RankingSession(
-        user_id=current_user.id,
-        job_description=jd_text
+    """
+    Repeats of the same request (same Idempotency-Key header, or same JD,
+    files and required_experience) within the TTL return the stored session
+    with an `Idempotent-Replayed: true` header. An Idempotency-Key reused
+    with a different request is rejected with 422.
+    """
+    _validate_rank_request(jd_text, files)
+
+    user_id = current_user.id
+    # hashes every upload: off the event loop
+    key, request_hash = await run_in_threadpool(
+        request_key, jd_text, files, required_experience,
+        client_key=request.headers.get(IDEMPOTENCY_HEADER)
     )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
 
-    # --- JD embedding (ONCE) ---
-    if not jd_text or not jd_text.strip():
-        raise HTTPException(
-            status_code=400,
-            detail="Job description cannot be empty"
-        )
+    replay_id = await _find_replay(db, user_id, key, request_hash)
+    if replay_id is not None:
+        response.headers[REPLAYED_HEADER] = "true"
+        return await _replayed_response(db, replay_id, jd_text)
+
+    _admit_bulk(user_id)
+    inflight_requests.start(user_id, key, request_hash)
+    session_id = None
+
+    # stop parsing / OCR / embedding if the recruiter closes the tab
+    cancel = threading.Event()
+    watcher = asyncio.create_task(watch_disconnect(request, cancel))
 
     try:
-        jd_vec = EmbeddingService.encode([jd_text])[0]
-    except Exception as e:
-        print("JD embedding failed:", e)
-        raise ScoringError("Failed to process job description")
-    
-    jd_keyword_skills = match_skills(jd_text, FLAT_SKILLS)
-    jd_semantic_skills = semantic_skill_match(jd_text, FLAT_SKILLS)
-    jd_skills = list(set(jd_keyword_skills + jd_semantic_skills))
-
-    results = []
-
-    # 🔹 STEP 4A: collectors
-    resume_texts = []
-    resume_files = []
-    resume_meta = []
-
-    # -------------------------------
-    # PASS 1: parse + store resumes
-    # -------------------------------
-    for file in files:
-        dest_path = os.path.join(UPLOAD_DIR, file.filename)
+        uploads = await run_in_threadpool(_save_uploads, files)
+
+        # CPU-bound parse / embed / score runs off the event loop
+        run = await _run_bulk(
+            run_ranking_pipeline,
+            jd_text,
+            required_experience,
+            uploads,
+            near_duplicates.for_user(user_id),
+            cancel=cancel
+        )
 
         try:
-            with open(dest_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            resume_text = extract_text_from_file(dest_path)
+            job_id, new_session_id, _ = await db.run_sync(
+                persist_ranking_run,
+                user_id,
+                jd_text,
+                run["job_title"],
+                required_experience,
+                run["resume_rows"],
+                run["score_rows"],
+                key,
+                request_hash
+            )
+            if cancel.is_set():
+                raise RankingCancelled()
+            await db.commit()
+            session_id = new_session_id
         except Exception:
-            raise TextExtractionError(f"Failed processing {file.filename}")
+            await db.rollback()
+            raise
+    finally:
+        watcher.cancel()
+        bulk_admission.release(user_id)
+        inflight_requests.finish(user_id, key, session_id)
 
-        experience_years = extract_experience_years(resume_text)
+    unknown_skill_tracker.add_counts(run["skill_counts"])
 
-        resume_skills = match_skills(resume_text, FLAT_SKILLS)
+    results = finalize_results(run["results"], run["resume_rows"])
 
-        save_unknown_skills(db, resume_skills)
+    return {
+        "session_id": session_id,
+        "job_description": jd_text[:200],
+        "total_resumes": len(results),
+        "ranked_candidates": results
+    }
 
-        resume = Resume(
-            filename=f"{job.id}_{file.filename}",
-            experience_years=experience_years,
-            skills=", ".join(resume_skills),
-            raw_text=resume_text
-        )
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
-
-        resume_texts.append(resume_text)
-        resume_files.append(file)
-        resume_meta.append({
-            "resume": resume,
-            "resume_skills": resume_skills,
-            "experience_years": experience_years
-        })
-
-    # -------------------------------
-    # PASS 2: batch embeddings
-    # -------------------------------
-    resume_embeddings = EmbeddingService.encode(resume_texts)
-
-    # -------------------------------
-    # PASS 3: scoring + persistence
-    # -------------------------------
-    for idx, meta in enumerate(resume_meta):
-        resume = meta["resume"]
-        resume_skills = meta["resume_skills"]
-        experience_years = meta["experience_years"]
-
-        semantic_score = compute_similarity(
-            resume_embeddings[idx],
-            jd_vec
-        )
 
-        final_score = hybrid_score(
-            semantic_score=semantic_score,
-            resume_skills=resume_skills,
-            jd_text=jd_text,
-            resume_experience=experience_years,
-            required_experience=required_experience,
-            skills_master=SKILLS_LIST
-        )
+# -------------------------------------------------
+# 3️⃣ Rank & score with streamed results
+# -------------------------------------------------
 
-        gap = {
-            "matched_skills": sorted(set(resume_skills) & set(jd_skills)),
-            "missing_skills": sorted(set(jd_skills) - set(resume_skills)),
-        }
-
-        feedback = generate_recruiter_feedback(
-            final_score=final_score,
-            matched_skills=gap["matched_skills"],
-            missing_skills=gap["missing_skills"],
-            resume_experience=experience_years,
-            required_experience=required_experience
-        )
+def _stream_event(fmt: str, event: str, data: dict) -> str:
+    payload = json.dumps(jsonable_encoder(data))
+    if fmt == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, **jsonable_encoder(data)}) + "\n"
 
-        score = ResumeJobScore(
-            resume_id=resume.id,
-            job_id=job.id,
-            session_id=session.id,
-            semantic_score=semantic_score,
-            final_score=final_score,
-            matched_skills=", ".join(gap["matched_skills"]),
-            missing_skills=", ".join(gap["missing_skills"]),
-            verdict=feedback["verdict"],
-            feedback=feedback
+
+@router.post("/rank_and_score/stream")
+async def rank_and_score_stream(
+    request: Request,
+    jd_text: str = Form(...),
+    required_experience: float = Form(None),
+    files: List[UploadFile] = File(...),
+    format: Literal["ndjson", "sse"] = Query("ndjson"),
+    top_k: int = Query(5, ge=1, le=50),
+    snapshot_every: int = Query(5, ge=1),
+    current_user = Depends(get_current_user)
+):
+    """
+    Same pipeline as /rank_and_score, but each candidate is emitted as soon
+    as it is scored. Events, in order:
+      start     {"total"}
+      candidate {"index", "candidate"}            (one per resume)
+      top_k     {"scored", "candidates"}          (every `snapshot_every`)
+      done      {"session_id", "total_resumes", "ranked_candidates"}
+      error     {"detail"}                        (stream ends)
+    Candidates are identified by their uploaded filename in both candidate
+    and done events. Everything is persisted in one transaction after the
+    last candidate; nothing is persisted if the client disconnects first. A memoized repeat
+    (see /rank_and_score) replays start, candidate and done events.
+    """
+    _validate_rank_request(jd_text, files)
+
+    user_id = current_user.id
+    # hashes every upload: off the event loop
+    key, request_hash = await run_in_threadpool(
+        request_key, jd_text, files, required_experience,
+        client_key=request.headers.get(IDEMPOTENCY_HEADER)
+    )
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    stream_headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    async with AsyncSessionLocal() as db:
+        session = await find_recent_session(db, user_id, key, request_hash)
+        replay = await _replayed_response(db, session.id, jd_text) if session else None
+
+    if replay is not None:
+        async def replay_events():
+            yield _stream_event(format, "start", {"total": replay["total_resumes"]})
+            for idx, candidate in enumerate(replay["ranked_candidates"]):
+                yield _stream_event(format, "candidate", {
+                    "index": idx,
+                    "candidate": candidate
+                })
+            yield _stream_event(format, "done", replay)
+
+        return StreamingResponse(
+            replay_events(),
+            media_type=media_type,
+            headers={**stream_headers, REPLAYED_HEADER: "true"}
         )
-        
-        db.add(score)
-        db.commit()
 
-        results.append({
-            "filename": resume.filename,
-            "semantic_score": round(semantic_score, 2),
-            "final_score": round(final_score, 2),
-            "matched_skills": gap["matched_skills"],
-            "missing_skills": gap["missing_skills"],
-            "feedback": feedback
-        })
+    _admit_bulk(user_id)
+    cancel = threading.Event()
 
-    results.sort(key=lambda x: x["final_score"], reverse=True)
+    def release() -> None:
+        # runs even if the body is never iterated: the client may be gone
+        # before the first chunk, and then events() never starts
+        cancel.set()
+        bulk_admission.release(user_id)
 
-    return {
-        "session_id": session.id,
-        "job_description": jd_text[:200],
-        "total_resumes": len(results),
-        "ranked_candidates": results
-    }
\ No newline at end of file
+    async def events():
+        total = len(files)
+        watcher = asyncio.create_task(watch_disconnect(request, cancel))
+        yield _stream_event(format, "start", {"total": total})
+
+        parsed_all, score_rows, results = [], [], []
+        top = []  # min-heap of (final_score, -index): earlier wins ties
+
+        try:
+            # written here, not before the response: nothing is left on
+            # disk for a stream that never starts
+            uploads = await run_in_threadpool(_save_uploads, files)
+            jd = await _run_bulk(prepare_job_description, jd_text, cancel=cancel)
+
+            for idx, (filename, path) in enumerate(uploads):
+                parsed, score_row, result = await _run_bulk(
+                    score_upload, jd, filename, path, required_experience,
+                    near_duplicates.for_user(user_id), cancel=cancel
+                )
+                parsed_all.append(parsed)
+                score_rows.append(score_row)
+                results.append(result)
+
+                heapq.heappush(top, (result["final_score"], -idx))
+                if len(top) > top_k:
+                    heapq.heappop(top)
+
+                yield _stream_event(format, "candidate", {
+                    "index": idx,
+                    "candidate": result
+                })
+
+                scored = idx + 1
+                if scored % snapshot_every == 0 and scored < total:
+                    yield _stream_event(format, "top_k", {
+                        "scored": scored,
+                        "candidates": [
+                            results[-neg_idx]
+                            for _, neg_idx in sorted(top, reverse=True)
+                        ]
+                    })
+
+            if cancel.is_set():
+                raise RankingCancelled()
+
+            resume_rows = [resume_row(p) for p in parsed_all]
+
+            async with AsyncSessionLocal() as db:
+                try:
+                    _, session_id, _ = await db.run_sync(
+                        persist_ranking_run,
+                        user_id,
+                        jd_text,
+                        extract_job_title(jd_text),
+                        required_experience,
+                        resume_rows,
+                        score_rows,
+                        key,
+                        request_hash
+                    )
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+
+            unknown_skill_tracker.add_counts(
+                count_unknown_skills(p["resume_skills"] for p in parsed_all)
+            )
+
+            # uploaded filenames, as in the candidate events (not the
+            # job-prefixed names finalize_results copies from resume_rows)
+            ranked = sorted(results, key=lambda x: x["final_score"], reverse=True)
+            yield _stream_event(format, "done", {
+                "session_id": session_id,
+                "job_description": jd_text[:200],
+                "total_resumes": len(ranked),
+                "ranked_candidates": ranked
+            })
+
+        except RankingCancelled:
+            print("Streaming rank cancelled after client disconnect")
+        except AppException as e:
+            yield _stream_event(format, "error", {"detail": e.detail})
+        except Exception as e:
+            print("Streaming rank failed:", e)
+            yield _stream_event(format, "error", {"detail": "Ranking failed"})
+        finally:
+            # also reached when starlette tears the stream down mid-file:
+            # the worker thread still running score_upload stops at its
+            # next checkpoint
+            cancel.set()
+            watcher.cancel()
+
+    return with_cleanup(
+        StreamingResponse(events(), media_type=media_type, headers=stream_headers),
+        release
+    )
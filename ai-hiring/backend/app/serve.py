@@ -0,0 +1,96 @@
+"""
+backend/app/serve.py
+
+Pre-fork serving mode: `python -m app.serve`
+- A gunicorn master imports the app once, loads and warms MiniLM (plus the
+  skill-vocabulary embeddings) and spaCy, then forks WEB_WORKERS uvicorn
+  workers that inherit the models copy-on-write
+- gc.freeze() after warm-up moves everything allocated so far into the
+  permanent generation, so the workers' collectors never walk (and write
+  to) the shared pages
+- The master runs torch with 1 thread, so no OpenMP pool exists at fork
+  time; each worker then sets TORCH_THREADS_PER_WORKER intra-op threads
+  (default cpu_count // WEB_WORKERS) to avoid oversubscribing the CPUs
+- Nothing that starts a thread runs before the fork: warm-up encodes on
+  the calling thread, and the embedding batcher, ranking worker pool and
+  skill flush task all start per worker (lifespan). A forked child also
+  drops any batcher it inherited (embeddings.py, os.register_at_fork)
+- Bulk admission and OCR limits (services/scheduling.py) are per worker:
+  the server as a whole admits WEB_WORKERS times BULK_MAX_INFLIGHT
+
+`uvicorn app.main:app --workers N` (spawn, one model copy per worker) keeps
+working; see benchmarks/prefork.py for the memory / throughput comparison.
+"""
+
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 2))
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 300))
+TORCH_THREADS_PER_WORKER = int(
+    os.getenv("TORCH_THREADS_PER_WORKER", 0)
+) or max(1, (os.cpu_count() or 1) // WEB_WORKERS)
+
+
+def _set_torch_threads(n: int) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(n)
+
+
+def post_fork(server, worker) -> None:
+    gc.enable()
+    _set_torch_threads(TORCH_THREADS_PER_WORKER)
+
+    # connections must not be shared across processes
+    from app.db.database import engine, async_engine
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+class PreforkApplication(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # no collections while the long-lived objects are being built
+        gc.disable()
+        _set_torch_threads(1)
+
+        from app.main import app
+        from app.services.warmup import preload_models
+        preload_models()
+
+        gc.collect()
+        gc.freeze()
+        return app
+
+
+def main():
+    options = {
+        "bind": WEB_BIND,
+        "workers": WEB_WORKERS,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": WEB_TIMEOUT,
+        "post_fork": post_fork,
+    }
+    print(
+        f"Pre-fork serving on {WEB_BIND}: {WEB_WORKERS} workers, "
+        f"{TORCH_THREADS_PER_WORKER} torch thread(s) each"
+    )
+    PreforkApplication(options).run()
+
+
+if __name__ == "__main__":
+    main()
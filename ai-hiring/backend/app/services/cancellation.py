@@ -0,0 +1,78 @@
+"""
+backend/app/services/cancellation.py
+
+Cooperative cancellation for ranking work.
+- A route creates a threading.Event, runs the pipeline inside
+  cancellation_scope(event) and sets the event when the client goes away
+- The event travels in a ContextVar (copied into threadpool workers like the
+  priority class in scheduling.py), so the pipeline, the parser and the OCR
+  page loop can call raise_if_cancelled() between units of work
+- Work already inside a forward pass or a tesseract call finishes; nothing
+  after the next checkpoint runs
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.exceptions import RankingCancelled
+
+DISCONNECT_POLL_SECONDS = 0.5
+
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar(
+    "cancel_event", default=None
+)
+
+
+@contextmanager
+def cancellation_scope(event: threading.Event) -> Iterator[threading.Event]:
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def is_cancelled() -> bool:
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def raise_if_cancelled() -> None:
+    if is_cancelled():
+        raise RankingCancelled()
+
+
+def wait_future(future: Future, poll: float = 0.05):
+    """
+    future.result(), but gives up (and cancels the future, so a queue such
+    as EmbeddingBatcher can drop it) once the current scope is cancelled.
+    """
+    event = _cancel_event.get()
+    if event is None:
+        return future.result()
+
+    while True:
+        try:
+            return future.result(timeout=poll)
+        except FutureTimeout:
+            if event.is_set():
+                future.cancel()
+                raise RankingCancelled()
+
+
+async def watch_disconnect(
+    request,
+    event: threading.Event,
+    interval: float = DISCONNECT_POLL_SECONDS
+) -> None:
+    """Set `event` once the client disconnects; run as a task, cancel when done."""
+    while not event.is_set():
+        if await request.is_disconnected():
+            print("Client disconnected; cancelling ranking")
+            event.set()
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,262 @@
+"""
+backend/app/services/chunking.py
+
+Chunked embedding of long documents (resumes, job descriptions).
+all-MiniLM-L6-v2 truncates its input at max_seq_length (256) word pieces,
+so encoding a multi-page resume whole only embeds its first half page.
+- segment_sections: splits a document at section headings (summary,
+  experience, education, skills, ...); text above the first heading is
+  "header"
+- chunk_document: packs each section's lines into chunks of at most
+  EMBED_CHUNK_TOKENS word pieces (counted with the model's tokenizer when
+  it has one); a chunk never spans two sections
+- encode_documents: all chunks of all documents go through
+  EmbeddingService.encode in one call, sorted by length, so the batcher's
+  EMBED_BATCH_MAX_TEXTS slices (and the model's own sub-batches) hold
+  chunks of similar length and pad little. Repeated chunks are encoded
+  once and hit the embedding caches like any other text
+- Chunk vectors are pooled (EMBED_CHUNK_POOLING: token-weighted "mean" or
+  element-wise "max") into a document vector and one vector per section
+- embed_documents: document vectors in the configured mode. Chunking is
+  opt-in (EMBED_CHUNKING=1): it encodes every word piece of a document
+  instead of the first 256: about 5x the forward-pass work on the
+  synthetic corpus (~1400 word pieces a resume; see
+  benchmarks/chunked_embedding.py)
+
+Stored vectors from the two modes aren't comparable: DOCUMENT_EMBEDDING
+names the mode and is what near-duplicate fingerprints are keyed on.
+"""
+
+import os
+import re
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import EMBED_DOCUMENT_CHUNKS, stage_timer
+from app.services.embeddings import EMBED_MODEL_NAME, EmbeddingService
+
+EMBED_CHUNKING = os.getenv("EMBED_CHUNKING", "0") == "1"
+EMBED_CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", 200))
+EMBED_CHUNK_POOLING = os.getenv("EMBED_CHUNK_POOLING", "mean")
+
+if EMBED_CHUNK_POOLING not in ("mean", "max"):
+    raise ValueError(f"EMBED_CHUNK_POOLING must be 'mean' or 'max', got {EMBED_CHUNK_POOLING!r}")
+
+DOCUMENT_EMBEDDING = (
+    f"{EMBED_MODEL_NAME}/chunked-{EMBED_CHUNK_POOLING}" if EMBED_CHUNKING else EMBED_MODEL_NAME
+)
+
+SECTION_HEADINGS = {
+    "summary": (
+        "summary", "professional summary", "profile", "professional profile",
+        "objective", "career objective", "about me"
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "internships", "internship"
+    ),
+    "education": ("education", "academic background", "academics", "qualifications"),
+    "skills": (
+        "skills", "technical skills", "key skills", "core competencies",
+        "technologies", "tech stack"
+    ),
+    "projects": ("projects", "personal projects", "selected projects", "key projects"),
+    "certifications": ("certifications", "certificates", "courses", "training", "awards"),
+    "languages": ("languages",),
+}
+_HEADINGS = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+_MAX_HEADING_CHARS = 40
+
+_WORD_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+# ---------------- Sections ----------------
+
+def _heading(line: str) -> Optional[str]:
+    if len(line) > _MAX_HEADING_CHARS:
+        return None
+    key = " ".join(re.sub(r"[^a-z ]", " ", line.lower()).split())
+    return _HEADINGS.get(key)
+
+
+def segment_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """
+    (section, lines) in document order; heading lines open their section
+    and stay in it. Blank lines are dropped.
+    """
+    sections: List[Tuple[str, List[str]]] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = _heading(line)
+        if section is not None or not sections:
+            sections.append((section or "header", []))
+        sections[-1][1].append(line)
+    return sections
+
+
+# ---------------- Chunks ----------------
+
+def estimate_tokens(text: str) -> int:
+    """Word pieces without a tokenizer: one per word / symbol, more for long words."""
+    return sum(1 + (len(piece) - 1) // 6 for piece in _WORD_PIECE.findall(text))
+
+
+def _token_counter() -> Callable[[List[str]], List[int]]:
+    tokenizer = getattr(EmbeddingService.get_model(), "tokenizer", None)
+    if tokenizer is None:
+        return lambda lines: [estimate_tokens(line) for line in lines]
+
+    def count(lines: List[str]) -> List[int]:
+        if not lines:
+            return []
+        ids = tokenizer(lines, add_special_tokens=False)["input_ids"]
+        return [len(i) for i in ids]
+    return count
+
+
+def chunk_token_limit() -> int:
+    """EMBED_CHUNK_TOKENS, capped by what the model reads ([CLS] / [SEP] included)."""
+    max_seq = getattr(EmbeddingService.get_model(), "max_seq_length", None)
+    if isinstance(max_seq, int) and max_seq > 2:
+        return min(EMBED_CHUNK_TOKENS, max_seq - 2)
+    return EMBED_CHUNK_TOKENS
+
+
+def _split_line(line: str, tokens: int, limit: int) -> List[Tuple[str, int]]:
+    """Cut a line longer than `limit` at word boundaries."""
+    words = line.split()
+    # scale the estimate so the pieces add up to the tokenizer's count
+    scale = tokens / max(estimate_tokens(line), 1)
+    pieces, current, size = [], [], 0.0
+    for word in words:
+        n = estimate_tokens(word) * scale
+        if current and size + n > limit:
+            pieces.append((" ".join(current), int(round(size))))
+            current, size = [], 0.0
+        current.append(word)
+        size += n
+    if current:
+        pieces.append((" ".join(current), int(round(size))))
+    return pieces
+
+
+def chunk_document(
+    text: str,
+    limit: Optional[int] = None,
+    count_tokens: Optional[Callable[[List[str]], List[int]]] = None
+) -> List[Tuple[str, str, int]]:
+    """
+    (section, chunk text, word pieces) for `text`: each section's lines
+    packed greedily into chunks of at most `limit` word pieces.
+    """
+    limit = limit or chunk_token_limit()
+    count_tokens = count_tokens or _token_counter()
+
+    sections = segment_sections(text)
+    counts = iter(count_tokens([line for _, lines in sections for line in lines]))
+
+    chunks = []
+    for section, lines in sections:
+        current, size = [], 0
+        for line in lines:
+            n = next(counts)
+            pieces = _split_line(line, n, limit) if n > limit else [(line, n)]
+            for piece, tokens in pieces:
+                if current and size + tokens > limit:
+                    chunks.append((section, "\n".join(current), size))
+                    current, size = [], 0
+                current.append(piece)
+                size += tokens
+        if current:
+            chunks.append((section, "\n".join(current), size))
+    return chunks
+
+
+# ---------------- Pooling ----------------
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def pool(vectors: np.ndarray, weights: np.ndarray, pooling: str = EMBED_CHUNK_POOLING) -> np.ndarray:
+    """Unit-length pooled vector of (unit-normalized) chunk vectors."""
+    vectors = _l2_normalize(np.asarray(vectors, dtype=np.float32))
+    if pooling == "max":
+        pooled = vectors.max(axis=0)
+    else:
+        pooled = np.average(vectors, axis=0, weights=np.maximum(weights, 1))
+    return _l2_normalize(pooled).astype(np.float32)
+
+
+# ---------------- Documents ----------------
+
+def encode_documents(texts: List[str], pooling: str = EMBED_CHUNK_POOLING) -> List[dict]:
+    """
+    Embed documents chunk by chunk.
+
+    Returns:
+        one dict per text: "vector" (pooled over all chunks), "sections"
+        (section name -> pooled vector, in document order) and "chunks"
+        (how many were pooled)
+    """
+    if not texts:
+        return []
+
+    with stage_timer("chunk"):
+        limit = chunk_token_limit()
+        count_tokens = _token_counter()
+        documents = [chunk_document(text, limit, count_tokens) for text in texts]
+
+    # length buckets: shortest first, so neighbouring batches pad alike
+    lengths: dict[str, int] = {}
+    for chunks in documents:
+        for _, chunk, tokens in chunks:
+            lengths.setdefault(chunk, tokens)
+    ordered = sorted(lengths, key=lengths.get)
+    vectors = EmbeddingService.encode(ordered) if ordered else np.empty((0, 0))
+    row = {chunk: i for i, chunk in enumerate(ordered)}
+
+    results = []
+    for text, chunks in zip(texts, documents):
+        if not chunks:
+            # nothing but whitespace: same as encoding it whole
+            results.append({
+                "vector": EmbeddingService.encode([text])[0],
+                "sections": {},
+                "chunks": 0
+            })
+            continue
+
+        EMBED_DOCUMENT_CHUNKS.observe(len(chunks))
+        chunk_vectors = vectors[[row[chunk] for _, chunk, _ in chunks]]
+        weights = np.array([tokens for _, _, tokens in chunks], dtype=np.float32)
+        names = [section for section, _, _ in chunks]
+
+        sections = {}
+        for name in dict.fromkeys(names):
+            mask = np.array([n == name for n in names])
+            sections[name] = pool(chunk_vectors[mask], weights[mask], pooling)
+
+        results.append({
+            "vector": pool(chunk_vectors, weights, pooling),
+            "sections": sections,
+            "chunks": len(chunks)
+        })
+    return results
+
+
+def embed_documents(texts: List[str]) -> np.ndarray:
+    """One vector per document: chunked and pooled (EMBED_CHUNKING=1), or whole."""
+    if not EMBED_CHUNKING:
+        return EmbeddingService.encode(texts)
+    if not texts:
+        return np.array([])
+    return np.stack([doc["vector"] for doc in encode_documents(texts)])
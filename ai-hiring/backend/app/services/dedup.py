@@ -0,0 +1,203 @@
+"""
+backend/app/services/dedup.py
+
+Near-duplicate resume detection at ingest (MinHash + LSH).
+- minhash(text): signature of DEDUP_PERMUTATIONS min-hashes over word
+  shingles (DEDUP_SHINGLE words) of the normalized text; the fraction of
+  equal positions in two signatures estimates the shingle sets' Jaccard
+  similarity
+- LSH index: the signature is cut into DEDUP_BANDS bands, each hashed into
+  a bucket row (resume_lsh_buckets, indexed by owner and bucket). Resumes
+  sharing a bucket are candidates: one indexed IN lookup, no table scan.
+  With 16 bands of 4 a pair at Jaccard 0.8 shares a bucket with
+  probability > 0.999, a pair at 0.3 about 12% of the time
+- The index is per user: a lookup only sees resumes from the same user's
+  ranking runs (duplicate_of must never reveal another user's resume), so
+  callers scope the shared index with for_user()
+- Candidates are confirmed by the estimated Jaccard (>= DEDUP_THRESHOLD)
+- A near-duplicate reuses the stored resume's embedding, experience and
+  skills (skills only if matched with the current taxonomy version): no
+  extraction beyond the text, no encoding. Its Resume row records
+  duplicate_of and results carry it
+- Texts with fewer than DEDUP_MIN_SHINGLES shingles are not fingerprinted
+- Fingerprints are only stored for resumes that went through the full
+  pipeline, so every match points at an original
+
+SimHash would fit in one integer, but a Hamming bound on 64 bits misses
+most lightly edited short resumes; MinHash banding doesn't.
+"""
+
+import hashlib
+import os
+from typing import Callable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.metrics import NEAR_DUPLICATES, timed
+from app.models.resume_fingerprint import ResumeFingerprint, ResumeLshBucket
+from app.services.chunking import DOCUMENT_EMBEDDING
+from app.services.taxonomy import normalize_text
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", 3))
+DEDUP_MIN_SHINGLES = int(os.getenv("DEDUP_MIN_SHINGLES", 20))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", 50))
+
+# changing these invalidates every stored signature
+DEDUP_BANDS = 16
+DEDUP_ROWS = 4
+DEDUP_PERMUTATIONS = DEDUP_BANDS * DEDUP_ROWS
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240611)
+# h(x) = (a * x + b) mod p on 32-bit shingle hashes: a, b < 2**32 keep
+# a * x + b below 2**64
+_A = _rng.integers(1, 1 << 32, DEDUP_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, DEDUP_PERMUTATIONS, dtype=np.uint64)
+
+
+# ---------------- Signatures ----------------
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """uint32 MinHash signature of text, or None if it is too short."""
+    words = normalize_text(text).split()
+    shingles = {
+        " ".join(words[i:i + DEDUP_SHINGLE])
+        for i in range(len(words) - DEDUP_SHINGLE + 1)
+    }
+    if len(shingles) < DEDUP_MIN_SHINGLES:
+        return None
+
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest() for s in shingles),
+        dtype="<u4"
+    ).astype(np.uint64)
+    permuted = (hashes[:, None] * _A + _B) % _PRIME
+    return (permuted & 0xFFFFFFFF).min(axis=0).astype(np.uint32)
+
+
+def lsh_buckets(signature: np.ndarray) -> list[int]:
+    """One signed 64-bit bucket key per band (the band number is hashed in)."""
+    keys = []
+    for band in range(DEDUP_BANDS):
+        values = signature[band * DEDUP_ROWS:(band + 1) * DEDUP_ROWS].astype("<u4").tobytes()
+        digest = hashlib.blake2b(bytes([band]) + values, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def fingerprint_rows(
+    signature: np.ndarray,
+    embedding: np.ndarray,
+    skills: list[str],
+    taxonomy_version: Optional[str],
+    experience_years: Optional[float]
+) -> dict:
+    """resume_fingerprints values and resume_lsh_buckets keys (without resume_id)."""
+    return {
+        "fingerprint": {
+            "signature": signature.astype("<u4").tobytes(),
+            "embedding_model": DOCUMENT_EMBEDDING,
+            "embedding": np.asarray(embedding, dtype=np.float32).tobytes(),
+            "skills": list(skills),
+            "taxonomy_version": taxonomy_version,
+            "experience_years": experience_years,
+        },
+        "buckets": lsh_buckets(signature),
+    }
+
+
+# ---------------- LSH lookup ----------------
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        enabled: bool = DEDUP_ENABLED,
+        user_id: Optional[int] = None
+    ):
+        self._session_factory = session_factory
+        self._enabled = enabled
+        self.user_id = user_id
+
+    @property
+    def enabled(self) -> bool:
+        # unscoped: there are no resumes it may match against
+        return self._enabled and self.user_id is not None
+
+    def for_user(self, user_id: int) -> "NearDuplicateIndex":
+        """The same index, restricted to resumes stored for `user_id`."""
+        return NearDuplicateIndex(self._session_factory, self._enabled, user_id)
+
+    @timed("dedup_lookup")
+    def find(self, signature: Optional[np.ndarray]) -> Optional[dict]:
+        """
+        The most similar stored resume at or above DEDUP_THRESHOLD, with
+        what can be reused from it; None if there is none (or lookups fail).
+        """
+        if not self.enabled or signature is None:
+            return None
+
+        db = self._session_factory()
+        try:
+            candidate_ids = (
+                select(ResumeLshBucket.resume_id)
+                .where(
+                    ResumeLshBucket.user_id == self.user_id,
+                    ResumeLshBucket.bucket.in_(lsh_buckets(signature))
+                )
+                .distinct()
+                .limit(DEDUP_MAX_CANDIDATES)
+            )
+            candidates = db.execute(
+                select(ResumeFingerprint.resume_id, ResumeFingerprint.signature)
+                .where(
+                    ResumeFingerprint.resume_id.in_(candidate_ids),
+                    # embeddings from another model (or chunking mode) can't be mixed in
+                    ResumeFingerprint.embedding_model == DOCUMENT_EMBEDDING
+                )
+            ).all()
+
+            best = max(
+                (
+                    (similarity(signature, np.frombuffer(c.signature, dtype="<u4")), c.resume_id)
+                    for c in candidates
+                ),
+                default=None
+            )
+            if best is None or best[0] < DEDUP_THRESHOLD:
+                return None
+
+            score, resume_id = best
+            row = db.get(ResumeFingerprint, resume_id)
+            NEAR_DUPLICATES.inc()
+            return {
+                "resume_id": resume_id,
+                "similarity": round(score, 3),
+                "embedding": np.frombuffer(row.embedding, dtype=np.float32),
+                "skills": row.skills,
+                "taxonomy_version": row.taxonomy_version,
+                "experience_years": row.experience_years,
+            }
+        except Exception as e:
+            # a lookup is an optimization: fall back to the full pipeline
+            print("Near-duplicate lookup failed:", e)
+            return None
+        finally:
+            db.close()
+
+
+def _default_session_factory() -> Session:
+    from app.db.database import SessionLocal
+    return SessionLocal()
+
+
+near_duplicates = NearDuplicateIndex(_default_session_factory)
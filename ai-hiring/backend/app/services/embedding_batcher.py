@@ -0,0 +1,174 @@
+"""
+backend/app/services/embedding_batcher.py
+
+Cross-request dynamic micro-batching for embedding inference.
+- Callers (request threads, job workers, coroutines) submit a list of texts
+  and get a concurrent.futures.Future for their vectors
+- One inference thread owns the model: it takes the first pending request,
+  keeps collecting for up to EMBED_BATCH_WAIT_MS or EMBED_BATCH_MAX_TEXTS,
+  runs a single batched forward pass and fans the rows back out
+- Identical texts from different callers in one window are encoded once
+- Submissions are queued per priority class (see scheduling.py); batches
+  are filled in weighted-fair order, so a 500-resume ranking cannot starve
+  an interactive upload
+- Futures cancelled while still queued (client disconnected) are dropped
+  instead of encoded
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.scheduling import WeightedFairQueue, current_priority
+
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", 5))
+EMBED_BATCH_MAX_TEXTS = int(os.getenv("EMBED_BATCH_MAX_TEXTS", 64))
+
+
+def _combine(parts: List[Future], combined: Future) -> Future:
+    remaining = [len(parts)]
+    lock = threading.Lock()
+
+    def cancel_parts(f):
+        if f.cancelled():
+            for part in parts:
+                part.cancel()
+
+    def done(part):
+        if part.cancelled():
+            combined.cancel()
+            return
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] or combined.done():
+                return
+        errors = [p.exception() for p in parts if p.exception() is not None]
+        if errors:
+            combined.set_exception(errors[0])
+        else:
+            combined.set_result(np.concatenate([p.result() for p in parts]))
+
+    combined.add_done_callback(cancel_parts)
+    for part in parts:
+        part.add_done_callback(done)
+    return combined
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = EMBED_BATCH_WAIT_MS,
+        max_texts: int = EMBED_BATCH_MAX_TEXTS
+    ):
+        self._encode_batch = encode_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_texts = max_texts
+
+        self._pending = WeightedFairQueue()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # counters for observability
+        self.batches = 0
+        self.texts = 0
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._cond:
+            return self._pending.depths()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run,
+                        name="embedding-batcher",
+                        daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, texts: List[str], priority: Optional[str] = None) -> Future:
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0)))
+            return future
+
+        self._ensure_started()
+        priority = priority or current_priority()
+
+        # large submissions are split so other classes can interleave
+        chunks = [
+            texts[i:i + self.max_texts]
+            for i in range(0, len(texts), self.max_texts)
+        ]
+        parts = [Future() for _ in chunks]
+
+        with self._cond:
+            for chunk, part in zip(chunks, parts):
+                self._pending.push(priority, (chunk, part))
+            self._cond.notify()
+
+        if len(parts) == 1:
+            return parts[0]
+        return _combine(parts, future)
+
+    def _collect(self) -> list:
+        """Block for one request, then gather more until the window closes."""
+        batch = []
+        count = 0
+
+        with self._cond:
+            while not len(self._pending):
+                self._cond.wait()
+
+            deadline = time.perf_counter() + self.max_wait
+            while True:
+                while len(self._pending) and count < self.max_texts:
+                    cls, item = self._pending.pop()
+                    if not item[1].set_running_or_notify_cancel():
+                        continue  # cancelled while queued
+                    self._pending.charge(cls, len(item[0]))
+                    batch.append(item)
+                    count += len(item[0])
+
+                remaining = deadline - time.perf_counter()
+                if count >= self.max_texts or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            if not pending:
+                continue
+
+            unique: dict[str, int] = {}
+            for texts, _ in pending:
+                for text in texts:
+                    unique.setdefault(text, len(unique))
+
+            try:
+                vectors = self._encode_batch(list(unique))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(unique)
+
+            for texts, future in pending:
+                future.set_result(np.stack([vectors[unique[t]] for t in texts]))
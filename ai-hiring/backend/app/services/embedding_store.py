@@ -0,0 +1,165 @@
+"""
+backend/app/services/embedding_store.py
+
+Host-wide embedding cache shared by every worker process.
+- A SQLite file in WAL mode (EMBED_SHARED_CACHE_PATH): readers never block
+  each other or the writer, so lookups from all workers run in parallel
+- Sits below EmbeddingService's in-process LRU: local miss -> shared lookup
+  -> encode only what neither has, then write back to both
+- Rows are (model key, text hash) -> float32 bytes; oldest rows are pruned
+  past EMBED_SHARED_CACHE_MAX_ROWS. The model key is the model name plus a
+  fingerprint of its output (EmbeddingService.model_fingerprint), so a
+  different revision, or a stub swapped in under the same name, never
+  reads another model's vectors
+- One connection per thread and process (re-opened after fork)
+- Best effort: any SQLite error is logged and treated as a miss
+- Opt-in: set EMBED_SHARED_CACHE_PATH to a file in a directory the app
+  owns (e.g. a volume shared by the workers of one host)
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+EMBED_SHARED_CACHE_PATH = os.getenv("EMBED_SHARED_CACHE_PATH", "")
+EMBED_SHARED_CACHE_MAX_ROWS = int(os.getenv("EMBED_SHARED_CACHE_MAX_ROWS", 200000))
+
+# SQLite's default limit on host parameters is 999 on older builds
+_QUERY_CHUNK = 500
+_PRUNE_EVERY = 1000
+
+
+class SharedEmbeddingStore:
+    def __init__(self, path: str, model: str, max_rows: int = EMBED_SHARED_CACHE_MAX_ROWS):
+        self.path = path
+        self.model = model
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._since_prune = 0
+
+        # counters for this process
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+
+        found: Dict[str, np.ndarray] = {}
+        try:
+            conn = self._connect()
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                rows = conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE model = ? AND key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    [self.model, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            print("Shared embedding cache read failed:", e)
+            with self._lock:
+                self.errors += 1
+            return {}
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        if not items:
+            return
+
+        rows = [
+            (self.model, key, np.asarray(vec, dtype=np.float32).tobytes())
+            for key, vec in items
+        ]
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print("Shared embedding cache write failed:", e)
+            with self._lock:
+                self.errors += 1
+            return
+
+        with self._lock:
+            self._since_prune += len(items)
+            prune = self._since_prune >= _PRUNE_EVERY
+            if prune:
+                self._since_prune = 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop the oldest rows beyond max_rows (insertion order)."""
+        try:
+            self._connect().execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                " SELECT rowid FROM embeddings ORDER BY rowid"
+                " LIMIT max(0, (SELECT count(*) FROM embeddings) - ?))",
+                (self.max_rows,)
+            )
+        except sqlite3.Error as e:
+            print("Shared embedding cache prune failed:", e)
+
+    def stats(self) -> dict:
+        try:
+            rows = self._connect().execute(
+                "SELECT count(*) FROM embeddings WHERE model = ?", (self.model,)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            rows = None
+
+        try:
+            file_bytes = sum(
+                os.path.getsize(self.path + suffix)
+                for suffix in ("", "-wal")
+                if os.path.exists(self.path + suffix)
+            )
+        except OSError:
+            file_bytes = None
+
+        return {
+            "path": self.path,
+            "rows": rows,
+            "file_bytes": file_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
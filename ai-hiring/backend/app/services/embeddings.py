@@ -1,17 +1,124 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from functools import lru_cache
+from collections import OrderedDict
+import asyncio
 import hashlib
+import os
+import sys
+import threading
+from typing import Optional
+
+from app.core.metrics import EMBED_BATCH_SIZE, EMBEDDED_TEXTS, stage_timer
+from app.services.cancellation import wait_future
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_store import EMBED_SHARED_CACHE_PATH, SharedEmbeddingStore
+
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", 5000))
+EMBED_BATCHING = os.getenv("EMBED_BATCHING", "1") == "1"
+
+# encoded to identify the loaded model (shared cache key, taxonomy artifacts)
+PROBE_TEXT = "Senior backend engineer with Python, PostgreSQL and Kubernetes experience."
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU of text hash -> embedding.
+    Keeps its own copy of each vector: a row of a batch result is a view
+    that would keep the whole batch matrix alive for as long as any one
+    of its rows stays cached.
+    """
+    def __init__(self, maxsize: int = EMBED_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # keys + vectors, as counted by sys.getsizeof
+        self.bytes = 0
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        if value.base is not None:
+            value = value.copy()
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= sys.getsizeof(key) + sys.getsizeof(old)
+            self._data[key] = value
+            self.bytes += sys.getsizeof(key) + sys.getsizeof(value)
+            while len(self._data) > self.maxsize:
+                old_key, old_value = self._data.popitem(last=False)
+                self.bytes -= sys.getsizeof(old_key) + sys.getsizeof(old_value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
 
 class EmbeddingService:
     _model = None
+    _model_lock = threading.Lock()
+    _cache = EmbeddingCache()
+    # second level, shared by all workers on the host (see embedding_store.py);
+    # opened once the model is loaded, keyed on its fingerprint
+    _shared = None
+    _shared_ready = False
+    _shared_lock = threading.Lock()
+    _batcher = None
 
     @classmethod
     def get_model(cls):
         if cls._model is None:
-            cls._model = SentenceTransformer("all-MiniLM-L6-v2")
+            with cls._model_lock:
+                if cls._model is None:
+                    # torch + transformers: seconds to import, not at startup
+                    from sentence_transformers import SentenceTransformer
+                    cls._model = SentenceTransformer(EMBED_MODEL_NAME)
         return cls._model
 
+    @classmethod
+    def model_fingerprint(cls) -> str:
+        """
+        Short hash of the loaded model's vector for PROBE_TEXT (rounded, so
+        BLAS noise doesn't change it): another model or revision under the
+        same name gets another fingerprint.
+        """
+        vec = np.asarray(
+            cls.get_model().encode([PROBE_TEXT], show_progress_bar=False)[0],
+            dtype=np.float32
+        )
+        return hashlib.sha256((np.round(vec, 4) + 0.0).tobytes()).hexdigest()[:16]
+
+    @classmethod
+    def get_shared(cls) -> Optional[SharedEmbeddingStore]:
+        if not cls._shared_ready:
+            with cls._shared_lock:
+                if not cls._shared_ready:
+                    if EMBED_SHARED_CACHE_PATH:
+                        cls._shared = SharedEmbeddingStore(
+                            EMBED_SHARED_CACHE_PATH,
+                            f"{EMBED_MODEL_NAME}@{cls.model_fingerprint()}"
+                        )
+                    cls._shared_ready = True
+        return cls._shared
+
     @staticmethod
     def _hash_text(text: str) -> str:
         """
@@ -20,34 +127,150 @@ class EmbeddingService:
         return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
     @classmethod
-    @lru_cache(maxsize=5000)
-    def _cached_encode(cls, text_hash: str, text: str) -> np.ndarray:
+    def _encode_batch(cls, texts: list[str]) -> np.ndarray:
         """
-        Cached single-text encoding.
+        One forward pass over `texts` (no caching).
         """
         model = cls.get_model()
-        embedding = model.encode([text], show_progress_bar=False)
-        return embedding[0]
+        with stage_timer("embed_batch"):
+            vectors = model.encode(texts, show_progress_bar=False)
+        EMBED_BATCH_SIZE.observe(len(texts))
+        EMBEDDED_TEXTS.inc(len(texts))
+        return vectors
+
+    @classmethod
+    def get_batcher(cls) -> EmbeddingBatcher:
+        if cls._batcher is None:
+            with cls._model_lock:
+                if cls._batcher is None:
+                    cls._batcher = EmbeddingBatcher(cls._encode_batch)
+        return cls._batcher
+
+    @classmethod
+    def _lookup(cls, texts: list[str]):
+        """
+        Split texts into cached embeddings and unique misses.
+        Local LRU misses are looked up in the shared store in one query.
+
+        Returns:
+            (embeddings, misses) where misses maps clean text -> positions
+        """
+        embeddings = [None] * len(texts)
+        misses: dict[str, list[int]] = {}
+
+        for i, text in enumerate(texts):
+            clean_text = text.strip()
+            if not clean_text:
+                continue
+
+            emb = cls._cache.get(cls._hash_text(clean_text))
+            if emb is None:
+                misses.setdefault(clean_text, []).append(i)
+            else:
+                embeddings[i] = emb
+
+        shared = cls.get_shared() if misses else None
+        if shared is not None:
+            keys = {cls._hash_text(text): text for text in misses}
+            for key, vec in shared.get_many(list(keys)).items():
+                cls._cache.put(key, vec)
+                for i in misses.pop(keys[key]):
+                    embeddings[i] = vec
+
+        return embeddings, misses
+
+    @classmethod
+    def _fill(cls, embeddings: list, misses: dict, vectors) -> np.ndarray:
+        new = []
+        for text, vec in zip(misses, vectors):
+            key = cls._hash_text(text)
+            cls._cache.put(key, vec)
+            new.append((key, vec))
+            for i in misses[text]:
+                embeddings[i] = vec
+
+        shared = cls.get_shared()
+        if shared is not None:
+            shared.put_many(new)
+        return np.array(embeddings)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """Hit / miss counters of this worker process."""
+        return {
+            "pid": os.getpid(),
+            "local": cls._cache.stats(),
+            "shared": cls._shared.stats() if cls._shared is not None else None
+        }
+
+    @classmethod
+    def encode_unbatched(cls, texts: list[str]) -> np.ndarray:
+        """
+        `encode` without the batcher: misses are encoded on the calling
+        thread, so no inference thread is started (safe before fork).
+        """
+        if not texts:
+            return np.array([])
+
+        embeddings, misses = cls._lookup(texts)
+        if not misses:
+            return np.array(embeddings)
+        return cls._fill(embeddings, misses, cls._encode_batch(list(misses)))
+
+    @classmethod
+    def warm(cls, texts: list[str]) -> None:
+        """Load the model and pre-fill the cache with `texts` (safe before fork)."""
+        cls.encode_unbatched(texts)
 
     @classmethod
     def encode(cls, texts: list[str]) -> np.ndarray:
         """
         Encode texts with caching.
-        Uses cache for single items, batch for new ones.
+        Cache misses from concurrent callers are micro-batched into
+        shared forward passes (see EmbeddingBatcher).
         """
         if not texts:
             return np.array([])
 
-        embeddings = []
+        embeddings, misses = cls._lookup(texts)
+        if not misses:
+            return np.array(embeddings)
 
-        for text in texts:
-            clean_text = text.strip()
-            if not clean_text:
-                embeddings.append(None)
-                continue
+        if EMBED_BATCHING:
+            vectors = wait_future(cls.get_batcher().submit(list(misses)))
+        else:
+            vectors = cls._encode_batch(list(misses))
+
+        return cls._fill(embeddings, misses, vectors)
+
+    @classmethod
+    async def encode_async(cls, texts: list[str]) -> np.ndarray:
+        """
+        Awaitable `encode` for coroutines: waits on the batcher's future
+        without blocking the event loop.
+        """
+        if not texts:
+            return np.array([])
+
+        # cache lookups / write-backs touch the shared SQLite store
+        embeddings, misses = await asyncio.to_thread(cls._lookup, texts)
+        if not misses:
+            return np.array(embeddings)
+
+        if EMBED_BATCHING:
+            future = cls.get_batcher().submit(list(misses))
+            vectors = await asyncio.wrap_future(future)
+        else:
+            vectors = await asyncio.to_thread(cls._encode_batch, list(misses))
+
+        return await asyncio.to_thread(cls._fill, embeddings, misses, vectors)
+
+
+def _reset_after_fork() -> None:
+    # a batcher inherited from the parent points at a thread the child
+    # doesn't have; the next submit creates one with its own thread
+    EmbeddingService._batcher = None
+    EmbeddingService._model_lock = threading.Lock()
 
-            text_hash = cls._hash_text(clean_text)
-            emb = cls._cached_encode(text_hash, clean_text)
-            embeddings.append(emb)
 
-        return np.array(embeddings)
\ No newline at end of file
+os.register_at_fork(after_in_child=_reset_after_fork)
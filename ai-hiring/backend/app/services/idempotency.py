@@ -0,0 +1,203 @@
+"""
+backend/app/services/idempotency.py
+
+Request-level memoization for rank & score.
+- Every ranking request gets a hash of everything its result depends on:
+  the JD, the (filename, content hash) pairs in sorted order,
+  required_experience, scoring.SCORING_VERSION, the skill taxonomy version
+  (approved skills reload at runtime) and chunking.DOCUMENT_EMBEDDING
+- Its key is the client's Idempotency-Key header if sent, else that hash
+- Key and hash are stored on RankingSession / RankingJob; a repeat by the
+  same user within RANK_IDEMPOTENCY_TTL_SECONDS returns the stored session
+  (or the existing job) instead of re-running the pipeline. An
+  Idempotency-Key reused with different inputs is rejected (422) rather
+  than answered with the other request's session
+- Double-clicks that arrive while the first request is still running wait
+  for it through a per-process in-flight map
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.exceptions import IdempotencyKeyReused
+from app.models.ranking_job import RankingJob, JOB_FAILED
+from app.models.ranking_session import RankingSession, SESSION_STATUS_COMPLETED
+from app.models.resume import Resume
+from app.models.score import ResumeJobScore
+from app.services.chunking import DOCUMENT_EMBEDDING
+from app.services.scoring import SCORING_VERSION
+from app.services.skill_taxonomy import skill_taxonomy
+
+RANK_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("RANK_IDEMPOTENCY_TTL_SECONDS", 600))
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def hash_upload(file: UploadFile) -> str:
+    """sha256 of an upload's content; leaves the file at position 0."""
+    digest = hashlib.sha256()
+    file.file.seek(0)
+    for chunk in iter(lambda: file.file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    file.file.seek(0)
+    return digest.hexdigest()
+
+
+def _sha256_json(payload) -> str:
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def hash_request(
+    jd_text: str,
+    files: List[UploadFile],
+    required_experience: Optional[float]
+) -> str:
+    return _sha256_json([
+        SCORING_VERSION,
+        skill_taxonomy.current.version,
+        DOCUMENT_EMBEDDING,
+        hashlib.sha256(jd_text.encode("utf-8")).hexdigest(),
+        required_experience,
+        # filenames are part of the response, so they are part of the key
+        sorted([os.path.basename(f.filename), hash_upload(f)] for f in files)
+    ])
+
+
+def request_key(
+    jd_text: str,
+    files: List[UploadFile],
+    required_experience: Optional[float],
+    client_key: Optional[str] = None
+) -> Tuple[str, str]:
+    """(key, request_hash); without a client key the key is the hash itself."""
+    request_hash = hash_request(jd_text, files, required_experience)
+    if client_key:
+        return _sha256_json(["client", client_key]), request_hash
+    return request_hash, request_hash
+
+
+def _same_request(row, request_hash: str):
+    """`row` if it was made from the same inputs; 422 for a reused client key."""
+    if row is None or row.request_hash is None:
+        # rows from before request_hash was stored are not replayed
+        return None
+    if row.request_hash != request_hash:
+        raise IdempotencyKeyReused()
+    return row
+
+
+def _cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=RANK_IDEMPOTENCY_TTL_SECONDS)
+
+
+async def find_recent_session(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    request_hash: str
+) -> Optional[RankingSession]:
+    session = await db.scalar(
+        select(RankingSession)
+        .where(
+            RankingSession.user_id == user_id,
+            RankingSession.request_key == key,
+            RankingSession.status == SESSION_STATUS_COMPLETED,
+            RankingSession.created_at >= _cutoff()
+        )
+        .order_by(RankingSession.created_at.desc())
+        .limit(1)
+    )
+    return _same_request(session, request_hash)
+
+
+async def find_recent_job(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    request_hash: str
+) -> Optional[RankingJob]:
+    """Latest non-failed job with this key (queued, running or done)."""
+    job = await db.scalar(
+        select(RankingJob)
+        .where(
+            RankingJob.user_id == user_id,
+            RankingJob.request_key == key,
+            RankingJob.status != JOB_FAILED,
+            RankingJob.created_at >= _cutoff()
+        )
+        .order_by(RankingJob.created_at.desc())
+        .limit(1)
+    )
+    return _same_request(job, request_hash)
+
+
+async def load_ranked_candidates(db: AsyncSession, session_id: int) -> List[dict]:
+    """A stored session's candidates in the /rank_and_score response shape."""
+    scores = (
+        await db.scalars(
+            select(ResumeJobScore)
+            .options(
+                joinedload(ResumeJobScore.resume)
+                .load_only(Resume.id, Resume.filename, Resume.duplicate_of)
+            )
+            .where(ResumeJobScore.session_id == session_id)
+            .order_by(ResumeJobScore.final_score.desc(), ResumeJobScore.id)
+        )
+    ).all()
+
+    return [
+        {
+            "filename": score.resume.filename,
+            "semantic_score": round(score.semantic_score, 2),
+            "skill_match_score": score.skill_match_score,
+            "experience_score": score.experience_score,
+            "final_score": round(score.final_score, 2),
+            "matched_skills": score.matched_skills.split(", ") if score.matched_skills else [],
+            "missing_skills": score.missing_skills.split(", ") if score.missing_skills else [],
+            "feedback": score.feedback,
+            "duplicate_of": score.resume.duplicate_of
+        }
+        for score in scores
+    ]
+
+
+class InflightRequests:
+    """
+    (user_id, key) -> future of the session_id being computed, so a duplicate
+    arriving mid-run waits for the original. Event-loop only (not thread-safe).
+    """
+    def __init__(self):
+        self._futures: Dict[Tuple[int, str], Tuple[asyncio.Future, str]] = {}
+
+    def get(self, user_id: int, key: str, request_hash: str) -> Optional[asyncio.Future]:
+        entry = self._futures.get((user_id, key))
+        if entry is None:
+            return None
+        future, running_hash = entry
+        if running_hash != request_hash:
+            raise IdempotencyKeyReused()
+        return future
+
+    def start(self, user_id: int, key: str, request_hash: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._futures[(user_id, key)] = (future, request_hash)
+        return future
+
+    def finish(self, user_id: int, key: str, session_id: Optional[int]) -> None:
+        """session_id=None: the original failed; waiters recompute."""
+        future, _ = self._futures.pop((user_id, key), (None, None))
+        if future is not None and not future.done():
+            future.set_result(session_id)
+
+
+inflight_requests = InflightRequests()
@@ -7,15 +7,33 @@ NLP helpers for resume parsing (Day 2)
 """
 
 import re
+import threading
 from typing import List, Optional
 from datetime import datetime
 
-# Try to load spaCy model (optional). If unavailable, functions will fallback gracefully.
-try:
-    import spacy
-    _SPACY_NLP = spacy.load("en_core_web_sm")
-except Exception:
-    _SPACY_NLP = None
+from app.core.metrics import timed
+
+# spaCy model (optional), loaded on first use or by the startup warm-up
+# (app/services/warmup.py): spacy.load takes seconds and must not run at
+# import. If unavailable, functions fall back gracefully.
+_SPACY_NLP = None
+_SPACY_LOADED = False
+_SPACY_LOCK = threading.Lock()
+
+
+def get_spacy():
+    """The en_core_web_sm pipeline, or None if spaCy / the model is missing."""
+    global _SPACY_NLP, _SPACY_LOADED
+    if not _SPACY_LOADED:
+        with _SPACY_LOCK:
+            if not _SPACY_LOADED:
+                try:
+                    import spacy
+                    _SPACY_NLP = spacy.load("en_core_web_sm")
+                except Exception:
+                    _SPACY_NLP = None
+                _SPACY_LOADED = True
+    return _SPACY_NLP
 
 # Keywords that indicate a line is a header for skills/tools/education etc.
 _BAD_NAME_KEYWORDS = re.compile(
@@ -71,6 +89,7 @@ def _clean_name_candidate(s: str) -> Optional[str]:
     # Title-case each part for nicer output
     return " ".join(p.capitalize() for p in parts)
 
+@timed("extract_name")
 def extract_name(text: str, skills_list: Optional[List[str]] = None) -> Optional[str]:
     """
     Improved name extraction prioritizing Title-Case sequences.
@@ -184,9 +203,10 @@ def extract_name(text: str, skills_list: Optional[List[str]] = None) -> Optional
                 return cand.capitalize()
 
     # 4) spaCy fallback
-    if _SPACY_NLP:
+    spacy_nlp = get_spacy()
+    if spacy_nlp:
         try:
-            doc = _SPACY_NLP(text[:2000])
+            doc = spacy_nlp(text[:2000])
             for ent in doc.ents:
                 if ent.label_ == "PERSON":
                     cand = ent.text.strip()
@@ -16,6 +16,11 @@ import os
 import re
 from typing import Optional, List
 
+from app.core.exceptions import RankingCancelled
+from app.core.metrics import OCR_PAGES, stage_timer, timed
+from app.services.cancellation import raise_if_cancelled
+from app.services.scheduling import ocr_limiter
+
 # External libs used at runtime (make sure installed in your venv):
 # pdfplumber, python-docx, pdf2image, pytesseract, pillow, opencv-python (cv2), numpy
 # Install: pip install pdfplumber python-docx pdf2image pytesseract pillow opencv-python numpy
@@ -137,61 +142,77 @@ def _ocr_pdf_with_pytesseract(path: str, dpi: int = 300, scale: float = 2.0, con
     if t_cmd:
         pytesseract.pytesseract.tesseract_cmd = t_cmd
 
+    # rasterizing and OCR share CPU slots with other requests; interactive
+    # uploads are granted slots ahead of bulk rankings (see scheduling.py)
     try:
-        images = convert_from_path(path, dpi=dpi)
+        with ocr_limiter.acquire(), stage_timer("ocr_rasterize"):
+            images = convert_from_path(path, dpi=dpi)
     except Exception as e:
         raise RuntimeError(f"pdf2image failed to convert PDF to images: {e}") from e
 
     page_texts: List[str] = []
 
     for pil_img in images:
-        # preprocess (may raise if cv2 not installed)
-        try:
-            proc_img = _preprocess_image_for_ocr(pil_img, scale=scale)
-        except Exception:
-            # if preprocessing fails, fall back to raw image
-            proc_img = pil_img
+        # stop between pages once the requesting client has gone away
+        raise_if_cancelled()
+        with ocr_limiter.acquire():
+            raise_if_cancelled()
+            with stage_timer("ocr_page"):
+                page_texts.append(
+                    _ocr_page(pil_img, scale=scale, conf_threshold=conf_threshold, psm=psm)
+                )
+            OCR_PAGES.inc()
+
+    full_text = "\n\n".join(page_texts)
+    full_text = _postprocess_ocr_text(full_text)
+    return full_text
+
 
-        # get word-level data
+def _ocr_page(pil_img, scale: float, conf_threshold: int, psm: int) -> str:
+    """OCR a single page image, keeping words above conf_threshold."""
+    import pytesseract
+
+    # preprocess (may raise if cv2 not installed)
+    try:
+        proc_img = _preprocess_image_for_ocr(pil_img, scale=scale)
+    except Exception:
+        # if preprocessing fails, fall back to raw image
+        proc_img = pil_img
+
+    # get word-level data
+    try:
+        data = pytesseract.image_to_data(proc_img, output_type=pytesseract.Output.DICT, lang='eng', config=f'--oem 1 --psm {psm}')
+    except Exception as e:
+        # fallback to simple string OCR
+        return pytesseract.image_to_string(proc_img, lang='eng', config=f'--oem 1 --psm {psm}')
+
+    confs = data.get('conf') or []
+    texts = data.get('text') or []
+
+    words = []
+    for i, w in enumerate(texts):
+        # safe confidence parsing (handles ints, floats, strings)
+        conf_val = None
+        if i < len(confs):
+            conf_val = confs[i]
         try:
-            data = pytesseract.image_to_data(proc_img, output_type=pytesseract.Output.DICT, lang='eng', config=f'--oem 1 --psm {psm}')
-        except Exception as e:
-            # fallback to simple string OCR
-            raw = pytesseract.image_to_string(proc_img, lang='eng', config=f'--oem 1 --psm {psm}')
-            page_texts.append(raw)
-            continue
-
-        confs = data.get('conf') or []
-        texts = data.get('text') or []
-
-        words = []
-        for i, w in enumerate(texts):
-            # safe confidence parsing (handles ints, floats, strings)
-            conf_val = None
-            if i < len(confs):
-                conf_val = confs[i]
-            try:
-                conf = int(float(conf_val))
-            except Exception:
-                conf = -1
+            conf = int(float(conf_val))
+        except Exception:
+            conf = -1
 
-            if w and w.strip() and conf >= conf_threshold:
-                words.append(w.strip())
+        if w and w.strip() and conf >= conf_threshold:
+            words.append(w.strip())
 
-        if words:
-            page_texts.append(" ".join(words))
-        else:
-            # fallback to full ocr for this page (less strict)
-            raw = pytesseract.image_to_string(proc_img, lang='eng', config=f'--oem 1 --psm {psm}')
-            page_texts.append(raw)
+    if words:
+        return " ".join(words)
 
-    full_text = "\n\n".join(page_texts)
-    full_text = _postprocess_ocr_text(full_text)
-    return full_text
+    # fallback to full ocr for this page (less strict)
+    return pytesseract.image_to_string(proc_img, lang='eng', config=f'--oem 1 --psm {psm}')
 
 
 # ---------------- Master extractor ----------------
 
+@timed("extract_text")
 def extract_text_from_file(path: str, ocr_enabled: bool = True) -> str:
     """
     Master entry point:
@@ -211,6 +232,8 @@ def extract_text_from_file(path: str, ocr_enabled: bool = True) -> str:
             try:
                 # tweak dpi/scale/conf_threshold as needed
                 text = _ocr_pdf_with_pytesseract(path, dpi=300, scale=2.0, conf_threshold=50, psm=3)
+            except RankingCancelled:
+                raise
             except Exception as e:
                 # return whatever text we had (possibly empty) or bubble up minimal message
                 raise RuntimeError(f"OCR extraction failed: {e}") from e
@@ -0,0 +1,165 @@
+"""
+backend/app/services/persistence.py
+
+Bulk persistence helpers for a ranking run.
+- All writes for one request share a single transaction (caller commits)
+- Resumes / scores are written with one multi-row INSERT each
+- Resume IDs come back in bulk via INSERT ... RETURNING
+- Raw text is compressed into resume_texts in the same transaction, and
+  near-duplicate fingerprints (see dedup.py) go to resume_fingerprints /
+  resume_lsh_buckets
+- UnknownSkill counts are written behind (see skill_tracker.py)
+"""
+
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.metrics import timed
+from app.models.job import JobDescription
+from app.models.ranking_session import RankingSession
+from app.models.resume import Resume
+from app.models.resume_fingerprint import ResumeFingerprint, ResumeLshBucket
+from app.models.resume_text import ResumeText
+from app.models.score import ResumeJobScore
+
+
+def bulk_insert_resumes(
+    db: Session,
+    rows: List[dict],
+    user_id: Optional[int] = None
+) -> List[int]:
+    """
+    Insert resume rows in one statement and return their IDs
+    in the same order as `rows`. Each row's "raw_text" is compressed
+    into resume_texts with a second multi-row INSERT; its optional
+    "fingerprint" (dedup.fingerprint_rows) goes to resume_fingerprints
+    and resume_lsh_buckets (owned by `user_id`) the same way.
+    """
+    if not rows:
+        return []
+
+    texts = [row.get("raw_text") or "" for row in rows]
+    resume_rows = [
+        {k: v for k, v in row.items() if k not in ("raw_text", "fingerprint")}
+        for row in rows
+    ]
+
+    result = db.execute(
+        insert(Resume).returning(Resume.id, sort_by_parameter_order=True),
+        resume_rows
+    )
+    ids = list(result.scalars())
+
+    db.execute(
+        insert(ResumeText),
+        [
+            {"resume_id": resume_id, **ResumeText.pack(text)}
+            for resume_id, text in zip(ids, texts)
+        ]
+    )
+
+    indexed = [
+        (resume_id, row["fingerprint"])
+        for resume_id, row in zip(ids, rows)
+        if row.get("fingerprint")
+    ]
+    if indexed:
+        db.execute(insert(ResumeFingerprint), [
+            {"resume_id": resume_id, **fp["fingerprint"]} for resume_id, fp in indexed
+        ])
+        db.execute(insert(ResumeLshBucket), [
+            {"resume_id": resume_id, "bucket": bucket, "user_id": user_id}
+            for resume_id, fp in indexed
+            for bucket in set(fp["buckets"])
+        ])
+    return ids
+
+
+def bulk_insert_scores(db: Session, rows: List[dict]) -> None:
+    """
+    Insert score rows as a single executemany batch.
+    """
+    if rows:
+        db.execute(insert(ResumeJobScore), rows)
+
+
+def summarize_scores(score_rows: List[dict]) -> dict:
+    """
+    Summary columns for a RankingSession from its score rows.
+    """
+    final_scores = [row["final_score"] for row in score_rows]
+    if not final_scores:
+        return {"candidate_count": 0, "top_score": None, "mean_score": None}
+
+    return {
+        "candidate_count": len(final_scores),
+        "top_score": max(final_scores),
+        "mean_score": round(sum(final_scores) / len(final_scores), 2)
+    }
+
+
+@timed("db_flush")
+def persist_ranking_run(
+    db: Session,
+    user_id: int,
+    jd_text: str,
+    job_title: str,
+    required_experience: float,
+    resume_rows: List[dict],
+    score_rows: List[dict],
+    request_key: Optional[str] = None,
+    request_hash: Optional[str] = None
+) -> tuple[int, int, List[int]]:
+    """
+    Write the job, session, resumes and scores of one ranking run.
+    `resume_rows[i]["filename"]` is prefixed with the new job ID.
+    `request_key` and `request_hash` are stored on the session for
+    repeat-request lookups.
+    Does not commit; with an AsyncSession call it via `run_sync`.
+
+    Returns:
+        (job_id, session_id, resume_ids)
+    """
+    job = JobDescription(
+        title=job_title,
+        description=jd_text,
+        required_experience=required_experience
+    )
+    session = RankingSession(
+        user_id=user_id,
+        job_description=jd_text,
+        job_title=job_title,
+        request_key=request_key,
+        request_hash=request_hash,
+        **summarize_scores(score_rows)
+    )
+    db.add_all([job, session])
+    db.flush()
+
+    for row in resume_rows:
+        row["filename"] = f"{job.id}_{row['filename']}"
+    resume_ids = bulk_insert_resumes(db, resume_rows, user_id)
+
+    for row, resume_id in zip(score_rows, resume_ids):
+        row.update(resume_id=resume_id, job_id=job.id, session_id=session.id)
+    bulk_insert_scores(db, score_rows)
+
+    return job.id, session.id, resume_ids
+
+
+def count_unknown_skills(skill_lists: Iterable[list[str]]) -> Counter:
+    """
+    Aggregate skills across resumes: each resume contributes at most 1 per skill.
+    """
+    counts = Counter()
+    for skills in skill_lists:
+        counts.update({
+            s.lower().strip()
+            for s in skills
+            if s and len(s.strip()) > 2
+        })
+    return counts
+
@@ -0,0 +1,277 @@
+"""
+backend/app/services/ranking.py
+
+The rank-and-score pipeline, independent of HTTP and of the DB session:
+- prepare_job_description: JD embedding + JD skills (once per run)
+- Resumes and the JD are embedded whole, or chunk by chunk and pooled
+  with EMBED_CHUNKING=1 (see chunking.py)
+- parse_resume: text extraction, experience, keyword skills (per file);
+  near-duplicates of stored resumes reuse those and the embedding
+  (see dedup.py; callers pass the index)
+- score_resume: semantic / hybrid score, skill gap, recruiter feedback
+- run_ranking_pipeline: all of the above for a batch, returning the rows
+  that persistence.persist_ranking_run writes
+- score_upload: one file end to end, for callers that stream results
+- Checks for cancellation (see cancellation.py) between stages and files
+
+Used by the /rank_and_score routes (sync and streaming) and the job worker.
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.exceptions import RankingCancelled, ScoringError, TextExtractionError
+from app.core.metrics import timed
+from app.services.cancellation import raise_if_cancelled
+from app.services.dedup import NearDuplicateIndex, fingerprint_rows, minhash
+from app.services.chunking import embed_documents
+from app.services.nlp import extract_experience_years
+from app.services.parser import extract_text_from_file
+from app.services.persistence import count_unknown_skills
+from app.services.scoring import (
+    compute_similarity,
+    score_components,
+    generate_recruiter_feedback
+)
+from app.services.skill_taxonomy import skill_taxonomy
+from app.services.skills import match_skills, semantic_skill_match
+
+
+def extract_job_title(jd_text: str) -> str:
+    for line in jd_text.splitlines():
+        if "job title" in line.lower():
+            return line.split(":", 1)[-1].strip()
+    return "Untitled Job Description"
+
+
+def prepare_job_description(jd_text: str) -> dict:
+    try:
+        jd_vec = embed_documents([jd_text])[0]
+    except Exception as e:
+        print("JD embedding failed:", e)
+        raise ScoringError("Failed to process job description")
+
+    skills = skill_taxonomy.current.skills
+    jd_keyword_skills = match_skills(jd_text, skills)
+    jd_semantic_skills = semantic_skill_match(jd_text, skills)
+
+    return {
+        "jd_text": jd_text,
+        "jd_vec": jd_vec,
+        "jd_skills": list(set(jd_keyword_skills + jd_semantic_skills))
+    }
+
+
+def parse_resume(
+    filename: str,
+    path: str,
+    duplicates: Optional[NearDuplicateIndex] = None
+) -> dict:
+    """
+    With `duplicates`, a near-duplicate of a stored resume comes back with
+    "duplicate_of" and "embedding" set, and its stored experience / skills.
+    """
+    raise_if_cancelled()
+    try:
+        resume_text = extract_text_from_file(path)
+    except RankingCancelled:
+        raise
+    except Exception:
+        raise TextExtractionError(f"Failed processing {filename}")
+
+    taxonomy = skill_taxonomy.current
+    signature = minhash(resume_text) if duplicates is not None and duplicates.enabled else None
+    duplicate = duplicates.find(signature) if signature is not None else None
+
+    if duplicate is not None:
+        return {
+            "filename": filename,
+            "text": resume_text,
+            "experience_years": duplicate["experience_years"],
+            # matched against an older taxonomy: redo (a trie walk is cheap)
+            "resume_skills": (
+                duplicate["skills"]
+                if duplicate["taxonomy_version"] == taxonomy.version
+                else match_skills(resume_text, taxonomy.skills)
+            ),
+            "duplicate_of": duplicate["resume_id"],
+            "embedding": duplicate["embedding"]
+        }
+
+    return {
+        "filename": filename,
+        "text": resume_text,
+        "experience_years": extract_experience_years(resume_text),
+        "resume_skills": match_skills(resume_text, taxonomy.skills),
+        "signature": signature,
+        "taxonomy_version": taxonomy.version
+    }
+
+
+@timed("score")
+def score_resume(
+    jd: dict,
+    parsed: dict,
+    embedding: np.ndarray,
+    required_experience: Optional[float]
+) -> Tuple[dict, dict]:
+    """
+    Returns:
+        (score_row, result): the ResumeJobScore column values and the
+        API-facing candidate dict (without filename prefixing).
+    """
+    resume_skills = parsed["resume_skills"]
+    experience_years = parsed["experience_years"]
+
+    semantic_score = compute_similarity(embedding, jd["jd_vec"])
+
+    components = score_components(
+        semantic_score=semantic_score,
+        resume_skills=resume_skills,
+        jd_text=jd["jd_text"],
+        resume_experience=experience_years,
+        required_experience=required_experience,
+        skills_master=skill_taxonomy.current.categories
+    )
+    final_score = components["final_score"]
+
+    matched_skills = sorted(set(resume_skills) & set(jd["jd_skills"]))
+    missing_skills = sorted(set(jd["jd_skills"]) - set(resume_skills))
+
+    feedback = generate_recruiter_feedback(
+        final_score=final_score,
+        matched_skills=matched_skills,
+        missing_skills=missing_skills,
+        resume_experience=experience_years,
+        required_experience=required_experience
+    )
+
+    score_row = {
+        "semantic_score": semantic_score,
+        "skill_match_score": components["skill_match_score"],
+        "experience_score": components["experience_score"],
+        "final_score": final_score,
+        "matched_skills": ", ".join(matched_skills),
+        "missing_skills": ", ".join(missing_skills),
+        "verdict": feedback["verdict"],
+        "feedback": feedback
+    }
+
+    result = {
+        "filename": parsed["filename"],
+        "semantic_score": round(semantic_score, 2),
+        "skill_match_score": components["skill_match_score"],
+        "experience_score": components["experience_score"],
+        "final_score": round(final_score, 2),
+        "matched_skills": matched_skills,
+        "missing_skills": missing_skills,
+        "feedback": feedback,
+        "duplicate_of": parsed.get("duplicate_of")
+    }
+
+    return score_row, result
+
+
+def score_upload(
+    jd: dict,
+    filename: str,
+    path: str,
+    required_experience: Optional[float],
+    duplicates: Optional[NearDuplicateIndex] = None
+) -> Tuple[dict, dict, dict]:
+    """
+    Parse, embed and score a single file (streaming path).
+
+    Returns:
+        (parsed, score_row, result)
+    """
+    parsed = parse_resume(filename, path, duplicates)
+    raise_if_cancelled()
+    if parsed.get("embedding") is None:
+        parsed["embedding"] = embed_documents([parsed["text"]])[0]
+    score_row, result = score_resume(jd, parsed, parsed["embedding"], required_experience)
+    return parsed, score_row, result
+
+
+def resume_row(parsed: dict) -> dict:
+    row = {
+        "filename": parsed["filename"],
+        "experience_years": parsed["experience_years"],
+        "skills": ", ".join(parsed["resume_skills"]),
+        "duplicate_of": parsed.get("duplicate_of"),
+        "raw_text": parsed["text"]
+    }
+    # indexed for later near-duplicates (originals only)
+    if parsed.get("signature") is not None:
+        row["fingerprint"] = fingerprint_rows(
+            parsed["signature"],
+            parsed["embedding"],
+            parsed["resume_skills"],
+            parsed["taxonomy_version"],
+            parsed["experience_years"]
+        )
+    return row
+
+
+def run_ranking_pipeline(
+    jd_text: str,
+    required_experience: Optional[float],
+    uploads: List[Tuple[str, str]],
+    duplicates: Optional[NearDuplicateIndex] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
+    """
+    Run parse -> embed -> score for (filename, path) uploads; near-duplicates
+    of stored resumes (found in `duplicates`) skip the embed.
+
+    `on_progress(done, total)` is called after each file is parsed
+    and once more after scoring. Raises RankingCancelled at the next
+    checkpoint once the surrounding cancellation_scope is cancelled.
+    """
+    raise_if_cancelled()
+    jd = prepare_job_description(jd_text)
+    total = len(uploads)
+
+    # PASS 1: parse resumes
+    parsed = []
+    for done, (filename, path) in enumerate(uploads, start=1):
+        parsed.append(parse_resume(filename, path, duplicates))
+        if on_progress:
+            on_progress(done, total)
+
+    # PASS 2: batch embeddings (near-duplicates already have one)
+    raise_if_cancelled()
+    fresh = [p for p in parsed if p.get("embedding") is None]
+    if fresh:
+        for p, embedding in zip(fresh, embed_documents([p["text"] for p in fresh])):
+            p["embedding"] = embedding
+
+    # PASS 3: scoring
+    raise_if_cancelled()
+    score_rows, results = [], []
+    for p in parsed:
+        score_row, result = score_resume(jd, p, p["embedding"], required_experience)
+        score_rows.append(score_row)
+        results.append(result)
+
+    if on_progress:
+        on_progress(total, total)
+
+    return {
+        "job_title": extract_job_title(jd_text),
+        "resume_rows": [resume_row(p) for p in parsed],
+        "score_rows": score_rows,
+        "results": results,
+        "skill_counts": count_unknown_skills(p["resume_skills"] for p in parsed)
+    }
+
+
+def finalize_results(results: List[dict], resume_rows: List[dict]) -> List[dict]:
+    """
+    Copy the persisted (job-prefixed) filenames onto results and sort by score.
+    """
+    for row, result in zip(resume_rows, results):
+        result["filename"] = row["filename"]
+
+    return sorted(results, key=lambda x: x["final_score"], reverse=True)
@@ -0,0 +1,359 @@
+"""
+backend/app/services/ranking_worker.py
+
+Background execution of RankingJob rows, using the database as the queue.
+- In-process: the app lifespan starts RANKING_WORKERS threads (default 1)
+- Out-of-process: `python -m app.services.ranking_worker` runs the same loop;
+  set RANKING_WORKERS=0 on the web processes in that case
+- A job is claimed with a conditional UPDATE (status must still match), so
+  any number of threads / processes can poll the same table safely
+- While a job runs, its worker heartbeats updated_at every third of
+  RANKING_JOB_STALE_SECONDS; a job "running" longer than that without an
+  update (crashed worker) is picked up again, at most
+  RANKING_JOB_MAX_ATTEMPTS claims in all, then marked failed
+- Every claim bumps `attempts`; a worker only writes to (and removes the
+  uploads of) a job that is still running under its own attempt, so one
+  that was presumed dead and comes back can't overwrite the new owner
+"""
+
+import os
+import shutil
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.ranking_job import (
+    RankingJob,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED
+)
+from app.services.dedup import near_duplicates
+from app.services.persistence import persist_ranking_run
+from app.services.ranking import run_ranking_pipeline
+from app.services.scheduling import BULK, inference_priority
+from app.services.skill_taxonomy import TAXONOMY_POLL_SECONDS, skill_taxonomy
+from app.services.skill_tracker import unknown_skill_tracker
+
+RANKING_WORKERS = int(os.getenv("RANKING_WORKERS", 1))
+RANKING_POLL_SECONDS = float(os.getenv("RANKING_POLL_SECONDS", 2))
+RANKING_JOB_STALE_SECONDS = float(os.getenv("RANKING_JOB_STALE_SECONDS", 600))
+RANKING_JOB_MAX_ATTEMPTS = int(os.getenv("RANKING_JOB_MAX_ATTEMPTS", 3))
+
+JOB_UPLOAD_DIR = os.getenv(
+    "RANKING_JOB_UPLOAD_DIR",
+    os.path.abspath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "..", "uploads", "jobs"
+    ))
+)
+
+
+def job_upload_dir(job_id: str) -> str:
+    return os.path.join(JOB_UPLOAD_DIR, job_id)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RankingWorkerPool:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int = RANKING_WORKERS,
+        poll_seconds: float = RANKING_POLL_SECONDS,
+        stale_seconds: float = RANKING_JOB_STALE_SECONDS,
+        max_attempts: int = RANKING_JOB_MAX_ATTEMPTS
+    ):
+        self._session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    # ---------------- lifecycle ----------------
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._loop,
+                name=f"ranking-worker-{i}",
+                daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling; a job already running is finished first."""
+        self._stop.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers (called after a job is enqueued)."""
+        self._wakeup.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claim = self.claim_next()
+            except Exception as e:
+                print("Ranking job claim failed:", e)
+                claim = None
+
+            if claim is None:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+
+            # background jobs never outrank interactive requests; nothing a
+            # job raises may end the thread (the pool would silently shrink)
+            try:
+                with inference_priority(BULK):
+                    self.process(*claim)
+            except Exception as e:
+                print(f"Ranking job {claim[0]} crashed its worker:", e)
+                traceback.print_exc()
+
+    # ---------------- queue ----------------
+
+    def _stale(self):
+        stale_before = _now() - timedelta(seconds=self.stale_seconds)
+        return and_(
+            RankingJob.status == JOB_RUNNING,
+            RankingJob.updated_at < stale_before
+        )
+
+    def _claimable(self):
+        return and_(
+            RankingJob.attempts < self.max_attempts,
+            or_(RankingJob.status == JOB_QUEUED, self._stale())
+        )
+
+    def _exhausted(self):
+        return and_(RankingJob.attempts >= self.max_attempts, self._stale())
+
+    @staticmethod
+    def _owned(job_id: str, attempt: int):
+        return and_(
+            RankingJob.id == job_id,
+            RankingJob.status == JOB_RUNNING,
+            RankingJob.attempts == attempt
+        )
+
+    def claim_next(self) -> Optional[Tuple[str, int]]:
+        """(job_id, attempt) of a newly claimed job, or None."""
+        with self._session_factory() as db:
+            self._fail_exhausted(db)
+
+            candidates = db.execute(
+                select(RankingJob.id, RankingJob.attempts)
+                .where(self._claimable())
+                .order_by(RankingJob.created_at)
+                .limit(5)
+            ).all()
+
+            for job_id, attempts in candidates:
+                claimed = db.execute(
+                    update(RankingJob)
+                    .where(
+                        RankingJob.id == job_id,
+                        RankingJob.attempts == attempts,
+                        self._claimable()
+                    )
+                    .values(
+                        status=JOB_RUNNING,
+                        attempts=attempts + 1,
+                        processed=0,
+                        started_at=_now(),
+                        updated_at=_now()
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return job_id, attempts + 1
+
+        return None
+
+    def _fail_exhausted(self, db: Session) -> None:
+        """Jobs whose worker went away on each of their max_attempts claims."""
+        exhausted = db.execute(
+            select(RankingJob.id).where(self._exhausted())
+        ).scalars().all()
+
+        for job_id in exhausted:
+            failed = db.execute(
+                update(RankingJob)
+                .where(RankingJob.id == job_id, self._exhausted())
+                .values(
+                    status=JOB_FAILED,
+                    error=f"Gave up after {self.max_attempts} attempts (worker stopped or stalled)",
+                    finished_at=_now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if failed.rowcount == 1:
+                shutil.rmtree(job_upload_dir(job_id), ignore_errors=True)
+
+    def _update_owned(self, job_id: str, attempt: int, **values) -> bool:
+        """Update the job if this attempt still owns it."""
+        with self._session_factory() as db:
+            updated = db.execute(
+                update(RankingJob)
+                .where(self._owned(job_id, attempt))
+                .values(updated_at=_now(), **values)
+            )
+            db.commit()
+            return updated.rowcount == 1
+
+    @contextmanager
+    def _heartbeat(self, job_id: str, attempt: int):
+        """Keep updated_at fresh while a long pass runs between progress updates."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.stale_seconds / 3):
+                try:
+                    self._update_owned(job_id, attempt)
+                except Exception as e:
+                    print("Ranking job heartbeat failed:", e)
+
+        t = threading.Thread(target=beat, name=f"ranking-heartbeat-{job_id[:8]}", daemon=True)
+        t.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            t.join()
+
+    # ---------------- execution ----------------
+
+    def process(self, job_id: str, attempt: int) -> None:
+        # no session (and pooled connection) held while the pipeline runs:
+        # `job` is read once and used detached
+        with self._session_factory() as db:
+            job = db.get(RankingJob, job_id)
+        if job is None:
+            # deleted after it was claimed: nobody else owns its uploads
+            print(f"Ranking job {job_id} no longer exists")
+            shutil.rmtree(job_upload_dir(job_id), ignore_errors=True)
+            return
+        uploads = [(u["filename"], u["path"]) for u in job.uploads]
+        owned = False
+
+        try:
+            with self._heartbeat(job_id, attempt):
+                run = run_ranking_pipeline(
+                    job.jd_text,
+                    job.required_experience,
+                    uploads,
+                    near_duplicates.for_user(job.user_id),
+                    on_progress=lambda done, total: self._update_owned(
+                        job_id, attempt, processed=done
+                    )
+                )
+
+            with self._session_factory() as db:
+                _, session_id, _ = persist_ranking_run(
+                    db,
+                    job.user_id,
+                    job.jd_text,
+                    run["job_title"],
+                    job.required_experience,
+                    run["resume_rows"],
+                    run["score_rows"],
+                    request_key=job.request_key,
+                    request_hash=job.request_hash
+                )
+
+                # in the same transaction as the results: nothing is
+                # persisted if another worker has claimed the job since
+                owned = self._finish(
+                    db, job_id, attempt,
+                    status=JOB_COMPLETED,
+                    session_id=session_id,
+                    processed=job.total
+                )
+                if not owned:
+                    db.rollback()
+                    print(f"Ranking job {job_id} was reclaimed, result of attempt {attempt} dropped")
+                    return
+                db.commit()
+
+            unknown_skill_tracker.add_counts(run["skill_counts"])
+
+        except Exception as e:
+            message = getattr(e, "detail", None) or str(e) or type(e).__name__
+            with self._session_factory() as db:
+                owned = self._finish(
+                    db, job_id, attempt,
+                    status=JOB_FAILED,
+                    error=message.splitlines()[0][:500]
+                )
+                db.commit()
+
+        finally:
+            # the uploads belong to whichever attempt owns the job now
+            if owned:
+                shutil.rmtree(job_upload_dir(job_id), ignore_errors=True)
+
+    def _finish(self, db: Session, job_id: str, attempt: int, **values) -> bool:
+        finished = db.execute(
+            update(RankingJob)
+            .where(self._owned(job_id, attempt))
+            .values(finished_at=_now(), updated_at=_now(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        return finished.rowcount == 1
+
+
+def _default_session_factory() -> Session:
+    from app.db.database import SessionLocal
+    return SessionLocal()
+
+
+ranking_worker_pool = RankingWorkerPool(_default_session_factory)
+
+
+def main():
+    """Standalone worker process: python -m app.services.ranking_worker"""
+    pool = RankingWorkerPool(_default_session_factory, workers=max(1, RANKING_WORKERS))
+    pool.start()
+    print(f"Ranking worker started with {pool.workers} thread(s)")
+
+    next_reload = 0.0
+    try:
+        while True:
+            if TAXONOMY_POLL_SECONDS > 0 and time.monotonic() >= next_reload:
+                try:
+                    skill_taxonomy.reload()
+                except Exception as e:
+                    print("Taxonomy reload failed:", e)
+                next_reload = time.monotonic() + TAXONOMY_POLL_SECONDS
+            time.sleep(unknown_skill_tracker.flush_seconds)
+            unknown_skill_tracker.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+        unknown_skill_tracker.flush()
+
+
+if __name__ == "__main__":
+    main()
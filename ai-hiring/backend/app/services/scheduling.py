@@ -0,0 +1,182 @@
+"""
+backend/app/services/scheduling.py
+
+Priority classes for shared inference / OCR capacity.
+- INTERACTIVE (single /upload_resume) vs BULK (rankings, background jobs)
+- The class travels with the request in a ContextVar, so code deep in the
+  pipeline (EmbeddingService, OCR) picks it up without extra arguments;
+  starlette's threadpool copies the context into worker threads
+- WeightedFairQueue: start-time fair queueing between classes, weighted by
+  SCHED_INTERACTIVE_WEIGHT : SCHED_BULK_WEIGHT
+- PriorityLimiter: a semaphore whose waiters are granted through the queue
+- BulkAdmission: non-blocking global / per-user caps on in-flight bulk work;
+  callers turn a refusal into 429 + Retry-After
+- The limiter and admission counts live in process memory, so their caps
+  are per worker process: with `python -m app.serve` (or uvicorn
+  --workers) the deployment admits up to WEB_WORKERS times
+  BULK_MAX_INFLIGHT / BULK_MAX_PER_USER / OCR_CONCURRENCY. Size them for
+  one worker's share of the machine
+- Background jobs are capped per user at BULK_MAX_PENDING_JOBS queued or
+  running rows (checked in routes/ranking_jobs.py); being rows in the
+  database, that cap holds across workers
+"""
+
+import os
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+PRIORITY_WEIGHTS = {
+    INTERACTIVE: float(os.getenv("SCHED_INTERACTIVE_WEIGHT", 4)),
+    BULK: float(os.getenv("SCHED_BULK_WEIGHT", 1)),
+}
+
+# per worker process (see above)
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 2))
+BULK_MAX_INFLIGHT = int(os.getenv("BULK_MAX_INFLIGHT", 4))
+BULK_MAX_PER_USER = int(os.getenv("BULK_MAX_PER_USER", 2))
+BULK_RETRY_AFTER_SECONDS = int(os.getenv("BULK_RETRY_AFTER_SECONDS", 10))
+BULK_MAX_PENDING_JOBS = int(os.getenv("BULK_MAX_PENDING_JOBS", 5))
+
+_priority: ContextVar[str] = ContextVar("inference_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def inference_priority(priority: str) -> Iterator[None]:
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class WeightedFairQueue:
+    """
+    Per-class FIFOs; pop() serves the non-empty class with the lowest
+    virtual time, and charge() advances it by cost / weight.
+    Not thread-safe: callers hold their own lock.
+    """
+    def __init__(self, weights: Dict[str, float] = PRIORITY_WEIGHTS):
+        self.weights = weights
+        self._queues = {cls: deque() for cls in weights}
+        self._vtime = {cls: 0.0 for cls in weights}
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def depths(self) -> Dict[str, int]:
+        return {cls: len(q) for cls, q in self._queues.items()}
+
+    def push(self, cls: str, item: Any) -> None:
+        if cls not in self._queues:
+            cls = BULK
+        if not self._queues[cls]:
+            # an idle class does not bank credit while it was away
+            busy = [self._vtime[c] for c, q in self._queues.items() if q]
+            if busy:
+                self._vtime[cls] = max(self._vtime[cls], min(busy))
+        self._queues[cls].append(item)
+
+    def pop(self) -> Tuple[str, Any]:
+        cls = min(
+            (c for c, q in self._queues.items() if q),
+            key=lambda c: self._vtime[c]
+        )
+        return cls, self._queues[cls].popleft()
+
+    def charge(self, cls: str, cost: float = 1.0) -> None:
+        self._vtime[cls] += cost / self.weights[cls]
+
+
+class PriorityLimiter:
+    """
+    Counting semaphore with weighted-fair hand-off between priority classes.
+    """
+    def __init__(self, slots: int, weights: Dict[str, float] = PRIORITY_WEIGHTS):
+        self.slots = slots
+        self._free = slots
+        self._cond = threading.Condition()
+        self._waiters = WeightedFairQueue(weights)
+
+    @property
+    def waiting(self) -> Dict[str, int]:
+        with self._cond:
+            return self._waiters.depths()
+
+    @contextmanager
+    def acquire(self, priority: Optional[str] = None) -> Iterator[None]:
+        priority = priority or current_priority()
+        ticket = threading.Event()
+
+        with self._cond:
+            if self._free > 0 and not len(self._waiters):
+                self._free -= 1
+                self._waiters.charge(priority if priority in PRIORITY_WEIGHTS else BULK)
+                ticket.set()
+            else:
+                self._waiters.push(priority, ticket)
+
+        ticket.wait()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._cond:
+            if len(self._waiters):
+                cls, ticket = self._waiters.pop()
+                self._waiters.charge(cls)
+                ticket.set()  # slot passes straight to the next waiter
+            else:
+                self._free += 1
+
+
+class BulkAdmission:
+    """
+    Caps concurrent bulk requests globally and per user, within this
+    process: each worker admits its own max_inflight. try_acquire never
+    blocks: when over capacity the request should be rejected (429).
+    """
+    def __init__(
+        self,
+        max_inflight: int = BULK_MAX_INFLIGHT,
+        max_per_user: int = BULK_MAX_PER_USER,
+        retry_after: int = BULK_RETRY_AFTER_SECONDS
+    ):
+        self.max_inflight = max_inflight
+        self.max_per_user = max_per_user
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._per_user = Counter()
+        self.inflight = 0
+
+    def try_acquire(self, user_id: int) -> bool:
+        with self._lock:
+            if self.inflight >= self.max_inflight:
+                return False
+            if self._per_user[user_id] >= self.max_per_user:
+                return False
+            self.inflight += 1
+            self._per_user[user_id] += 1
+            return True
+
+    def release(self, user_id: int) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self._per_user[user_id] -= 1
+            if self._per_user[user_id] <= 0:
+                del self._per_user[user_id]
+
+
+ocr_limiter = PriorityLimiter(OCR_CONCURRENCY)
+bulk_admission = BulkAdmission()
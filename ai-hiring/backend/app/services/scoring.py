@@ -1,6 +1,4 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from app.services.skills import match_skills, semantic_skill_match
 from app.services.embeddings import EmbeddingService
 from app.services.skill_utils import flatten_skills
@@ -22,6 +20,9 @@ def compute_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     Returns:
         float: similarity score between 0 and 100
     """
+    # sklearn takes >1s to import: not at startup
+    from sklearn.metrics.pairwise import cosine_similarity
+
     # reshape for sklearn (expects 2D arrays)
     v1 = vec1.reshape(1, -1)
     v2 = vec2.reshape(1, -1)
@@ -103,48 +104,151 @@ def rank_resumes(resume_entries: list, jd_text: str, skills_master: dict):
 
     return ranked
 
-def hybrid_score(
+# Bump whenever scoring / embedding changes alter results: it is part of the
+# memoization key for repeated rank requests (see idempotency.py).
+SCORING_VERSION = "1"
+
+# Default weights for the hybrid score. Components are persisted per candidate
+# so sessions can be re-weighted later without re-running the pipeline.
+DEFAULT_WEIGHTS = {
+    "semantic": 0.5,
+    "skill": 0.3,
+    "experience": 0.2
+}
+
+
+def skill_match_percentage(resume_skills: list, jd_skills: list) -> float:
+    if jd_skills:
+        return (len(set(resume_skills) & set(jd_skills)) / len(jd_skills)) * 100
+    return 50
+
+
+def experience_score(resume_experience: float, required_experience: float) -> float:
+    if resume_experience is None or required_experience is None:
+        return 50
+    elif resume_experience >= required_experience:
+        return 100
+    elif resume_experience >= required_experience * 0.7:
+        return 70
+    return 30
+
+
+def score_components(
     semantic_score: float,
     resume_skills: list,
     jd_text: str,
     resume_experience: float,
     required_experience: float,
-    skills_master: dict
-) -> float:
+    skills_master: dict,
+    weights: dict = None
+) -> dict:
     """
-    Compute hybrid score using semantic similarity, skill match, and experience.
+    Compute every component of the hybrid score plus the weighted total.
 
     Returns:
-        float: final score (0–100)
+        dict: semantic_score, skill_match_score, experience_score, final_score
     """
-    # --- Skill match percentage ---
     all_skills = flatten_skills(skills_master)
-
     jd_skills = match_skills(jd_text, all_skills)
 
-    if jd_skills:
-        skill_match_pct = (len(set(resume_skills) & set(jd_skills)) / len(jd_skills)) * 100
-    else:
-        skill_match_pct = 50  
+    skill_pct = skill_match_percentage(resume_skills, jd_skills)
+    exp_score = experience_score(resume_experience, required_experience)
+
+    skill_match_score = round(float(skill_pct), 2)
+
+    # combined from the values that get stored, so reweight_scores over the
+    # stored components reproduces final_score exactly
+    final_score = combine_scores(semantic_score, skill_match_score, exp_score, weights)
+
+    return {
+        "semantic_score": float(semantic_score),
+        "skill_match_score": skill_match_score,
+        "experience_score": float(exp_score),
+        "final_score": final_score
+    }
+
+
+def combine_scores(
+    semantic_score: float,
+    skill_match_score: float,
+    experience_score: float,
+    weights: dict = None
+) -> float:
+    """
+    Weighted total of one candidate's components; the same computation
+    as reweight_scores, so stored and re-weighted scores are comparable.
+    """
+    components = np.array([[semantic_score, skill_match_score, experience_score]], dtype=float)
+    return float(reweight_scores(components, weights or DEFAULT_WEIGHTS)[0])
 
-    # --- Experience score ---
-    if resume_experience is None or required_experience is None:
-        exp_score = 50
-    elif resume_experience >= required_experience:
-        exp_score = 100
-    elif resume_experience >= required_experience * 0.7:
-        exp_score = 70
-    else:
-        exp_score = 30
 
-    # --- Weighted final score ---
-    final_score = (
-        0.5 * semantic_score +
-        0.3 * skill_match_pct +
-        0.2 * exp_score
+def reweight_scores(components: np.ndarray, weights: dict) -> np.ndarray:
+    """
+    Vectorized re-scoring of stored components.
+
+    Args:
+        components (np.ndarray): shape (n, 3) — semantic, skill match, experience
+        weights (dict): semantic / skill / experience weights, normalized
+            to sum to 1 (so only their ratios matter)
+
+    Returns:
+        np.ndarray: final scores (0–100), rounded to 2 decimals
+    """
+    if components.size == 0:
+        return np.array([])
+
+    w = np.array(
+        [weights["semantic"], weights["skill"], weights["experience"]],
+        dtype=float
     )
+    total = w.sum()
+    if total > 0:
+        w = w / total
+
+    # rows persisted before components were stored have NULLs:
+    # fall back to the same neutral 50 hybrid_score uses for unknowns
+    components = np.nan_to_num(components.astype(float), nan=50.0)
+
+    # term by term rather than a matmul: BLAS may sum a matrix and a single
+    # row in different orders, and rounding would then differ by 0.01
+    return np.round(components[:, 0] * w[0] + components[:, 1] * w[1] + components[:, 2] * w[2], 2)
 
-    return round(float(final_score), 2)
+
+def hybrid_score(
+    semantic_score: float,
+    resume_skills: list,
+    jd_text: str,
+    resume_experience: float,
+    required_experience: float,
+    skills_master: dict
+) -> float:
+    """
+    Compute hybrid score using semantic similarity, skill match, and experience.
+
+    Returns:
+        float: final score (0–100)
+    """
+    return score_components(
+        semantic_score=semantic_score,
+        resume_skills=resume_skills,
+        jd_text=jd_text,
+        resume_experience=resume_experience,
+        required_experience=required_experience,
+        skills_master=skills_master
+    )["final_score"]
+
+
+def verdict_for_score(final_score: float) -> tuple[str, str]:
+    """
+    Map a final score to (verdict, confidence).
+    """
+    if final_score >= 75:
+        return "Strong Match", "High"
+    elif final_score >= 60:
+        return "Good Match", "Medium"
+    elif final_score >= 45:
+        return "Average Match", "Low"
+    return "Weak Match", "Very Low"
 
 def generate_recruiter_feedback(
     final_score: float,
@@ -155,18 +259,7 @@ def generate_recruiter_feedback(
 ) -> dict:
 
     # --- Verdict label ---
-    if final_score >= 75:
-        verdict = "Strong Match"
-        confidence = "High"
-    elif final_score >= 60:
-        verdict = "Good Match"
-        confidence = "Medium"
-    elif final_score >= 45:
-        verdict = "Average Match"
-        confidence = "Low"
-    else:
-        verdict = "Weak Match"
-        confidence = "Very Low"
+    verdict, confidence = verdict_for_score(final_score)
 
     # --- Why this candidate ---
     if final_score >= 75:
@@ -0,0 +1,112 @@
+"""
+backend/app/services/skill_taxonomy.py
+
+The live skill taxonomy: skills.json (+ synonyms) merged with the
+UnknownSkill rows an admin has approved.
+- Readers take `skill_taxonomy.current` once and use its .skills /
+  .categories. A reload builds a new Taxonomy and swaps the reference, so
+  in-flight requests finish on the version they started with and no
+  worker restarts
+- Reloads are incremental: the base (compiled artifact, see taxonomy.py)
+  is never rebuilt, the keyword trie gets path-copied insertions for the
+  approved names, and only skills the current version has no embedding
+  for are encoded
+- Triggers: the app lifespan reloads at startup and then polls every
+  TAXONOMY_POLL_SECONDS (0: startup only); nothing is rebuilt unless the
+  approved set changed. POST /api/system/taxonomy/reload (admin) reloads
+  the worker serving it at once; the other workers follow on their next poll
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.unknown_skill import UnknownSkill
+from app.services.skill_utils import TAXONOMY
+from app.services.taxonomy import Taxonomy
+
+TAXONOMY_POLL_SECONDS = float(os.getenv("TAXONOMY_POLL_SECONDS", 60))
+
+
+class SkillTaxonomy:
+    def __init__(self, base: Taxonomy, session_factory: Callable[[], Session]):
+        self.base = base
+        self.current = base
+        self.approved: tuple = ()
+        self.loaded_at: Optional[datetime] = None
+        self._session_factory = session_factory
+        # one rebuild at a time; readers never take it
+        self._lock = threading.Lock()
+
+    def approved_skills(self) -> list[str]:
+        db = self._session_factory()
+        try:
+            return [
+                name for name in db.execute(
+                    select(UnknownSkill.name)
+                    .where(UnknownSkill.approved.is_(True))
+                    .order_by(UnknownSkill.id)
+                ).scalars()
+                if name
+            ]
+        finally:
+            db.close()
+
+    def reload(self) -> dict:
+        """Swap in base + approved skills if the approved set changed."""
+        with self._lock:
+            approved = tuple(self.approved_skills())
+            if approved == self.approved:
+                return self.report(changed=False)
+
+            start = time.perf_counter()
+            previous = self.current
+            taxonomy = self.base.with_skills(list(approved), reuse=previous)
+            added = [s for s in taxonomy.skills if s not in previous.index]
+            removed = [s for s in previous.skills if s not in taxonomy.index]
+
+            self.current, self.approved = taxonomy, approved
+            self.loaded_at = datetime.now(timezone.utc)
+
+        print(
+            f"Taxonomy {taxonomy.version}: {len(taxonomy.skills)} skills "
+            f"(+{len(added)} -{len(removed)}) in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return self.report(changed=True, added=added, removed=removed)
+
+    def report(self, changed: Optional[bool] = None, **details) -> dict:
+        taxonomy = self.current
+        return {
+            "version": taxonomy.version,
+            "base_version": self.base.version,
+            "skills": len(taxonomy.skills),
+            "approved": len(taxonomy.skills) - len(self.base.skills),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            **({"changed": changed} if changed is not None else {}),
+            **details,
+        }
+
+    async def run(self) -> None:
+        """Startup load, then poll; started from the app lifespan."""
+        while True:
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                print("Taxonomy reload failed:", e)
+            if TAXONOMY_POLL_SECONDS <= 0:
+                return
+            await asyncio.sleep(TAXONOMY_POLL_SECONDS)
+
+
+def _default_session_factory() -> Session:
+    from app.db.database import SessionLocal
+    return SessionLocal()
+
+
+skill_taxonomy = SkillTaxonomy(TAXONOMY, _default_session_factory)
@@ -0,0 +1,167 @@
+"""
+backend/app/services/skill_tracker.py
+
+Write-behind frequency tracking for UnknownSkill.
+- Requests only bump an in-memory Counter (no DB work per resume)
+- A background task flushes every UNKNOWN_SKILL_FLUSH_SECONDS, or earlier
+  once UNKNOWN_SKILL_FLUSH_THRESHOLD distinct names are pending
+- A flush is one INSERT ... ON CONFLICT (name) DO UPDATE
+  SET frequency = frequency + excluded.frequency, so counts stay exact
+  under concurrent requests and across workers
+"""
+
+import asyncio
+import os
+import threading
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.unknown_skill import UnknownSkill
+from app.services.persistence import count_unknown_skills
+
+FLUSH_SECONDS = float(os.getenv("UNKNOWN_SKILL_FLUSH_SECONDS", 5))
+FLUSH_THRESHOLD = int(os.getenv("UNKNOWN_SKILL_FLUSH_THRESHOLD", 500))
+
+
+def _upsert_statement(dialect: str, rows: list[dict]):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    stmt = insert(UnknownSkill).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[UnknownSkill.name],
+        set_={"frequency": UnknownSkill.frequency + stmt.excluded.frequency}
+    )
+
+
+class UnknownSkillTracker:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_seconds: float = FLUSH_SECONDS,
+        flush_threshold: int = FLUSH_THRESHOLD
+    ):
+        self._session_factory = session_factory
+        self.flush_seconds = flush_seconds
+        self.flush_threshold = flush_threshold
+
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, skills: Iterable[str]) -> None:
+        """Count one resume's skills (each distinct skill counts once)."""
+        self.add_counts(count_unknown_skills([skills]))
+
+    def add_counts(self, counts: Counter) -> None:
+        if not counts:
+            return
+
+        with self._lock:
+            self._pending.update(counts)
+            full = len(self._pending) >= self.flush_threshold
+
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def flush(self) -> int:
+        """
+        Write pending counts in one upsert. Returns number of names written.
+        On failure the counts are put back so nothing is lost.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+
+        if not batch:
+            return 0
+
+        rows = [{"name": n, "frequency": c} for n, c in sorted(batch.items())]
+
+        db = self._session_factory()
+        try:
+            stmt = _upsert_statement(db.get_bind().dialect.name, rows)
+            if stmt is not None:
+                db.execute(stmt)
+            else:
+                self._merge_fallback(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending.update(batch)
+            raise
+        finally:
+            db.close()
+
+        return len(rows)
+
+    @staticmethod
+    def _merge_fallback(db: Session, batch: Counter) -> None:
+        # Dialects without ON CONFLICT: row-lock and merge in one transaction
+        existing = {
+            row.name: row
+            for row in db.execute(
+                select(UnknownSkill)
+                .where(UnknownSkill.name.in_(list(batch)))
+                .with_for_update()
+            ).scalars()
+        }
+        for name, n in batch.items():
+            if name in existing:
+                existing[name].frequency += n
+            else:
+                db.add(UnknownSkill(name=name, frequency=n))
+
+    async def run(self) -> None:
+        """Background flush loop; started from the app lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.flush_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    print("Unknown skill flush failed:", e)
+        finally:
+            self._loop = None
+
+    async def stop(self, task: asyncio.Task) -> None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # last flush: a DB error here must not abort the rest of shutdown
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            print("Unknown skill flush failed at shutdown:", e)
+
+
+def _default_session_factory() -> Session:
+    from app.db.database import SessionLocal
+    return SessionLocal()
+
+
+unknown_skill_tracker = UnknownSkillTracker(_default_session_factory)
@@ -1,10 +1,33 @@
+import json
 from typing import List, Dict
 
+from app.services.taxonomy import SKILLS_PATH, load_taxonomy
+
+
 def flatten_skills(skills_json: Dict[str, List[str]]) -> List[str]:
     """
     Convert categorized skills.json into a flat skill list.
     """
+    taxonomy = getattr(skills_json, "taxonomy", None)
+    if taxonomy is not None:
+        return taxonomy.skills
     flat = []
     for _, skills in skills_json.items():
         flat.extend(skills)
     return list(set(flat))
+
+
+def load_skills_master(path: str = SKILLS_PATH) -> Dict[str, List[str]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+# compiled artifact if there's a current one (see app/services/taxonomy.py).
+# The taxonomy as shipped: request paths use skill_taxonomy.current, which
+# adds approved UnknownSkill rows (app/services/skill_taxonomy.py)
+TAXONOMY = load_taxonomy()
+SKILLS_LIST = TAXONOMY.categories
+FLAT_SKILLS = TAXONOMY.skills
@@ -1,31 +1,34 @@
 import re
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Optional
 from datetime import datetime
+from app.core.metrics import timed
 from app.services.embeddings import EmbeddingService
+from app.services.taxonomy import normalize_text
 
 def get_embedding(text: str) -> np.ndarray | None:
     if not text or not text.strip():
         return None
     return EmbeddingService.encode([text])[0]
 
-def normalize_text(text: str) -> str:
-    return re.sub(r"[^a-z0-9+.# ]", " ", text.lower())
-
 
+@timed("keyword_match")
 def match_skills(text: str, skills_list: list[str]) -> list[str]:
     """
     Robust skill matching:
     - Supports multi-word skills
     - Case-insensitive
     - Space-normalized
+    - Also matches aliases ("k8s") for a taxonomy's own skill list
     """
 
     if not text or not skills_list:
         return []
 
+    taxonomy = getattr(skills_list, "taxonomy", None)
+    if taxonomy is not None:
+        return taxonomy.match(text)
+
     text_norm = f" {normalize_text(text)} "
 
     found = []
@@ -36,6 +39,7 @@ def match_skills(text: str, skills_list: list[str]) -> list[str]:
 
     return found
 
+@timed("semantic_match")
 def semantic_skill_match(
     text: str,
     skills_list: list[str],
@@ -58,6 +62,15 @@ def semantic_skill_match(
         return []
 
     sentence_vecs = EmbeddingService.encode(sentences)
+
+    # a taxonomy's skill matrix is precomputed (or encoded once)
+    taxonomy = getattr(skills_list, "taxonomy", None)
+    if taxonomy is not None:
+        return taxonomy.semantic_match(sentence_vecs, threshold)
+
+    # sklearn takes >1s to import: not at startup
+    from sklearn.metrics.pairwise import cosine_similarity
+
     skill_vecs = EmbeddingService.encode(skills_list)
 
     matched = set()
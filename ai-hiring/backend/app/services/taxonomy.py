@@ -0,0 +1,436 @@
+"""
+backend/app/services/taxonomy.py
+
+The skill taxonomy, compiled once instead of per request.
+- Sources: data/skills.json (category -> skills) and
+  data/skill_synonyms.json (skill -> aliases, e.g. "k8s" -> Kubernetes)
+- Compiled form: skills in a fixed (sorted) order, their normalized forms,
+  the alias map, a token trie for keyword matching (one pass over the
+  text instead of one substring scan per skill) and the L2-normalized
+  skill embedding matrix for EMBED_MODEL_NAME
+- Build step: `python -m app.services.taxonomy` writes the artifact to
+  TAXONOMY_ARTIFACT_PATH (manifest.json + embeddings-<version>.npy). The
+  server memory-maps the matrix, so workers share one copy in the page
+  cache and nothing is encoded at startup
+- The artifact is rejected (and the taxonomy compiled in memory from the
+  sources, with the matrix encoded on first use) when it is stale
+  (source hashes differ), for another model, or when the live model's
+  embedding of a probe text doesn't match the one stored at build time
+- A Taxonomy is immutable once published: with_skills() derives a new
+  one with extra (approved) skills, see app/services/skill_taxonomy.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.embeddings import EMBED_MODEL_NAME, PROBE_TEXT, EmbeddingService
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data"
+)
+SKILLS_PATH = os.path.join(DATA_DIR, "skills.json")
+SYNONYMS_PATH = os.path.join(DATA_DIR, "skill_synonyms.json")
+TAXONOMY_ARTIFACT_PATH = os.getenv(
+    "TAXONOMY_ARTIFACT_PATH",
+    os.path.join(DATA_DIR, "taxonomy")
+)
+
+FORMAT_VERSION = 1
+PROBE_MIN_SIMILARITY = 0.999
+APPROVED_CATEGORY = "Approved"
+# trie node key marking "a skill ends here"; normalized tokens never contain it
+_END = "$"
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"[^a-z0-9+.# ]", " ", text.lower())
+
+
+def _tokens(text: str) -> List[str]:
+    # split on single spaces: a skill "ci cd" must not match "ci  cd",
+    # exactly like the padded substring test it replaces
+    return normalize_text(text).split(" ")
+
+
+def _file_sha256(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _trie_insert(root: dict, text: str, idx: int) -> dict:
+    """
+    Copy of root with text added. Only the nodes on its path are copied:
+    the original stays valid for requests still matching against it.
+    """
+    root = dict(root)
+    node = root
+    for token in _tokens(text):
+        child = dict(node.get(token, {}))
+        node[token] = child
+        node = child
+    ends = list(node.get(_END, []))
+    if idx not in ends:
+        ends.append(idx)
+    node[_END] = ends
+    return root
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class SkillList(list):
+    """A taxonomy's skills; match_skills() takes the fast path for these."""
+    taxonomy: "Taxonomy"
+
+
+class SkillCategories(dict):
+    """A taxonomy's category -> skills map (the skills_master argument)."""
+    taxonomy: "Taxonomy"
+
+
+class Taxonomy:
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        synonyms: Dict[str, List[str]],
+        trie: Optional[dict] = None,
+        source: Optional[dict] = None,
+        version: Optional[str] = None,
+        matrix_path: Optional[str] = None,
+        probe_vector: Optional[List[float]] = None,
+        skills: Optional[List[str]] = None
+    ):
+        self.categories = SkillCategories(categories)
+        self.categories.taxonomy = self
+        # sorted, unless derived: skills appended later keep existing indices stable
+        self.skills = SkillList(
+            skills if skills is not None
+            else sorted({s for skills in categories.values() for s in skills})
+        )
+        self.skills.taxonomy = self
+        self.index = {skill: i for i, skill in enumerate(self.skills)}
+        self.normalized = [normalize_text(s) for s in self.skills]
+
+        unknown = sorted(set(synonyms) - set(self.index))
+        if unknown:
+            raise ValueError(f"Synonyms for skills not in the taxonomy: {', '.join(unknown)}")
+        self.synonyms = synonyms
+
+        self.trie = trie if trie is not None else self._build_trie()
+        self.source = source
+        self.version = version
+        self._matrix_path = matrix_path
+        self._probe_vector = probe_vector
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _build_trie(self) -> dict:
+        root: dict = {}
+        entries = [(s, i) for i, s in enumerate(self.skills)]
+        entries += [(alias, self.index[skill]) for skill, aliases in self.synonyms.items() for alias in aliases]
+        for text, idx in entries:
+            node = root
+            for token in _tokens(text):
+                node = node.setdefault(token, {})
+            ends = node.setdefault(_END, [])
+            if idx not in ends:
+                ends.append(idx)
+        return root
+
+    def with_skills(self, names: List[str], reuse: Optional["Taxonomy"] = None) -> "Taxonomy":
+        """
+        This taxonomy plus names (under APPROVED_CATEGORY), appended after
+        the existing skills. Names already known (case-insensitively) are
+        skipped. The skill matrix is built eagerly: this one's rows plus
+        the new skills' embeddings, taken from reuse where it has them and
+        encoded otherwise.
+        """
+        known = {s.lower() for s in self.skills}
+        extra = []
+        for name in names:
+            name = name.strip()
+            # a name with no matchable characters would match every text
+            if not normalize_text(name).strip() or name.lower() in known:
+                continue
+            known.add(name.lower())
+            extra.append(name)
+        if not extra:
+            return self
+
+        trie = self.trie
+        for i, name in enumerate(extra, start=len(self.skills)):
+            trie = _trie_insert(trie, name, i)
+
+        categories = dict(self.categories)
+        categories[APPROVED_CATEGORY] = list(categories.get(APPROVED_CATEGORY, [])) + extra
+        digest = hashlib.sha256(json.dumps(extra).encode()).hexdigest()[:8]
+        derived = Taxonomy(
+            categories,
+            self.synonyms,
+            trie=trie,
+            source=self.source,
+            version=f"{self.version}+{digest}",
+            skills=self.skills + extra
+        )
+
+        rows: List[Optional[np.ndarray]] = [None] * len(extra)
+        if reuse is not None and reuse._matrix is not None:
+            for i, name in enumerate(extra):
+                if name in reuse.index:
+                    rows[i] = reuse._matrix[reuse.index[name]]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            encoded = _l2_normalize(EmbeddingService.encode([extra[i] for i in missing]))
+            for i, row in zip(missing, encoded):
+                rows[i] = row
+        derived._matrix = np.vstack([self.skill_matrix(), np.stack(rows)]).astype(np.float32)
+        return derived
+
+    # ---------------- Keyword matching ----------------
+
+    def match(self, text: str) -> List[str]:
+        """Skills (or their aliases) found in text, in taxonomy order."""
+        if not text:
+            return []
+
+        tokens = _tokens(text)
+        n = len(tokens)
+        found = set()
+        for start in range(n):
+            node = self.trie.get(tokens[start])
+            pos = start + 1
+            while node is not None:
+                ends = node.get(_END)
+                if ends:
+                    found.update(ends)
+                if pos == n:
+                    break
+                node = node.get(tokens[pos])
+                pos += 1
+        return [self.skills[i] for i in sorted(found)]
+
+    # ---------------- Semantic matching ----------------
+
+    def skill_matrix(
+        self,
+        encode: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        (skills, dim) L2-normalized embeddings: the artifact's, or encoded
+        once with `encode` (EmbeddingService.encode by default; warm-up
+        passes encode_unbatched so no batcher thread starts before fork).
+        """
+        if self._matrix is None:
+            encode = encode or EmbeddingService.encode
+            with self._lock:
+                if self._matrix is None:
+                    self._matrix = self._load_matrix(encode)
+                    if self._matrix is None:
+                        self._matrix = _l2_normalize(encode(self.skills))
+        return self._matrix
+
+    def _load_matrix(self, encode: Callable[[List[str]], np.ndarray]) -> Optional[np.ndarray]:
+        if self._matrix_path is None:
+            return None
+        try:
+            matrix = np.load(self._matrix_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print("Taxonomy: embedding matrix unreadable, re-encoding:", e)
+            return None
+
+        # the name matched at load; this catches re-trained / re-exported
+        # weights published under the same name
+        live = _l2_normalize(encode([PROBE_TEXT]))[0]
+        stored = np.asarray(self._probe_vector, dtype=np.float32)
+        if (
+            matrix.shape != (len(self.skills), live.shape[0])
+            or stored.shape != live.shape
+            or float(live @ stored) < PROBE_MIN_SIMILARITY
+        ):
+            print(
+                f"Taxonomy: artifact {self.version} embeddings don't match the loaded "
+                f"{EMBED_MODEL_NAME} model; re-encoding the skills"
+            )
+            return None
+        return matrix
+
+    def semantic_match(self, sentence_vecs: np.ndarray, threshold: float) -> List[str]:
+        """Skills whose cosine similarity to any sentence reaches threshold."""
+        if len(sentence_vecs) == 0:
+            return []
+        sims = _l2_normalize(sentence_vecs) @ self.skill_matrix().T
+        best = sims.max(axis=0)
+        return [self.skills[i] for i in np.flatnonzero(best >= threshold)]
+
+
+# ---------------- Sources, artifact ----------------
+
+def _source_info(skills_path: str, synonyms_path: str) -> dict:
+    return {
+        "skills_sha256": _file_sha256(skills_path),
+        "synonyms_sha256": _file_sha256(synonyms_path),
+    }
+
+
+def compile_from_sources(skills_path: str = SKILLS_PATH, synonyms_path: str = SYNONYMS_PATH) -> Taxonomy:
+    source = _source_info(skills_path, synonyms_path)
+    digest = hashlib.sha256(json.dumps(source, sort_keys=True).encode()).hexdigest()[:8]
+    return Taxonomy(
+        _read_json(skills_path),
+        _read_json(synonyms_path),
+        source=source,
+        version=f"sources-{digest}"
+    )
+
+
+def build_artifact(
+    out_dir: str = TAXONOMY_ARTIFACT_PATH,
+    skills_path: str = SKILLS_PATH,
+    synonyms_path: str = SYNONYMS_PATH
+) -> dict:
+    """Compile the taxonomy and write it to out_dir; returns the manifest."""
+    taxonomy = compile_from_sources(skills_path, synonyms_path)
+    matrix = _l2_normalize(EmbeddingService.get_model().encode(taxonomy.skills, show_progress_bar=False))
+    probe = _l2_normalize(EmbeddingService.get_model().encode([PROBE_TEXT], show_progress_bar=False))[0]
+
+    version = hashlib.sha256(json.dumps({
+        "format": FORMAT_VERSION,
+        "source": taxonomy.source,
+        "model": EMBED_MODEL_NAME,
+        "matrix": hashlib.sha256(matrix.tobytes()).hexdigest(),
+    }, sort_keys=True).encode()).hexdigest()[:16]
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": taxonomy.source,
+        "model": {
+            "name": EMBED_MODEL_NAME,
+            "dim": int(matrix.shape[1]),
+            "probe_vector": probe.tolist(),
+        },
+        "categories": taxonomy.categories,
+        "synonyms": taxonomy.synonyms,
+        "skills": taxonomy.skills,
+        "normalized": taxonomy.normalized,
+        "trie": taxonomy.trie,
+        "embeddings": f"embeddings-{version}.npy",
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    matrix_path = os.path.join(out_dir, manifest["embeddings"])
+    with open(matrix_path + ".tmp", "wb") as f:
+        np.save(f, matrix)
+    os.replace(matrix_path + ".tmp", matrix_path)
+
+    # the manifest switches readers over to the new matrix in one rename
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    for name in os.listdir(out_dir):
+        if name.startswith("embeddings-") and name != manifest["embeddings"]:
+            os.remove(os.path.join(out_dir, name))
+    return manifest
+
+
+def load_artifact(
+    path: str = TAXONOMY_ARTIFACT_PATH,
+    skills_path: str = SKILLS_PATH,
+    synonyms_path: str = SYNONYMS_PATH
+) -> Optional[Taxonomy]:
+    """The compiled taxonomy, or None (with the reason) if it can't be used."""
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print("Taxonomy: artifact manifest unreadable:", e)
+        return None
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        reason = f"format {manifest.get('format_version')} (expected {FORMAT_VERSION})"
+    elif manifest["model"]["name"] != EMBED_MODEL_NAME:
+        reason = f"built for model {manifest['model']['name']}, serving {EMBED_MODEL_NAME}"
+    elif manifest["source"] != _source_info(skills_path, synonyms_path):
+        reason = "skills.json / skill_synonyms.json changed since it was built"
+    else:
+        reason = None
+    if reason:
+        print(f"Taxonomy: ignoring artifact {manifest.get('version')}: {reason}")
+        return None
+
+    return Taxonomy(
+        manifest["categories"],
+        manifest["synonyms"],
+        trie=manifest["trie"],
+        source=manifest["source"],
+        version=manifest["version"],
+        matrix_path=os.path.join(path, manifest["embeddings"]),
+        probe_vector=manifest["model"]["probe_vector"]
+    )
+
+
+def load_taxonomy() -> Taxonomy:
+    start = time.perf_counter()
+    taxonomy = load_artifact()
+    if taxonomy is None:
+        taxonomy = compile_from_sources()
+        origin = "compiled from sources"
+    else:
+        origin = f"artifact {taxonomy.version}"
+    print(
+        f"Taxonomy: {len(taxonomy.skills)} skills, {origin} "
+        f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    return taxonomy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the skill taxonomy artifact")
+    parser.add_argument("--out", default=TAXONOMY_ARTIFACT_PATH)
+    parser.add_argument("--skills", default=SKILLS_PATH)
+    parser.add_argument("--synonyms", default=SYNONYMS_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = build_artifact(args.out, args.skills, args.synonyms)
+    print(
+        f"Wrote taxonomy artifact {manifest['version']} to {args.out}: "
+        f"{len(manifest['skills'])} skills, {manifest['model']['name']} "
+        f"({manifest['model']['dim']}d), {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+backend/app/services/warmup.py
+
+Model warm-up and readiness.
+- Nothing heavy loads at import: spaCy, sklearn and sentence-transformers
+  (torch) are imported on first use, so `import app.main` and the first
+  answer to /healthz are fast
+- preload_models() loads all of them and the taxonomy's skill matrix;
+  lifespan runs it in a background thread (WARMUP_ON_STARTUP=1) and
+  /readyz answers 503 until it has finished
+- Pre-fork mode (app/serve.py) runs it in the gunicorn master before
+  forking, so each worker's own warm-up finds everything loaded
+- A failed warm-up leaves the service not ready (with the error on
+  /readyz); requests still try to load models lazily
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+
+def preload_models() -> None:
+    """Load and warm everything requests would otherwise load lazily."""
+    from app.services import nlp
+    from app.services.embeddings import EmbeddingService
+    from app.services.skill_taxonomy import skill_taxonomy
+
+    start = time.perf_counter()
+    spacy_nlp = nlp.get_spacy()
+    import sklearn.metrics.pairwise  # noqa: F401
+    EmbeddingService.warm(["warm-up"])
+    # maps the compiled skill matrix (or encodes the skills, without one);
+    # unbatched: this also runs in the pre-fork master
+    skill_taxonomy.current.skill_matrix(EmbeddingService.encode_unbatched)
+    print(
+        f"Preloaded models in {time.perf_counter() - start:.1f}s "
+        f"(spaCy: {'yes' if spacy_nlp is not None else 'no'}, "
+        f"cached embeddings: {len(EmbeddingService._cache)})"
+    )
+
+
+class ModelWarmup:
+    def __init__(self):
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        # without a startup warm-up, models load on first use
+        return self.status == "ready" or not WARMUP_ON_STARTUP
+
+    async def run(self) -> None:
+        self.status = "running"
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(preload_models)
+        except Exception as e:
+            print("Model warm-up failed:", e)
+            self.status, self.error = "failed", str(e)
+        else:
+            self.status = "ready"
+        self.seconds = round(time.perf_counter() - start, 2)
+
+    def report(self) -> dict:
+        return {
+            "status": self.status if WARMUP_ON_STARTUP else "lazy",
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+model_warmup = ModelWarmup()
@@ -0,0 +1,258 @@
+"""
+backend/benchmarks/chunked_embedding.py
+
+Whole-text vs chunked document embedding (app/services/chunking.py) on the
+synthetic corpus (benchmarks/corpus.py): throughput, padding, and ranking
+quality.
+- Resumes are short / medium / long; in half of them the Skills section
+  comes last, as it does in many real layouts
+- Modes: "whole" (one text per resume, truncated by the model), "chunked"
+  (chunks sent in document order) and "bucketed" (chunks sorted by length,
+  what encode_documents does), the latter with mean and max pooling. All
+  go through the micro-batcher with a cold cache
+- Quality: each JD ranks the resumes by cosine similarity; NDCG@k against
+  the number of JD skills the resume lists (keyword-matched on full
+  texts), over all resumes and over the long ones only
+
+By default uses a stand-in model so it runs offline: IDF-weighted, signed
+feature hashing of the words a 256-word-piece model would see (truncated
+like all-MiniLM-L6-v2). The IDF weights, fitted on the corpus, stand in
+for a trained model paying little attention to template text; without
+them the shared boilerplate of long resumes swamps everything. Its
+forward-pass cost grows with the padded batch (sub-batches of 32, sorted
+by length within each call, as sentence-transformers does). Pass --real
+to use all-MiniLM-L6-v2.
+
+Usage (from backend/):
+    python -m benchmarks.chunked_embedding
+    python -m benchmarks.chunked_embedding --resumes 300 --jds 20 --real
+"""
+
+import os
+
+# cold, per-process cache only: every mode pays for its own encoding
+os.environ["EMBED_SHARED_CACHE_PATH"] = ""
+
+import argparse
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.services import chunking
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embeddings import EmbeddingCache, EmbeddingService
+from app.services.skill_utils import SKILLS_LIST
+from app.services.skills import match_skills
+from benchmarks import corpus
+
+_WORD = re.compile(r"\w+")
+
+
+class TruncatingHashModel:
+    """
+    IDF-weighted bag-of-words vectors of the first `max_seq_length` word
+    pieces (as estimated by chunking.estimate_tokens); call fit() first.
+    Costs `per_token_us` per padded token; counts real and padded tokens.
+    """
+
+    def __init__(self, per_token_us: float = 10.0, max_seq_length: int = 256,
+                 sub_batch: int = 32, dim: int = 384):
+        self.per_token = per_token_us / 1e6
+        self.max_seq_length = max_seq_length
+        self.sub_batch = sub_batch
+        self.dim = dim
+        self._lock = threading.Lock()
+        self.idf: dict[str, float] = {}
+        self.unseen = 0.0
+        self.tokens = 0
+        self.padded = 0
+
+    def fit(self, texts: list[str]) -> None:
+        df = Counter(w for text in texts for w in set(_WORD.findall(text.lower())))
+        self.idf = {w: math.log(len(texts) / n) for w, n in df.items()}
+        self.unseen = math.log(len(texts))
+
+    def _truncate(self, text: str) -> tuple[list[str], int]:
+        words, size = [], 2  # [CLS] / [SEP]
+        for word in _WORD.findall(text.lower()):
+            n = chunking.estimate_tokens(word)
+            if size + n > self.max_seq_length:
+                break
+            words.append(word)
+            size += n
+        return words, size
+
+    def _vector(self, words: list[str]) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in words:
+            h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            weight = self.idf.get(word, self.unseen)
+            vec[h % self.dim] += weight if (h >> 32) & 1 else -weight
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        truncated = [self._truncate(t) for t in texts]
+        out = np.stack([self._vector(words) for words, _ in truncated])
+
+        sizes = sorted(size for _, size in truncated)
+        padded = sum(
+            len(sizes[i:i + self.sub_batch]) * max(sizes[i:i + self.sub_batch])
+            for i in range(0, len(sizes), self.sub_batch)
+        )
+        with self._lock:
+            self.tokens += sum(sizes)
+            self.padded += padded
+            time.sleep(self.per_token * padded)
+        return out
+
+
+# ---------------- Corpus ----------------
+
+def _skills_last(text: str) -> str:
+    """Move the Skills section (heading + one line) to the end."""
+    lines = text.split("\n")
+    i = lines.index("Skills")
+    block = lines[i:i + 3]  # heading, skills, blank line
+    rest = lines[:i] + lines[i + 3:]
+    return "\n".join(rest + [""] + block[:2])
+
+
+def make_corpus(resumes: int, jds: int) -> tuple[list[str], list[str]]:
+    sizes = ("short", "medium", "long")
+    texts = []
+    for seed in range(resumes):
+        text = corpus.make_resume(seed, sizes[seed % 3])
+        texts.append(_skills_last(text) if seed % 2 else text)
+    return texts, [corpus.make_job_description(10_000 + j) for j in range(jds)]
+
+
+# ---------------- Modes ----------------
+
+def _reset() -> None:
+    EmbeddingService._cache = EmbeddingCache()
+    model = EmbeddingService.get_model()
+    if isinstance(model, TruncatingHashModel):
+        model.tokens = model.padded = 0
+
+
+def embed(mode: str, pooling: str, texts: list[str]) -> np.ndarray:
+    if mode == "whole":
+        return EmbeddingService.encode(texts)
+    if mode == "bucketed":
+        return np.stack([d["vector"] for d in chunking.encode_documents(texts, pooling)])
+
+    # chunked, document order: no length sort before the batcher
+    documents = [chunking.chunk_document(text) for text in texts]
+    chunks = list(dict.fromkeys(c for doc in documents for _, c, _ in doc))
+    row = {c: i for i, c in enumerate(chunks)}
+    vectors = EmbeddingService.encode(chunks)
+    return np.stack([
+        chunking.pool(
+            vectors[[row[c] for _, c, _ in doc]],
+            np.array([n for _, _, n in doc], dtype=np.float32),
+            pooling
+        )
+        for doc in documents
+    ])
+
+
+def ndcg_at_k(scores: np.ndarray, relevance: np.ndarray, k: int) -> float:
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    gains = 2.0 ** relevance - 1
+    dcg = float(np.sum(gains[np.argsort(-scores)[:k]] * discounts[:min(k, len(scores))]))
+    ideal = float(np.sum(np.sort(gains)[::-1][:k] * discounts[:min(k, len(scores))]))
+    return dcg / ideal if ideal else 1.0
+
+
+def _ndcg(similarity: np.ndarray, relevance: np.ndarray, k: int) -> float:
+    return float(np.mean([
+        ndcg_at_k(similarity[j], relevance[j], k) for j in range(len(similarity))
+    ]))
+
+
+def run(
+    mode: str,
+    pooling: str,
+    resumes: list[str],
+    jds: list[str],
+    relevance: np.ndarray,
+    long: np.ndarray,
+    k: int
+) -> dict:
+    _reset()
+    batcher = EmbeddingService.get_batcher()
+    batches = batcher.batches
+
+    start = time.perf_counter()
+    doc_vectors = embed(mode, pooling, resumes)
+    elapsed = time.perf_counter() - start
+
+    model = EmbeddingService.get_model()
+    result = {
+        "docs_per_s": len(resumes) / elapsed,
+        "forward_passes": batcher.batches - batches,
+    }
+    if isinstance(model, TruncatingHashModel):
+        result["tokens"] = model.tokens
+        result["padding"] = 1 - model.tokens / model.padded if model.padded else 0.0
+
+    # the JDs are short: whole-text vectors in every mode
+    jd_vectors = EmbeddingService.encode(jds)
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = jd_vectors / np.linalg.norm(jd_vectors, axis=1, keepdims=True)
+    similarity = queries @ docs.T
+    result["ndcg"] = _ndcg(similarity, relevance, k)
+    result["ndcg_long"] = _ndcg(similarity[:, long], relevance[:, long], k)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whole-text vs chunked document embedding")
+    parser.add_argument("--resumes", type=int, default=150)
+    parser.add_argument("--jds", type=int, default=10)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--per-token-us", type=float, default=10.0)
+    parser.add_argument("--real", action="store_true")
+    args = parser.parse_args()
+
+    resumes, jds = make_corpus(args.resumes, args.jds)
+    long = np.arange(len(resumes)) % 3 == 2
+
+    if not args.real:
+        model = TruncatingHashModel(args.per_token_us)
+        model.fit(resumes + jds)
+        EmbeddingService._model = model
+    EmbeddingService._batcher = EmbeddingBatcher(EmbeddingService._encode_batch)
+    resume_skills = [set(match_skills(text, SKILLS_LIST)) for text in resumes]
+    relevance = np.array([
+        [len(set(match_skills(jd, SKILLS_LIST)) & skills) for skills in resume_skills]
+        for jd in jds
+    ], dtype=np.float64)
+
+    words = sum(chunking.estimate_tokens(t) for t in resumes)
+    print(
+        f"{len(resumes)} resumes (~{words / len(resumes):.0f} word pieces each), "
+        f"{len(jds)} JDs, chunks of <= {chunking.chunk_token_limit()} word pieces"
+    )
+    print(
+        f"{'mode':>9} {'pooling':>7} {'docs/s':>8} {'passes':>7} {'tokens':>8} "
+        f"{'padding':>8} {f'NDCG@{args.k}':>8} {'(long)':>8}"
+    )
+    for mode, pooling in (("whole", "-"), ("chunked", "mean"), ("bucketed", "mean"), ("bucketed", "max")):
+        r = run(mode, pooling, resumes, jds, relevance, long, args.k)
+        tokens = f"{r['tokens']:>8}" if "tokens" in r else f"{'-':>8}"
+        padding = f"{r['padding']:>8.1%}" if "padding" in r else f"{'-':>8}"
+        print(
+            f"{mode:>9} {pooling:>7} {r['docs_per_s']:>8.1f} {r['forward_passes']:>7} "
+            f"{tokens} {padding} {r['ndcg']:>8.3f} {r['ndcg_long']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+backend/benchmarks/corpus.py
+
+Deterministic synthetic resumes and job descriptions for the benchmarks.
+- Same seed -> identical texts (skills are drawn from the sorted
+  skills.json vocabulary, never from set order)
+- Sizes: short (~1 page), medium, long (many roles and project bullets,
+  the shape that makes the name / experience regexes work hardest)
+- Written as .txt, .docx (python-docx), text PDFs and image-only PDFs (no
+  text layer, so the parser falls back to OCR)
+- Text PDFs are written directly (one Helvetica text object per page), so
+  no PDF library beyond the parser's own dependencies is needed
+
+Usage (from backend/), to look at the files:
+    python -m benchmarks.corpus /tmp/corpus --resumes 8
+"""
+
+import argparse
+import os
+import random
+from typing import List
+
+from app.services.skill_utils import FLAT_SKILLS
+
+SKILLS = sorted(FLAT_SKILLS)
+
+FIRST_NAMES = [
+    "Alice", "Bilal", "Chen", "Daniela", "Emeka", "Farah", "Gustavo", "Hana",
+    "Ivan", "Jia", "Kofi", "Lena", "Mateo", "Nadia", "Oren", "Priya"
+]
+LAST_NAMES = [
+    "Smith", "Okafor", "Wang", "Rossi", "Haddad", "Kowalski", "Silva", "Tanaka",
+    "Nguyen", "Fischer", "Mensah", "Patel", "Garcia", "Ivanova", "Cohen", "Larsen"
+]
+COMPANIES = [
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries",
+    "Wayne Enterprises", "Vandelay", "Cyberdyne", "Soylent"
+]
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Backend Developer",
+    "Data Engineer", "Machine Learning Engineer", "DevOps Engineer",
+    "Full Stack Developer", "Tech Lead"
+]
+VERBS = [
+    "Built", "Designed", "Migrated", "Maintained", "Optimized", "Led",
+    "Automated", "Scaled", "Refactored", "Shipped"
+]
+OBJECTS = [
+    "a payments service", "the data ingestion pipeline", "internal dashboards",
+    "a recommendation engine", "the CI/CD workflow", "customer-facing APIs",
+    "a search index", "the monitoring stack", "batch ETL jobs", "a mobile backend"
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# roles, bullets per role, skills
+SIZES = {
+    "short": (2, 3, 8),
+    "medium": (4, 5, 15),
+    "long": (12, 10, 30),
+}
+
+
+def _bullet(rng: random.Random, skills: List[str]) -> str:
+    picked = rng.sample(skills, k=min(2, len(skills)))
+    return (
+        f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {' and '.join(picked)}, "
+        f"cutting latency by {rng.randint(10, 80)}% for {rng.randint(2, 90)}k users."
+    )
+
+
+def make_resume(seed: int, size: str = "medium") -> str:
+    rng = random.Random(seed)
+    roles, bullets, n_skills = SIZES[size]
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = rng.sample(SKILLS, k=min(n_skills, len(SKILLS)))
+
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience building "
+        f"production systems in {', '.join(skills[:3])}.",
+        "",
+        "Skills",
+        ", ".join(skills),
+        "",
+        "Experience",
+    ]
+
+    year = 2025
+    for _ in range(roles):
+        length = rng.randint(1, 3)
+        start = year - length
+        lines.append(
+            f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}  "
+            f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}"
+        )
+        lines.extend(_bullet(rng, skills) for _ in range(bullets))
+        lines.append("")
+        year = start
+
+    lines += [
+        "Education",
+        f"B.Sc. Computer Science, {rng.choice(COMPANIES)} University, {year - 4} - {year}",
+    ]
+    return "\n".join(lines)
+
+
+def make_job_description(seed: int) -> str:
+    rng = random.Random(seed)
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, k=min(10, len(SKILLS)))
+    years = rng.randint(2, 8)
+    return "\n".join([
+        f"Job Title: {title}",
+        f"{rng.choice(COMPANIES)} is hiring a {title} to join the platform team.",
+        f"You will work daily with {', '.join(skills[:5])}.",
+        f"Experience with {', '.join(skills[5:])} is a strong plus.",
+        f"{years} years of professional experience required.",
+        "You will own services end to end, from design reviews to on-call.",
+    ])
+
+
+# ---------------- Writers ----------------
+
+def write_txt(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path: str, text: str) -> None:
+    from docx import Document
+
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = 60) -> None:
+    """Minimal PDF with a real text layer: Letter pages, 10pt Helvetica."""
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # 1: catalog, 2: page tree, 3: font, then (page, content) per page
+    objects = {}
+    kids = []
+    for n, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        kids.append(f"{page_id} 0 R")
+        body = "BT /F1 10 Tf 12 TL 54 750 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        objects[content_id] = (
+            f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream"
+        )
+    objects[1] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    objects[3] = "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{objects[obj_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for obj_id in sorted(objects):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_image_pdf(path: str, text: str, lines_per_page: int = 45, dpi: int = 150) -> None:
+    """Scanned-style PDF: each page is a rendered bitmap, no text layer."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        font = ImageFont.load_default()
+
+    lines = text.splitlines() or [""]
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    pages = []
+    for i in range(0, len(lines), lines_per_page):
+        page = Image.new("L", (width, height), color=255)
+        draw = ImageDraw.Draw(page)
+        for row, line in enumerate(lines[i:i + lines_per_page]):
+            draw.text((60, 60 + row * 34), line, fill=0, font=font)
+        pages.append(page)
+
+    pages[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=pages[1:])
+
+
+WRITERS = {
+    "txt": write_txt,
+    "docx": write_docx,
+    "pdf": write_pdf,
+    "image_pdf": write_image_pdf,
+}
+EXTENSIONS = {"txt": ".txt", "docx": ".docx", "pdf": ".pdf", "image_pdf": ".pdf"}
+DEPENDENCIES = {"docx": "docx", "image_pdf": "PIL"}
+
+
+def available_formats(formats) -> List[str]:
+    usable = []
+    for fmt in formats:
+        try:
+            if fmt in DEPENDENCIES:
+                __import__(DEPENDENCIES[fmt])
+        except ImportError as e:
+            print(f"Corpus: skipping {fmt} files ({e})")
+            continue
+        usable.append(fmt)
+    return usable
+
+
+def write_resume(out_dir: str, seed: int, size: str, fmt: str) -> dict:
+    text = make_resume(seed, size)
+    path = os.path.join(out_dir, f"resume_{seed}_{size}_{fmt}{EXTENSIONS[fmt]}")
+    WRITERS[fmt](path, text)
+    return {"filename": os.path.basename(path), "path": path, "size": size, "format": fmt, "text": text}
+
+
+def generate_corpus(
+    out_dir: str,
+    resumes: int,
+    seed: int = 0,
+    formats=("txt", "docx", "pdf"),
+    sizes=("short", "medium", "long")
+) -> List[dict]:
+    """
+    `resumes` files cycling through formats and sizes. Formats whose writer
+    dependency is missing are left out (with a message).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    usable = available_formats(formats)
+    return [
+        write_resume(out_dir, seed + i, sizes[i % len(sizes)], usable[i % len(usable)])
+        for i in range(resumes)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--resumes", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--formats", nargs="+", default=["txt", "docx", "pdf", "image_pdf"],
+        choices=sorted(WRITERS)
+    )
+    args = parser.parse_args()
+
+    files = generate_corpus(args.out_dir, args.resumes, args.seed, tuple(args.formats))
+    write_txt(os.path.join(args.out_dir, "job_description.txt"), make_job_description(args.seed))
+    for f in files:
+        print(f"{f['filename']:<40} {os.path.getsize(f['path']):>8} bytes")
+
+
+if __name__ == "__main__":
+    main()
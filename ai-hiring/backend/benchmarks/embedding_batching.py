@@ -0,0 +1,146 @@
+"""
+backend/benchmarks/embedding_batching.py
+
+Throughput / latency of concurrent EmbeddingService callers with and
+without cross-request micro-batching.
+
+By default uses a stub model whose forward pass costs a fixed overhead plus
+a per-text cost, so it runs offline. Passes are serialized by a lock: on
+CPU each torch forward pass already uses every intra-op thread, so
+concurrent passes queue behind each other. Pass --real to use
+all-MiniLM-L6-v2.
+
+Usage (from backend/):
+    python -m benchmarks.embedding_batching
+    python -m benchmarks.embedding_batching --real --callers 1 4 16
+"""
+
+import os
+
+if __name__ == "__main__":
+    # stub vectors must never reach a shared embedding cache (modules that
+    # import the stubs from here set up their own)
+    os.environ["EMBED_SHARED_CACHE_PATH"] = ""
+
+import argparse
+import hashlib
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embeddings import EmbeddingCache, EmbeddingService
+
+
+class StubModel:
+    def __init__(self, overhead_ms: float, per_text_ms: float, dim: int = 384):
+        self.overhead = overhead_ms / 1000
+        self.per_text = per_text_ms / 1000
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        with self._lock:
+            time.sleep(self.overhead + self.per_text * len(texts))
+        return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+
+class HashEmbeddingModel:
+    """
+    Deterministic unit vectors keyed on the text, so similarities (and so
+    rankings) are stable across runs. Like real sentence embeddings they
+    share a common direction, so cosine similarities are positive (~0.5-0.75)
+    rather than centred on 0. Free by default; with a cost, passes are
+    serialized like StubModel's.
+    """
+
+    def __init__(self, overhead_ms: float = 0.0, per_text_ms: float = 0.0, dim: int = 384):
+        self.overhead = overhead_ms / 1000
+        self.per_text = per_text_ms / 1000
+        self.dim = dim
+        self._lock = threading.Lock()
+        common = np.random.default_rng(0).standard_normal(dim)
+        self._common = common / np.linalg.norm(common)
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            noise = np.random.default_rng(seed).standard_normal(self.dim)
+            vec = 0.8 * self._common + 0.6 * noise / np.linalg.norm(noise)
+            out[i] = vec / np.linalg.norm(vec)
+        if self.overhead or self.per_text:
+            with self._lock:
+                time.sleep(self.overhead + self.per_text * len(texts))
+        return out
+
+
+_counter = itertools.count()
+
+
+def _texts(n: int) -> list[str]:
+    # unique texts so every call misses the cache
+    return [f"candidate sentence {next(_counter)} about python and sql" for _ in range(n)]
+
+
+def run(callers: int, calls: int, texts_per_call: int, batching: bool):
+    EmbeddingService._cache = EmbeddingCache()
+    batcher = EmbeddingService.get_batcher()
+
+    def one_call():
+        texts = _texts(texts_per_call)
+        start = time.perf_counter()
+        embeddings, misses = EmbeddingService._lookup(texts)
+        if batching:
+            vectors = batcher.submit(list(misses)).result()
+        else:
+            vectors = EmbeddingService._encode_batch(list(misses))
+        EmbeddingService._fill(embeddings, misses, vectors)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        latencies = list(pool.map(lambda _: one_call(), range(calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "texts_per_s": calls * texts_per_call / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding micro-batching benchmark")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--texts-per-call", type=int, default=4)
+    parser.add_argument("--overhead-ms", type=float, default=8.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.5)
+    parser.add_argument("--real", action="store_true")
+    args = parser.parse_args()
+
+    if not args.real:
+        EmbeddingService._model = StubModel(args.overhead_ms, args.per_text_ms)
+
+    EmbeddingService._batcher = EmbeddingBatcher(EmbeddingService._encode_batch)
+
+    print(f"{'callers':>8} {'mode':>9} {'texts/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for callers in args.callers:
+        for batching in (False, True):
+            r = run(callers, args.calls, args.texts_per_call, batching)
+            print(
+                f"{callers:>8} {'batched' if batching else 'direct':>9} "
+                f"{r['texts_per_s']:>9.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+            )
+
+    b = EmbeddingService._batcher
+    print(f"batcher: {b.batches} forward passes, {b.texts} texts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+backend/benchmarks/import_time.py
+
+Cold import cost of the app: how long `import app.main` takes in a fresh
+interpreter (what every container start and every spawned worker pays
+before it can answer /healthz), and which heavy libraries it pulls in.
+
+- Wall time of `import app.main`, median of --runs fresh processes
+- The slowest modules by cumulative time, from python -X importtime
+- Whether torch / sentence_transformers / sklearn / spacy were imported
+
+Run it at two commits to compare.
+
+Usage (from backend/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module app.main --runs 10 --top 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "sklearn", "spacy", "cv2")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    # the app reads these at import; a scratch SQLite URL keeps drivers out of it
+    return {
+        **os.environ,
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY", "import-time"),
+        "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite:///:memory:"),
+    }
+
+
+def measure(module: str, runs: int) -> dict:
+    samples, heavy = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            env=_env(), capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(out)
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {
+        "median_s": round(statistics.median(samples), 3),
+        "min_s": round(min(samples), 3),
+        "heavy_modules_imported": heavy,
+    }
+
+
+def slowest_imports(module: str, top: int) -> list:
+    """(cumulative seconds, module) from -X importtime, top-level-ish first."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_env(), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of the app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs)
+    print(
+        f"import {args.module}: median {result['median_s']}s, min {result['min_s']}s "
+        f"over {args.runs} runs; heavy modules: {result['heavy_modules_imported'] or 'none'}"
+    )
+    print("\nslowest imports (cumulative):")
+    for seconds, name in slowest_imports(args.module, args.top):
+        print(f"{seconds:>8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
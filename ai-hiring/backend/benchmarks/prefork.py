@@ -0,0 +1,181 @@
+"""
+backend/benchmarks/prefork.py
+
+Memory and throughput of N web workers:
+- spawn:   uvicorn app.main:app --workers N (each worker imports the app
+           and loads its own model copy on first use)
+- prefork: python -m app.serve (models loaded + warmed once in the gunicorn
+           master, inherited copy-on-write)
+
+For each mode the server is started on a scratch SQLite database and
+measured for:
+- time until it accepts requests
+- latency of the first request per worker (N concurrent cold requests)
+- memory across the whole process tree, after warm-up: RSS (counts shared
+  pages once per process, overstates), PSS (shared pages split between
+  sharers) and USS (pages private to each process)
+- /api/upload_resume throughput at --concurrency
+
+Needs the real dependencies (torch, sentence-transformers, gunicorn,
+uvicorn, psutil, httpx).
+
+Usage (from backend/):
+    python -m benchmarks.prefork
+    python -m benchmarks.prefork --workers 4 --requests 400 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import psutil
+
+RESUME = (
+    "Jane Doe\njane@example.com\n"
+    "Backend engineer with 6 years of Python, FastAPI, PostgreSQL and Docker. "
+    "Built data pipelines on AWS and led a migration to Kubernetes.\n"
+    "2018 - 2024 Senior Engineer at Acme building scalable services.\n"
+)
+
+_counter = itertools.count()
+
+
+def _command(mode: str, port: int, workers: int) -> list:
+    if mode == "spawn":
+        return [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ]
+    return [sys.executable, "-m", "app.serve"]
+
+
+def _tree_memory(root: psutil.Process) -> dict:
+    procs = [root] + root.children(recursive=True)
+    totals = {"processes": 0, "rss_mb": 0.0, "pss_mb": 0.0, "uss_mb": 0.0}
+    for proc in procs:
+        try:
+            info = proc.memory_full_info()
+        except psutil.Error:
+            continue
+        totals["processes"] += 1
+        totals["rss_mb"] += info.rss / 2**20
+        totals["pss_mb"] += getattr(info, "pss", 0) / 2**20
+        totals["uss_mb"] += info.uss / 2**20
+    return {k: round(v, 1) for k, v in totals.items()}
+
+
+async def _upload(client: httpx.AsyncClient) -> float:
+    name = f"bench_{os.getpid()}_{next(_counter)}.txt"
+    start = time.perf_counter()
+    r = await client.post(
+        "/api/upload_resume",
+        files={"file": (name, RESUME.encode(), "text/plain")}
+    )
+    r.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _wait_ready(client: httpx.AsyncClient, proc, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if (await client.get("/docs")).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("server did not become ready")
+
+
+async def _drive(base_url: str, proc, workers: int, requests: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        ready_s = await _wait_ready(client, proc, timeout=300)
+
+        # one cold request per worker (the kernel spreads the connections)
+        cold = await asyncio.gather(*[_upload(client) for _ in range(workers)])
+        await asyncio.sleep(1)
+        memory = _tree_memory(psutil.Process(proc.pid))
+
+        sem = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with sem:
+                return await _upload(client)
+
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*[limited() for _ in range(requests)]))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "ready_s": round(ready_s, 1),
+        "cold_max_ms": round(max(cold) * 1000),
+        **memory,
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000),
+    }
+
+
+def run(mode: str, workers: int, requests: int, concurrency: int, port: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            "WEB_BIND": f"127.0.0.1:{port}",
+            "WEB_WORKERS": str(workers),
+            "RANKING_WORKERS": "0",
+            "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY", "bench"),
+            # every mode encodes for itself: no vectors from earlier runs
+            "EMBED_SHARED_CACHE_PATH": "",
+        }
+        # schema up front: N workers racing create_all on a fresh file fail
+        subprocess.run(
+            [sys.executable, "-m", "app.db.migrations"],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+        proc = subprocess.Popen(
+            _command(mode, port, workers),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            return asyncio.run(
+                _drive(f"http://127.0.0.1:{port}", proc, workers, requests, concurrency)
+            )
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spawned vs pre-forked web workers")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=["spawn", "prefork"])
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.requests} uploads at concurrency {args.concurrency}")
+    for mode in args.modes:
+        result = run(mode, args.workers, args.requests, args.concurrency, args.port)
+        print(f"{mode:>8}: " + "  ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+backend/benchmarks/shared_embedding_cache.py
+
+N worker processes serving rank requests, with only the per-process LRU vs
+with the shared SQLite store underneath it. Every request embeds the skill
+vocabulary, the sentences of one JD from a small pool (round-robin, so each
+JD reaches different workers over time) and unique resume sentences.
+Workers start staggered, like traffic arriving over time.
+
+Reports how many texts the model actually encoded across all processes,
+the wall time, and each worker's shared-store hits / misses. Uses the stub
+model from embedding_batching.py (serialized forward passes) so it runs
+offline.
+
+Usage (from backend/):
+    python -m benchmarks.shared_embedding_cache
+    python -m benchmarks.shared_embedding_cache --workers 8 --rounds 20
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from benchmarks.embedding_batching import StubModel
+
+SKILLS = [f"skill {i}" for i in range(200)]
+JD_POOL = [
+    [f"job {j} description sentence {i} about backend services" for i in range(30)]
+    for j in range(12)
+]
+STAGGER_SECONDS = 0.3
+
+
+def _worker(args) -> dict:
+    worker_id, workers, rounds, unique_per_round, overhead_ms, per_text_ms = args
+    from app.services.embeddings import EmbeddingService
+
+    time.sleep(worker_id * STAGGER_SECONDS)
+
+    model = StubModel(overhead_ms, per_text_ms)
+    encoded = [0]
+    original = model.encode
+
+    def counting_encode(texts, **kwargs):
+        encoded[0] += len(texts)
+        return original(texts, **kwargs)
+
+    model.encode = counting_encode
+    EmbeddingService._model = model
+
+    for r in range(rounds):
+        jd = JD_POOL[(worker_id + r * workers) % len(JD_POOL)]
+        unique = [f"resume {worker_id} round {r} line {i}" for i in range(unique_per_round)]
+        EmbeddingService.encode(SKILLS + jd + unique)
+
+    stats = EmbeddingService.cache_stats()
+    return {
+        "encoded": encoded[0],
+        "shared_hits": stats["shared"]["hits"] if stats["shared"] else 0,
+        "shared_misses": stats["shared"]["misses"] if stats["shared"] else 0,
+    }
+
+
+def run(workers: int, rounds: int, unique_per_round: int, shared: bool,
+        overhead_ms: float, per_text_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.sqlite3") if shared else ""
+        jobs = [
+            (i, workers, rounds, unique_per_round, overhead_ms, per_text_ms)
+            for i in range(workers)
+        ]
+        # module-level settings: spawned children read them at import
+        saved = dict(os.environ)
+        os.environ.update(EMBED_SHARED_CACHE_PATH=path, EMBED_BATCHING="0")
+        try:
+            start = time.perf_counter()
+            with mp.get_context("spawn").Pool(workers) as pool:
+                results = pool.map(_worker, jobs)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+    return {
+        "encoded_total": sum(r["encoded"] for r in results),
+        "wall_s": round(elapsed, 2),
+        "per_worker_hits": [r["shared_hits"] for r in results],
+        "per_worker_misses": [r["shared_misses"] for r in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-process vs shared embedding cache")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--unique-per-round", type=int, default=20)
+    parser.add_argument("--overhead-ms", type=float, default=8.0)
+    parser.add_argument("--per-text-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    texts_requested = args.workers * args.rounds * (
+        len(SKILLS) + len(JD_POOL[0]) + args.unique_per_round
+    )
+    print(f"{args.workers} workers x {args.rounds} rounds, {texts_requested} texts requested")
+    for shared in (False, True):
+        result = run(
+            args.workers, args.rounds, args.unique_per_round, shared,
+            args.overhead_ms, args.per_text_ms
+        )
+        label = "shared" if shared else "local"
+        print(f"{label:>7}: " + "  ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
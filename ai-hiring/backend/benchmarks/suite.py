@@ -0,0 +1,285 @@
+"""
+backend/benchmarks/suite.py
+
+Offline regression benchmarks for the ranking pipeline.
+- Micro: parser (txt / docx / text PDF / image-only PDF via OCR), nlp
+  (extract_name, extract_experience_years), skills (keyword, semantic,
+  unknown-skill detection), scoring and ranking.score_resume, on short and
+  long synthetic resumes (benchmarks/corpus.py)
+- End to end: ranking.run_ranking_pipeline over a mixed-format corpus
+- Embeddings come from a stub model (a deterministic hash of the text, no
+  forward-pass cost), so numbers reflect this repo's code, not torch, and it
+  runs without downloading anything. Caches are warm: every benchmark runs
+  once before it is timed, like a long-running worker
+- OCR benchmarks need the tesseract and pdftoppm binaries; without them
+  they are reported as skipped
+- Each benchmark: `--rounds` rounds of N calls (N sized so a round takes
+  ~--round-ms); the median per-call time is what gets compared
+
+Results go to JSON. --baseline compares this run against an earlier file
+and exits 1 when a benchmark's median is more than --threshold slower
+(and by more than --min-delta-ms, to ignore noise on sub-ms benchmarks).
+
+Usage (from backend/):
+    python -m benchmarks.suite --output before.json
+    git checkout my-branch
+    python -m benchmarks.suite --output after.json --baseline before.json
+    python -m benchmarks.suite --compare before.json after.json --threshold 0.1
+    python -m benchmarks.suite --only parser nlp
+"""
+
+import os
+import tempfile
+
+# module-level settings read at import: no shared on-disk cache, no batcher
+# thread, and a throwaway database URL (the pipeline itself never queries it)
+_SCRATCH = tempfile.mkdtemp(prefix="talentlens_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_SCRATCH}/bench.db")
+os.environ["EMBED_SHARED_CACHE_PATH"] = ""
+os.environ["EMBED_BATCHING"] = "0"
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services import nlp, parser, ranking, scoring, skills
+from app.services.embeddings import EmbeddingService
+from app.services.skill_utils import FLAT_SKILLS, SKILLS_LIST
+from benchmarks import corpus
+from benchmarks.embedding_batching import HashEmbeddingModel
+
+RESULTS_VERSION = 1
+
+
+def ocr_available() -> bool:
+    return bool(shutil.which("tesseract") and shutil.which("pdftoppm"))
+
+
+def _time(func, rounds: int, round_ms: float) -> dict:
+    func()  # warm-up: imports, caches, regex compilation
+
+    # calls per round, so that short functions aren't all timer noise
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, min(10000, int(round_ms / 1000 / max(once, 1e-9))))
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+
+    return {
+        "median_ms": round(statistics.median(per_call) * 1000, 4),
+        "min_ms": round(min(per_call) * 1000, 4),
+        "max_ms": round(max(per_call) * 1000, 4),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def build_benchmarks(work_dir: str, seed: int, resumes: int, with_ocr: bool) -> dict:
+    """name -> zero-argument callable (or a skip reason string)."""
+    jd_text = corpus.make_job_description(seed)
+    texts = {size: corpus.make_resume(seed + i, size) for i, size in enumerate(corpus.SIZES)}
+    formats = corpus.available_formats(("txt", "docx", "pdf", "image_pdf"))
+
+    files = {}
+    for fmt in formats:
+        for size in ("short", "long"):
+            files[(fmt, size)] = corpus.write_resume(work_dir, seed, size, fmt)["path"]
+
+    benchmarks = {}
+
+    # ---- parser ----
+    for (fmt, size), path in sorted(files.items()):
+        name = f"parser.extract_text.{fmt}.{size}"
+        if fmt == "image_pdf":
+            if not with_ocr:
+                benchmarks[name] = "tesseract / pdftoppm not installed"
+                continue
+            benchmarks[name] = lambda path=path: parser.extract_text_from_file(path)
+        else:
+            benchmarks[name] = lambda path=path: parser.extract_text_from_file(path, ocr_enabled=False)
+
+    # ---- nlp ----
+    for size in ("short", "long"):
+        text = texts[size]
+        benchmarks[f"nlp.extract_name.{size}"] = lambda t=text: nlp.extract_name(t, FLAT_SKILLS)
+        benchmarks[f"nlp.extract_experience_years.{size}"] = lambda t=text: nlp.extract_experience_years(t)
+
+    # ---- skills ----
+    for size in ("short", "long"):
+        text = texts[size]
+        benchmarks[f"skills.match_skills.{size}"] = lambda t=text: skills.match_skills(t, FLAT_SKILLS)
+        benchmarks[f"skills.semantic_skill_match.{size}"] = lambda t=text: skills.semantic_skill_match(t, FLAT_SKILLS)
+        benchmarks[f"skills.detect_unknown_skills.{size}"] = lambda t=text: skills.detect_unknown_skills(t, FLAT_SKILLS)
+
+    # ---- scoring / ranking ----
+    jd = ranking.prepare_job_description(jd_text)
+    parsed = {
+        "filename": "long.txt",
+        "text": texts["long"],
+        "experience_years": nlp.extract_experience_years(texts["long"]),
+        "resume_skills": skills.match_skills(texts["long"], FLAT_SKILLS),
+    }
+    embedding = EmbeddingService.encode([texts["long"]])[0]
+    components = np.random.default_rng(seed).uniform(0, 100, size=(1000, 3))
+
+    benchmarks["scoring.score_components"] = lambda: scoring.score_components(
+        semantic_score=55.0,
+        resume_skills=parsed["resume_skills"],
+        jd_text=jd_text,
+        resume_experience=parsed["experience_years"],
+        required_experience=3,
+        skills_master=SKILLS_LIST
+    )
+    benchmarks["scoring.reweight_scores.1000"] = lambda: scoring.reweight_scores(
+        components, scoring.DEFAULT_WEIGHTS
+    )
+    benchmarks["ranking.prepare_job_description"] = lambda: ranking.prepare_job_description(jd_text)
+    benchmarks["ranking.score_resume.long"] = lambda: ranking.score_resume(jd, parsed, embedding, 3)
+
+    # ---- end to end ----
+    pipeline_formats = [f for f in formats if f != "image_pdf" or with_ocr]
+    pipeline_dir = os.path.join(work_dir, "pipeline")
+    uploads = [
+        (f["filename"], f["path"])
+        for f in corpus.generate_corpus(pipeline_dir, resumes, seed, tuple(pipeline_formats))
+    ]
+    benchmarks[f"pipeline.run_ranking_pipeline.{len(uploads)}"] = lambda: ranking.run_ranking_pipeline(
+        jd_text, 3, uploads
+    )
+
+    return benchmarks
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_suite(args) -> dict:
+    EmbeddingService._model = HashEmbeddingModel()
+    with_ocr = ocr_available()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        benchmarks = build_benchmarks(work_dir, args.seed, args.resumes, with_ocr)
+        for name, bench in benchmarks.items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            if isinstance(bench, str):
+                results[name] = {"skipped": bench}
+                print(f"{name:<45} skipped ({bench})")
+                continue
+            results[name] = _time(bench, args.rounds, args.round_ms)
+            r = results[name]
+            print(f"{name:<45} {r['median_ms']:>11.4f} ms  (x{r['number']})")
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "resumes": args.resumes,
+            "ocr": with_ocr,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list:
+    """Print a comparison table; returns the names that regressed."""
+    regressions = []
+    print(
+        f"\n{'benchmark':<45} {'baseline':>11} {'current':>11} {'change':>8}"
+        f"   ({baseline['meta']['commit']} -> {current['meta']['commit']})"
+    )
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or "skipped" in base or "skipped" in cur:
+            continue
+        before, after = base["median_ms"], cur["median_ms"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<45} {before:>11.4f} {after:>11.4f} {change:>+8.1%}"
+            f"{'   REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise SystemExit(f"{path}: unsupported results version {data.get('version')}")
+    return data
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline pipeline benchmarks")
+    arg_parser.add_argument("--output", help="write results JSON here")
+    arg_parser.add_argument("--baseline", help="results JSON to compare this run against")
+    arg_parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+        help="only compare two existing results files"
+    )
+    arg_parser.add_argument("--threshold", type=float, default=0.15,
+                            help="allowed slowdown of the median, as a fraction")
+    arg_parser.add_argument("--min-delta-ms", type=float, default=0.01)
+    arg_parser.add_argument("--rounds", type=int, default=7)
+    arg_parser.add_argument("--round-ms", type=float, default=100.0)
+    arg_parser.add_argument("--resumes", type=int, default=12,
+                            help="corpus size for the end-to-end benchmark")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--only", nargs="+", help="benchmark name prefixes to run")
+    args = arg_parser.parse_args()
+
+    try:
+        if args.compare:
+            baseline, current = (_load(p) for p in args.compare)
+        else:
+            current = run_suite(args)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    json.dump(current, f, indent=2)
+                print(f"\nWrote {args.output}")
+            if not args.baseline:
+                return
+            baseline = _load(args.baseline)
+
+        regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+    finally:
+        shutil.rmtree(_SCRATCH, ignore_errors=True)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# app modules read these at import time; a real .env / environment wins
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'talentlens_tests.db')}"
+)
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+os.environ.setdefault("EMBED_SHARED_CACHE_PATH", "")
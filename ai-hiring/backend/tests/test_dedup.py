@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every table)
+from app.db.base import Base
+from app.db.migrations import _backfill_bucket_owners
+from app.models.resume_fingerprint import ResumeLshBucket
+from app.services.dedup import NearDuplicateIndex, fingerprint_rows, minhash
+from app.services.persistence import persist_ranking_run
+
+RESUME = (
+    "Alice Smith, senior backend engineer. Seven years building Python services with "
+    "FastAPI and Django, designing PostgreSQL schemas, running Docker and Kubernetes "
+    "deployments on AWS, and mentoring a team of four engineers through two product launches."
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _store(session_factory, user_id: int) -> int:
+    """Persist RESUME as an original from a ranking run of `user_id`."""
+    row = {
+        "filename": "alice.txt",
+        "experience_years": 7,
+        "skills": "Python",
+        "raw_text": RESUME,
+        "fingerprint": fingerprint_rows(minhash(RESUME), np.ones(4), ["Python"], None, 7.0)
+    }
+    score = {"semantic_score": 80.0, "final_score": 80.0}
+    with session_factory() as db:
+        _, _, (resume_id,) = persist_ranking_run(db, user_id, "JD", "Engineer", None, [row], [score])
+        db.commit()
+    return resume_id
+
+
+def test_duplicates_are_only_found_among_the_same_users_resumes(session_factory):
+    resume_id = _store(session_factory, user_id=1)
+    index = NearDuplicateIndex(session_factory, enabled=True)
+    signature = minhash(RESUME + " References on request.")
+
+    assert index.find(signature) is None  # unscoped
+    assert index.for_user(2).find(signature) is None
+    assert index.for_user(1).find(signature)["resume_id"] == resume_id
+
+
+def test_buckets_written_before_they_had_an_owner_are_backfilled(session_factory):
+    resume_id = _store(session_factory, user_id=3)
+    with session_factory() as db:
+        db.execute(ResumeLshBucket.__table__.update().values(user_id=None))
+        db.commit()
+        assert _backfill_bucket_owners(db.connection()) > 0
+        owners = set(db.scalars(
+            select(ResumeLshBucket.user_id).where(ResumeLshBucket.resume_id == resume_id)
+        ))
+
+    assert owners == {3}
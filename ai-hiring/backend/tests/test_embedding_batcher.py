@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.scheduling import BULK, INTERACTIVE
+
+
+class RecordingEncoder:
+    """One row per text (its length); records every forward pass."""
+
+    def __init__(self, gate: threading.Event = None):
+        self.calls = []
+        self.gate = gate
+        self.started = threading.Event()
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+def _blocked_batcher(**kwargs):
+    """A batcher whose first forward pass ("blocker") waits for `gate`."""
+    gate = threading.Event()
+    encoder = RecordingEncoder(gate)
+    batcher = EmbeddingBatcher(encoder, **kwargs)
+    first = batcher.submit(["blocker"])
+    assert encoder.started.wait(5)
+    return batcher, encoder, gate, first
+
+
+def test_concurrent_submissions_share_one_forward_pass():
+    batcher, encoder, gate, first = _blocked_batcher(max_wait_ms=50)
+
+    a = batcher.submit(["python", "docker"])
+    b = batcher.submit(["docker", "kubernetes"])
+    gate.set()
+
+    assert first.result(5).shape == (1, 2)
+    np.testing.assert_array_equal(a.result(5)[:, 0], [6, 6])
+    np.testing.assert_array_equal(b.result(5)[:, 0], [6, 10])
+    assert encoder.calls[1] == ["python", "docker", "kubernetes"]
+    # the repeated text was encoded once, and both callers got that row
+    assert a.result()[1].tolist() == b.result()[0].tolist()
+    assert batcher.batches == 2
+
+
+def test_large_submission_is_split_and_reassembled_in_order():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=1, max_texts=4)
+    texts = [f"skill {'x' * i}" for i in range(10)]
+
+    vectors = batcher.submit(texts).result(5)
+
+    np.testing.assert_array_equal(vectors[:, 0], [len(t) for t in texts])
+    assert all(len(call) <= 4 for call in encoder.calls)
+
+
+def test_cancelled_submission_is_never_encoded():
+    batcher, encoder, gate, _ = _blocked_batcher(max_wait_ms=1)
+
+    cancelled = batcher.submit(["client went away"])
+    kept = batcher.submit(["still here"])
+    assert cancelled.cancel()
+    gate.set()
+
+    assert kept.result(5)[0, 0] == len("still here")
+    assert all("client went away" not in call for call in encoder.calls)
+
+
+def test_encode_error_reaches_every_caller_in_the_batch_and_the_batcher_recovers():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        if len(calls) == 1:
+            raise RuntimeError("CUDA out of memory")
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    batcher = EmbeddingBatcher(encode, max_wait_ms=50)
+    a = batcher.submit(["a"])
+    b = batcher.submit(["b"])
+
+    for future in (a, b):
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(5)
+    assert batcher.submit(["c"]).result(5).shape == (1, 2)
+
+
+def test_interactive_texts_are_batched_ahead_of_queued_bulk_work():
+    batcher, encoder, gate, _ = _blocked_batcher(max_wait_ms=1, max_texts=2)
+
+    bulk = [batcher.submit([f"bulk {i}"], priority=BULK) for i in range(4)]
+    upload = batcher.submit(["upload"], priority=INTERACTIVE)
+    gate.set()
+
+    upload.result(5)
+    for future in bulk:
+        future.result(5)
+    assert "upload" in encoder.calls[1]
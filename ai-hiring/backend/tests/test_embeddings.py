@@ -0,0 +1,56 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.embeddings import EmbeddingCache, EmbeddingService
+from app.services.taxonomy import compile_from_sources
+
+
+class HashModel:
+    """Deterministic stand-in for MiniLM: a vector per text, no torch."""
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        return np.stack([
+            np.frombuffer(hashlib.sha256(t.encode()).digest()[:16], dtype=np.uint8).astype(np.float32)
+            for t in texts
+        ])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(EmbeddingService, "_model", HashModel())
+    monkeypatch.setattr(EmbeddingService, "_cache", EmbeddingCache())
+    monkeypatch.setattr(EmbeddingService, "_shared_ready", True)
+    monkeypatch.setattr(EmbeddingService, "_shared", None)
+    monkeypatch.setattr(EmbeddingService, "_batcher", None)
+    return EmbeddingService
+
+
+def test_warming_the_skill_matrix_starts_no_batcher_thread(service):
+    taxonomy = compile_from_sources()
+    taxonomy.skill_matrix(service.encode_unbatched)
+
+    assert service._batcher is None
+    np.testing.assert_array_equal(
+        service.encode(taxonomy.skills[:3]),
+        service.encode_unbatched(taxonomy.skills[:3])
+    )
+
+
+def test_forked_child_encodes_with_its_own_batcher(service):
+    service.encode(["started in the parent"])
+    assert service._batcher is not None
+
+    pid = os.fork()
+    if pid == 0:
+        result = []
+        t = threading.Thread(target=lambda: result.append(service.encode(["first in the child"])))
+        t.start()
+        t.join(10)
+        os._exit(0 if result else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,67 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.exceptions import IdempotencyKeyReused
+from app.db.base import Base
+from app.models.ranking_session import RankingSession
+from app.services import idempotency
+from app.services.idempotency import InflightRequests, find_recent_session, request_key
+
+JD = "Backend engineer with Python and PostgreSQL"
+
+
+def _files():
+    return [UploadFile(io.BytesIO(b"Python developer"), filename="a.txt")]
+
+
+def test_key_changes_with_the_taxonomy_and_the_embedding_config(monkeypatch):
+    key, request_hash = request_key(JD, _files(), 2.0)
+    assert key == request_hash
+
+    monkeypatch.setattr(idempotency.skill_taxonomy, "current", SimpleNamespace(version="approved-2"))
+    after_reload, _ = request_key(JD, _files(), 2.0)
+    monkeypatch.setattr(idempotency, "DOCUMENT_EMBEDDING", "other-model/chunked-max")
+    after_rechunk, _ = request_key(JD, _files(), 2.0)
+
+    assert len({key, after_reload, after_rechunk}) == 3
+
+
+def test_client_key_is_bound_to_the_request_it_was_first_used_with():
+    key, first_hash = request_key(JD, _files(), 2.0, client_key="retry-1")
+    same_key, other_hash = request_key("Data engineer", _files(), 2.0, client_key="retry-1")
+
+    assert key == same_key and first_hash != other_hash
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[RankingSession.__table__])
+        async with async_sessionmaker(engine)() as db:
+            db.add(RankingSession(user_id=1, job_description=JD, request_key=key, request_hash=first_hash))
+            await db.commit()
+
+            assert (await find_recent_session(db, 1, key, first_hash)) is not None
+            with pytest.raises(IdempotencyKeyReused):
+                await find_recent_session(db, 1, key, other_hash)
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_inflight_request_is_not_shared_with_a_different_body():
+    async def scenario():
+        inflight = InflightRequests()
+        inflight.start(1, "retry-1", "hash-a")
+        assert inflight.get(1, "retry-1", "hash-a") is not None
+        with pytest.raises(IdempotencyKeyReused):
+            inflight.get(1, "retry-1", "hash-b")
+        inflight.finish(1, "retry-1", None)
+        assert inflight.get(1, "retry-1", "hash-b") is None
+
+    asyncio.run(scenario())
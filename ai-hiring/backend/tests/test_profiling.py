@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core import profiling
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "profile_trigger", lambda headers: "sampled")
+
+    app = FastAPI()
+    app.middleware("http")(main.profile_request)
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield b"one\n"
+            yield b"two\n"
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    return app
+
+
+def _profiles(tmp_path) -> list:
+    return sorted(p.name for p in tmp_path.glob("*.json"))
+
+
+def test_streamed_response_is_profiled_to_the_end(profiled_app, tmp_path):
+    response = TestClient(profiled_app).get("/stream")
+
+    assert response.text == "one\ntwo\n"
+    assert response.headers[profiling.PROFILE_ID_HEADER] in _profiles(tmp_path)[0]
+    assert not profiling._one_at_a_time.locked()
+
+
+def test_profile_ends_when_the_body_never_starts(profiled_app, tmp_path):
+    """Regression: the profiler lock was only released by the body iterator."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "root_path": "",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "headers": [],
+    }
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        asyncio.run(asyncio.wait_for(profiled_app(scope, receive, send), 10))
+
+    assert not profiling._one_at_a_time.locked()
+    assert len(_profiles(tmp_path)) == 1
+
+    # and the next request is profiled, not skipped
+    response = TestClient(profiled_app).get("/stream")
+    assert profiling.PROFILE_ID_HEADER.lower() in {k.lower() for k in response.headers}
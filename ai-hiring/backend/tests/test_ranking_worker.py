@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every table)
+from app.db.base import Base
+from app.models.ranking_job import RankingJob, JOB_COMPLETED, JOB_FAILED, JOB_RUNNING
+from app.services import ranking_worker
+
+
+def _run(*args, **kwargs):
+    return {
+        "job_title": "Engineer",
+        "resume_rows": [],
+        "score_rows": [],
+        "results": [],
+        "skill_counts": {}
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(ranking_worker, "JOB_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(ranking_worker, "run_ranking_pipeline", _run)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _enqueue(session_factory) -> str:
+    job_id = uuid.uuid4().hex
+    upload_dir = ranking_worker.job_upload_dir(job_id)
+    os.makedirs(upload_dir)
+    path = os.path.join(upload_dir, "0_a.txt")
+    with open(path, "w") as f:
+        f.write("resume")
+
+    with session_factory() as db:
+        db.add(RankingJob(
+            id=job_id,
+            user_id=1,
+            jd_text="Python engineer",
+            uploads=[{"filename": "a.txt", "path": path}],
+            total=1
+        ))
+        db.commit()
+    return job_id
+
+
+def _job(session_factory, job_id: str) -> RankingJob:
+    with session_factory() as db:
+        return db.get(RankingJob, job_id)
+
+
+def _go_stale(session_factory, job_id: str) -> None:
+    with session_factory() as db:
+        db.execute(
+            update(RankingJob)
+            .where(RankingJob.id == job_id)
+            .values(updated_at=ranking_worker._now() - timedelta(hours=1))
+        )
+        db.commit()
+
+
+def test_stale_job_is_reclaimed_and_the_superseded_attempt_cannot_finish_it(session_factory):
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=0, stale_seconds=60)
+    job_id = _enqueue(session_factory)
+
+    first = pool.claim_next()
+    assert first == (job_id, 1)
+    assert pool.claim_next() is None
+
+    _go_stale(session_factory, job_id)
+    second = pool.claim_next()
+    assert second == (job_id, 2)
+
+    # the presumed-dead worker comes back: no result, uploads untouched
+    pool.process(*first)
+    job = _job(session_factory, job_id)
+    assert (job.status, job.session_id) == (JOB_RUNNING, None)
+    assert os.path.isdir(ranking_worker.job_upload_dir(job_id))
+
+    pool.process(*second)
+    job = _job(session_factory, job_id)
+    assert job.status == JOB_COMPLETED and job.session_id is not None
+    assert not os.path.exists(ranking_worker.job_upload_dir(job_id))
+
+
+def test_job_is_failed_once_its_attempts_are_used_up(session_factory):
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=0, max_attempts=2)
+    job_id = _enqueue(session_factory)
+
+    for attempt in (1, 2):
+        assert pool.claim_next() == (job_id, attempt)
+        _go_stale(session_factory, job_id)
+
+    assert pool.claim_next() is None
+    job = _job(session_factory, job_id)
+    assert job.status == JOB_FAILED
+    assert "2 attempts" in job.error
+    assert not os.path.exists(ranking_worker.job_upload_dir(job_id))
+
+
+def test_heartbeat_keeps_a_long_run_from_being_reclaimed(session_factory, monkeypatch):
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=0, stale_seconds=0.3)
+    job_id = _enqueue(session_factory)
+    reclaimed = []
+
+    def slow_run(*args, **kwargs):
+        time.sleep(0.9)
+        reclaimed.append(pool.claim_next())
+        return _run()
+
+    monkeypatch.setattr(ranking_worker, "run_ranking_pipeline", slow_run)
+    pool.process(*pool.claim_next())
+
+    assert reclaimed == [None]
+    assert _job(session_factory, job_id).status == JOB_COMPLETED
+
+
+def test_no_connection_is_held_while_the_pipeline_runs(session_factory, monkeypatch):
+    """Regression: process() kept its session open across the pipeline."""
+    engine = session_factory.kw["bind"]
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=0)
+    job_id = _enqueue(session_factory)
+    checked_out = []
+
+    def run(*args, **kwargs):
+        checked_out.append(engine.pool.checkedout())
+        return _run()
+
+    monkeypatch.setattr(ranking_worker, "run_ranking_pipeline", run)
+    pool.process(*pool.claim_next())
+
+    assert checked_out == [0]
+    assert _job(session_factory, job_id).status == JOB_COMPLETED
+
+
+def test_worker_thread_survives_a_crashing_job(session_factory, monkeypatch):
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=1, poll_seconds=0.01)
+    processed = []
+    done = threading.Event()
+    real_process = pool.process
+
+    def process(job_id, attempt):
+        if not processed:
+            processed.append(job_id)
+            raise RuntimeError("database went away")
+        processed.append(job_id)
+        real_process(job_id, attempt)
+        done.set()
+
+    monkeypatch.setattr(pool, "process", process)
+    first = _enqueue(session_factory)
+    time.sleep(0.01)
+    second = _enqueue(session_factory)
+
+    pool.start()
+    try:
+        assert done.wait(5)
+    finally:
+        pool.stop(timeout=5)
+
+    assert processed == [first, second]
+    assert _job(session_factory, second).status == JOB_COMPLETED
+
+
+def test_job_deleted_after_its_claim_is_skipped(session_factory):
+    pool = ranking_worker.RankingWorkerPool(session_factory, workers=0)
+    job_id = _enqueue(session_factory)
+    claim = pool.claim_next()
+
+    with session_factory() as db:
+        db.delete(db.get(RankingJob, job_id))
+        db.commit()
+
+    pool.process(*claim)
+    assert not os.path.exists(ranking_worker.job_upload_dir(job_id))
@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import get_current_user
+from app.main import app
+from app.routes import upload
+from app.services.scheduling import (
+    BULK,
+    INTERACTIVE,
+    BulkAdmission,
+    PriorityLimiter,
+    WeightedFairQueue
+)
+
+WEIGHTS = {INTERACTIVE: 4.0, BULK: 1.0}
+
+
+# ---------------- WeightedFairQueue ----------------
+
+def test_fair_queue_serves_classes_in_proportion_to_their_weights():
+    queue = WeightedFairQueue(WEIGHTS)
+    for i in range(20):
+        queue.push(BULK, f"b{i}")
+        queue.push(INTERACTIVE, f"i{i}")
+
+    served = []
+    for _ in range(10):
+        cls, _ = queue.pop()
+        queue.charge(cls)
+        served.append(cls)
+
+    assert served.count(INTERACTIVE) == 8
+    assert served.count(BULK) == 2
+
+
+def test_fair_queue_is_fifo_within_a_class_and_idle_classes_bank_no_credit():
+    queue = WeightedFairQueue(WEIGHTS)
+    for i in range(8):
+        queue.push(BULK, f"b{i}")
+    for _ in range(4):
+        cls, _ = queue.pop()
+        queue.charge(cls)
+
+    # interactive was idle the whole time: it starts level with bulk
+    # instead of owning the next 16 turns (4 bulk turns at weight 4)
+    queue.push(INTERACTIVE, "i0")
+    queue.push(INTERACTIVE, "i1")
+    order = []
+    while len(queue):
+        cls, item = queue.pop()
+        queue.charge(cls)
+        order.append(item)
+
+    assert order == ["i0", "b4", "i1", "b5", "b6", "b7"]
+
+
+def test_unknown_classes_queue_as_bulk():
+    queue = WeightedFairQueue(WEIGHTS)
+    queue.push("batch-export", "x")
+    assert queue.depths() == {INTERACTIVE: 0, BULK: 1}
+
+
+# ---------------- PriorityLimiter ----------------
+
+def _hold(limiter, priority, started, release, order, name):
+    with limiter.acquire(priority):
+        order.append(name)
+        started.set()
+        release.wait(5)
+
+
+def test_limiter_hands_a_freed_slot_to_the_interactive_waiter_first():
+    limiter = PriorityLimiter(1, WEIGHTS)
+    order = []
+    release = threading.Event()
+    threads = []
+
+    started = threading.Event()
+    threads.append(threading.Thread(target=_hold, args=(limiter, BULK, started, release, order, "holder")))
+    threads[0].start()
+    assert started.wait(5)
+
+    for priority, name in ((BULK, "bulk"), (INTERACTIVE, "interactive")):
+        t = threading.Thread(target=_hold, args=(limiter, priority, threading.Event(), release, order, name))
+        t.start()
+        threads.append(t)
+        while sum(limiter.waiting.values()) < len(threads) - 1:
+            time.sleep(0.001)
+
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert order == ["holder", "interactive", "bulk"]
+    assert limiter.waiting == {INTERACTIVE: 0, BULK: 0}
+
+
+def test_limiter_slot_is_released_when_the_holder_raises():
+    limiter = PriorityLimiter(1, WEIGHTS)
+    with pytest.raises(RuntimeError):
+        with limiter.acquire(BULK):
+            raise RuntimeError("OCR failed")
+
+    done = threading.Event()
+    t = threading.Thread(target=lambda: _hold(limiter, BULK, done, threading.Event(), [], "next"))
+    t.start()
+    assert done.wait(5)
+    t.join(0)
+
+
+# ---------------- BulkAdmission ----------------
+
+def test_admission_caps_per_user_and_globally():
+    admission = BulkAdmission(max_inflight=3, max_per_user=2)
+
+    assert admission.try_acquire(1) and admission.try_acquire(1)
+    assert not admission.try_acquire(1)
+    assert admission.try_acquire(2)
+    assert not admission.try_acquire(3)
+
+    admission.release(1)
+    assert admission.try_acquire(3)
+    assert admission.inflight == 3
+
+
+# ---------------- Streaming endpoint ----------------
+
+JD = "Backend engineer with Python and PostgreSQL"
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    admission = BulkAdmission(max_inflight=4, max_per_user=1, retry_after=7)
+    monkeypatch.setattr(upload, "bulk_admission", admission)
+
+    async def no_replay(db, user_id, key, request_hash):
+        return None
+
+    monkeypatch.setattr(upload, "find_recent_session", no_replay)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    yield admission
+    app.dependency_overrides.clear()
+
+
+def test_stream_over_the_user_cap_is_rejected_with_retry_after(admission):
+    assert admission.try_acquire(1)
+
+    response = TestClient(app).post(
+        "/api/rank_and_score/stream",
+        data={"jd_text": JD},
+        files=[("files", ("a.txt", b"Python developer", "text/plain"))]
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_stream_abandoned_before_its_body_starts_releases_the_slot(admission):
+    """Regression: the slot was only released by the body generator."""
+    request = TestClient(app).build_request(
+        "POST",
+        "/api/rank_and_score/stream",
+        data={"jd_text": JD},
+        files=[("files", ("a.txt", b"Python developer", "text/plain"))]
+    )
+    body = request.read()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/rank_and_score/stream",
+        "raw_path": b"/api/rank_and_score/stream",
+        "query_string": b"",
+        "root_path": "",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in request.headers.items()],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        # the client is gone by the time the headers go out
+        if message["type"] == "http.response.start":
+            raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        asyncio.run(asyncio.wait_for(app(scope, receive, send), 10))
+
+    assert admission.inflight == 0
+    assert admission.try_acquire(1)
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import ScoreWeights
+from app.services.scoring import DEFAULT_WEIGHTS, combine_scores, reweight_scores, score_components
+from app.services.skill_utils import FLAT_SKILLS, SKILLS_LIST
+
+
+def test_reweight_with_default_weights_reproduces_stored_scores():
+    rng = random.Random(0)
+    rows, stored = [], []
+    for _ in range(500):
+        resume_skills = rng.sample(FLAT_SKILLS, k=rng.randint(0, 12))
+        jd_skills = rng.sample(FLAT_SKILLS, k=rng.randint(1, 9))
+        components = score_components(
+            semantic_score=round(rng.uniform(0, 100), 2),
+            resume_skills=resume_skills,
+            jd_text="We need " + ", ".join(jd_skills),
+            resume_experience=rng.choice([None, rng.uniform(0, 12)]),
+            required_experience=rng.choice([None, rng.uniform(1, 8)]),
+            skills_master=SKILLS_LIST
+        )
+        rows.append([
+            components["semantic_score"],
+            components["skill_match_score"],
+            components["experience_score"]
+        ])
+        stored.append(components["final_score"])
+
+    np.testing.assert_array_equal(reweight_scores(np.array(rows), DEFAULT_WEIGHTS), stored)
+
+
+def test_weights_are_normalized_the_same_way_on_both_paths():
+    weights = {"semantic": 2, "skill": 1, "experience": 1}
+    components = np.array([[80.0, 40.0, 70.0], [33.33, 66.67, 30.0]])
+
+    assert list(reweight_scores(components, weights)) == [
+        combine_scores(*row, weights) for row in components
+    ]
+    assert combine_scores(80.0, 40.0, 70.0, weights) == 67.5
+
+
+def test_all_zero_weights_are_rejected():
+    with pytest.raises(ValidationError, match="greater than 0"):
+        ScoreWeights(semantic=0, skill=0, experience=0)
+
+    assert ScoreWeights(semantic=0, skill=1, experience=0).skill == 1
@@ -0,0 +1,99 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.unknown_skill import UnknownSkill
+from app.services.skill_tracker import UnknownSkillTracker
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'skills.db'}")
+    Base.metadata.create_all(engine, tables=[UnknownSkill.__table__])
+    yield engine
+    engine.dispose()
+
+
+def _frequencies(engine) -> dict:
+    with sessionmaker(bind=engine)() as db:
+        return {s.name: s.frequency for s in db.execute(select(UnknownSkill)).scalars()}
+
+
+def test_counts_are_written_only_on_flush_and_accumulate(engine):
+    tracker = UnknownSkillTracker(sessionmaker(bind=engine))
+    tracker.add(["Rust", "rust ", "Elixir", "Go"])  # one resume: each skill once
+    tracker.add(["rust"])
+
+    assert _frequencies(engine) == {}
+    assert tracker.flush() == 2
+    assert _frequencies(engine) == {"rust": 2, "elixir": 1}
+
+    tracker.add_counts(Counter({"rust": 3, "zig": 1}))
+    tracker.flush()
+    assert _frequencies(engine) == {"rust": 5, "elixir": 1, "zig": 1}
+    assert tracker.pending == 0 and tracker.flush() == 0
+
+
+def test_flushes_from_several_workers_add_up(engine):
+    workers = [UnknownSkillTracker(sessionmaker(bind=engine)) for _ in range(3)]
+    for i, tracker in enumerate(workers):
+        tracker.add_counts(Counter({"rust": i + 1, f"only-{i}": 1}))
+    for tracker in workers:
+        tracker.flush()
+
+    frequencies = _frequencies(engine)
+    assert frequencies["rust"] == 6
+    assert all(frequencies[f"only-{i}"] == 1 for i in range(3))
+
+
+def test_failed_flush_keeps_the_counts_for_the_next_one(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'late.db'}")
+    tracker = UnknownSkillTracker(sessionmaker(bind=engine))
+    tracker.add_counts(Counter({"rust": 2}))
+
+    with pytest.raises(Exception):
+        tracker.flush()  # table not there yet
+    tracker.add_counts(Counter({"rust": 1}))
+
+    Base.metadata.create_all(engine, tables=[UnknownSkill.__table__])
+    tracker.flush()
+    assert _frequencies(engine) == {"rust": 3}
+    engine.dispose()
+
+
+def test_threshold_flushes_before_the_interval(engine):
+    tracker = UnknownSkillTracker(sessionmaker(bind=engine), flush_seconds=60, flush_threshold=2)
+
+    async def scenario():
+        task = asyncio.create_task(tracker.run())
+        await asyncio.sleep(0.05)
+        tracker.add_counts(Counter({"rust": 1, "zig": 1}))
+        for _ in range(100):
+            if _frequencies(engine):
+                break
+            await asyncio.sleep(0.02)
+        await tracker.stop(task)
+
+    asyncio.run(scenario())
+    assert _frequencies(engine) == {"rust": 1, "zig": 1}
+
+
+def test_stop_finishes_when_the_final_flush_fails(tmp_path):
+    """Regression: a failing last flush aborted the rest of the shutdown."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing.db'}")
+    tracker = UnknownSkillTracker(sessionmaker(bind=engine), flush_seconds=60)
+
+    async def scenario():
+        task = asyncio.create_task(tracker.run())
+        await asyncio.sleep(0.05)
+        tracker.add_counts(Counter({"rust": 1}))
+        await tracker.stop(task)
+        return "shut down"
+
+    assert asyncio.run(scenario()) == "shut down"
+    assert tracker.pending == 1
+    engine.dispose()
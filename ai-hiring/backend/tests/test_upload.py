@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import get_current_user
+from app.core.exceptions import FileProcessingError
+from app.main import app
+from app.routes import upload
+from app.services.scheduling import BulkAdmission
+
+JD = "Backend engineer with Python and PostgreSQL"
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    """Records, per save, whether it ran on the event loop; then fails it."""
+    calls = []
+
+    def save_uploads(files):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("thread")
+        raise FileProcessingError("disk full")
+
+    async def no_replay(db, user_id, key, request_hash):
+        return None
+
+    monkeypatch.setattr(upload, "_save_uploads", save_uploads)
+    monkeypatch.setattr(upload, "find_recent_session", no_replay)
+    monkeypatch.setattr(upload, "bulk_admission", BulkAdmission(max_inflight=4, max_per_user=4))
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    yield calls
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/api/rank_and_score", "/api/rank_and_score/stream"])
+def test_uploads_are_saved_off_the_event_loop(saves, path):
+    TestClient(app).post(
+        path,
+        data={"jd_text": JD},
+        files=[("files", ("a.txt", b"Python developer", "text/plain"))]
+    )
+
+    assert saves == ["thread"]